@@ -0,0 +1,285 @@
+# async_scraper.py - asyncio tabanlı scraping motoru: görev başına süre sınırı, geciken işlerin iptali, akışlı sonuç
+"""
+scraper.scrape_product_page'in asyncio karşılığı. Async FastAPI handler'larından doğrudan await edilebilir:
+
+  async for url, data in scrape_stream(urls, task_timeout=20, total_timeout=45):
+      ...  # sonuçlar bittikçe gelir; toplam süre dolunca kalan görevler iptal edilir
+
+- HTTP hızlı yolu httpx.AsyncClient ile event loop üzerinde çalışır (httpx yoksa senkron istemci thread'e alınır).
+- Nezaket slotları (PolitenessScheduler.acquire_async) ve devre kesici senkron yol ile ortaktır.
+- Ayrıştırma (CPU) loop'u bloklamaması için varsayılan executor'da yapılır.
+- Selenium senkron bir API olduğu için tarayıcı adımı sınırlı bir thread havuzunda koşar. İptal edilen görevin
+  tarayıcı işi yarıda kesilemez; sayfa bitene kadar site slotu tutulur, sonuç atılır.
+
+Senkron kod (ör. candidates.py) için scrape_urls() aynı motoru süreç ömrü boyunca açık kalan bir arka plan
+event loop'unda çalıştırır: loop, httpx istemcisi (keep-alive bağlantıları) ve thread havuzları istekler
+arasında yeniden kullanılır. İstek başına asyncio.run bunları her çağrıda sıfırdan kuruyordu.
+"""
+import os
+import time
+import atexit
+import asyncio
+import functools
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, copy_context
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+
+import html_cache
+from scraper import (
+    SITE_CONFIG, HTTP_TIMEOUT, HTTP_POOL_SIZE, _domain_key, _resolve_fetch_mode, _http_headers, _accept_http_html,
+    get_page_html_with_http, parse_product_html, _capture_with_selenium, _prefer_complete, _BREAKERS, _SCHEDULER, _count,
+    _record_timing, _FETCH_FAILURES, _fetch_outcome, _note_fetch_failure,
+)
+
+# httpx opsiyonel: yoksa HTTP yolu da thread havuzunda senkron istemciyle çalışır
+try:
+    import httpx  # type: ignore
+except Exception:
+    httpx = None
+
+ASYNC_CONCURRENCY = int(os.getenv("SCRAPER_ASYNC_CONCURRENCY", "16"))
+ASYNC_TASK_TIMEOUT = float(os.getenv("SCRAPER_ASYNC_TASK_TIMEOUT", "30"))
+# Tarayıcı adımları için thread sayısı; driver havuzundan fazlası lease() içinde sırasını bekler
+ASYNC_BROWSER_THREADS = int(os.getenv("SCRAPER_ASYNC_BROWSER_THREADS", "8"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=ASYNC_BROWSER_THREADS, thread_name_prefix="async-scrape")
+
+# Görevin o an beklediği thread işi; iptalde slot bu iş bitince bırakılır (bkz. _run_guarded_async).
+# _run_guarded_async bir kutu kurar, _in_thread işi içine koyar: kutu referansla paylaşıldığı için
+# wait_for'un açtığı alt görevdeki iş de görünür
+_THREAD_WORK: ContextVar[Optional[List[Future]]] = ContextVar("_THREAD_WORK", default=None)
+# scrape_stream'in paylaşılan async HTTP istemcisi
+_HTTP_CLIENT: ContextVar[Optional[Any]] = ContextVar("_HTTP_CLIENT", default=None)
+
+# scrape_urls'in arka plan loop'u ve o loop'a bağlı, süreç boyunca açık istemci
+_ENGINE_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_ENGINE_CLIENT: Optional[Any] = None
+_ENGINE_LOCK = threading.Lock()
+
+async def _in_thread(fn, *args, **kwargs):
+    # Bağlam kopyalanır: thread'deki getirme hataları görevin _FETCH_FAILURES listesine yazılır
+    work = _EXECUTOR.submit(copy_context().run, functools.partial(fn, *args, **kwargs))
+    box = _THREAD_WORK.get()
+    if box is not None:
+        box[:] = [work]
+    return await asyncio.wrap_future(work)
+
+def _new_client():
+    limits = httpx.Limits(max_connections=HTTP_POOL_SIZE * 4, max_keepalive_connections=HTTP_POOL_SIZE)
+    return httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT, follow_redirects=True)
+
+@asynccontextmanager
+async def http_client():
+    """Tek bir keep-alive'lı AsyncClient açar ve bu bağlamdaki tüm istekler için paylaştırır."""
+    if httpx is None or _HTTP_CLIENT.get() is not None:
+        yield _HTTP_CLIENT.get()
+        return
+    async with _new_client() as client:
+        token = _HTTP_CLIENT.set(client)
+        try:
+            yield client
+        finally:
+            _HTTP_CLIENT.reset(token)
+
+async def get_page_html_async(url: str) -> Optional[str]:
+    """get_page_html_with_http'nin async karşılığı (aynı önbellek ve yanıt kontrolleri)."""
+    if httpx is None:
+        return await _in_thread(get_page_html_with_http, url)
+    cached = html_cache.lookup(url, "http")
+    if cached is not None:
+        print(f"[Scraper] HTML önbellekten alındı (http): {url[:80]}")
+        return cached
+    if not html_cache.should_fetch():
+        return None
+    async with http_client() as client:
+        start = time.time()
+        try:
+            resp = await client.get(url, headers=_http_headers())
+        except httpx.HTTPError as e:
+            print(f"[Scraper] HTTP hatası: {e}")
+            _note_fetch_failure("http_error")
+            return None
+        finally:
+            _record_timing("http_fetch", time.time() - start)
+    return _accept_http_html(url, resp.status_code, resp.text)
+
+async def _parse(domain_key: str, html: str, url: str) -> Optional[Dict[str, Any]]:
+    # Ayrıştırma CPU işi; event loop'u (ve aynı loop'taki FastAPI isteklerini) sayfa başına bloklamasın
+    return await asyncio.to_thread(parse_product_html, domain_key, html, url)
+
+async def _scrape_with_mode_async(url: str, domain_key: str, cfg: Dict[str, Any], fetch_mode: str) -> Optional[Dict[str, Any]]:
+    start = time.time()
+    if fetch_mode in ("http", "http_then_browser"):
+        html = await get_page_html_async(url)
+        data = await _parse(domain_key, html, url) if html else None
+        if data:
+            _count("http_success")
+            _record_timing("scrape_http", time.time() - start)
+            return data
+        if fetch_mode == "http":
+            _count("http_miss")
+            return None
+        print(f"[Scraper] HTTP yolu sonuç vermedi, Selenium'a geçiliyor: {url[:80]}")
+        _count("http_escalated")
+
+    data, html = await _in_thread(
+        _capture_with_selenium,
+        url,
+        wait_for_any=cfg.get("wait_for_any"),
+        before_capture=cfg.get("before_capture"),
+        in_page_extractor=cfg.get("in_page_extractor"),
+    )
+    if html:
+        data = _prefer_complete(data, await _parse(domain_key, html, url))
+    _count("browser_success" if data else "browser_miss")
+    _record_timing("scrape_browser", time.time() - start)
+    return data
+
+async def _with_timeout(fetch, timeout: Optional[float]):
+    return await (asyncio.wait_for(fetch(), timeout) if timeout else fetch())
+
+async def _run_guarded_async(domain_key: str, url: str, fetch,
+                             timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    scraper._run_guarded'ın async karşılığı. timeout nezaket slotu alındıktan sonra başlar (sıra beklemesi
+    sayılmaz); süresi dolan sayfa site hatası sayılır. Toplam süre iptali ve ayrıştırma sonucu boş sayfa sayılmaz.
+    """
+    if not _BREAKERS.allow(domain_key):
+        print(f"[Scraper] {domain_key} için devre açık, sayfa atlandı: {url[:80]}")
+        _count(f"breaker_skipped:{domain_key}")
+        return None
+    outcome: Optional[bool] = None
+    try:
+        if not await _SCHEDULER.acquire_async(domain_key):
+            print(f"[Scraper] {domain_key} için nezaket limiti doldu, sayfa atlandı: {url[:80]}")
+            _count(f"polite_skipped:{domain_key}")
+            return None
+        failures: List[str] = []
+        box: List[Future] = []
+        token, work_token = _FETCH_FAILURES.set(failures), _THREAD_WORK.set(box)
+        try:
+            outcome = False
+            data = await _with_timeout(fetch, timeout)
+            outcome = _fetch_outcome(data, failures)
+            return data
+        except asyncio.CancelledError:
+            outcome = None
+            raise
+        finally:
+            _FETCH_FAILURES.reset(token)
+            _THREAD_WORK.reset(work_token)
+            work = box[0] if box else None
+            if work is not None and not work.done():
+                # Tarayıcı hâlâ sayfada: slot, thread işi bitince bırakılır
+                work.add_done_callback(lambda _w: _SCHEDULER.release(domain_key))
+            else:
+                _SCHEDULER.release(domain_key)
+    finally:
+        _BREAKERS.record(domain_key, outcome)
+
+async def scrape_product_page_async(url: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """timeout: sayfanın kendi süresi (nezaket slotu alındıktan sonra); dolarsa asyncio.TimeoutError."""
+    domain_key = _domain_key(url)
+    if not domain_key:
+        print(f"[Scraper] Desteklenmeyen site: {url}")
+        return None
+    cfg = SITE_CONFIG[domain_key]
+    fetch_mode = _resolve_fetch_mode(cfg)
+    fetch = functools.partial(_scrape_with_mode_async, url, domain_key, cfg, fetch_mode)
+    async with http_client():
+        if not html_cache.should_fetch():
+            return await _with_timeout(fetch, timeout)
+        return await _run_guarded_async(domain_key, url, fetch, timeout)
+
+async def scrape_stream(urls: List[str], task_timeout: float = ASYNC_TASK_TIMEOUT,
+                        total_timeout: Optional[float] = None,
+                        concurrency: int = ASYNC_CONCURRENCY) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    URL'leri eşzamanlı kazır ve (url, veri) çiftlerini bittikleri sırayla verir; başarısız/süresi dolan sayfa
+    için veri None'dır. task_timeout sayfa başına (eşzamanlılık ve nezaket slotu beklemesi hariç), total_timeout
+    tüm akış içindir; toplam süre dolunca (veya tüketici akışı erken bırakınca) kalan görevler iptal edilir.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + total_timeout if total_timeout else None
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(url: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        async with gate:
+            try:
+                return url, await scrape_product_page_async(url, timeout=task_timeout)
+            except asyncio.TimeoutError:
+                print(f"[Scraper] Sayfa süresi doldu ({task_timeout:.0f} sn): {url[:80]}")
+                _count("async_task_timeout")
+            except Exception as e:
+                print(f"[Scraper] Async scraping hatası {url[:80]}: {e}")
+                _count("async_task_error")
+            return url, None
+
+    async with http_client():
+        pending = {asyncio.create_task(one(u)) for u in urls}
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    print(f"[Scraper] Toplam süre doldu, {len(pending)} sayfa iptal ediliyor.")
+                    _count("async_cancelled", len(pending))
+                    break
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+async def scrape_many(urls: List[str], **kwargs) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    return [item async for item in scrape_stream(urls, **kwargs)]
+
+def _engine_loop() -> asyncio.AbstractEventLoop:
+    global _ENGINE_LOOP
+    with _ENGINE_LOCK:
+        if _ENGINE_LOOP is None or _ENGINE_LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-scrape-loop", daemon=True).start()
+            _ENGINE_LOOP = loop
+        return _ENGINE_LOOP
+
+async def _scrape_many_shared(urls: List[str], **kwargs) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    global _ENGINE_CLIENT
+    if httpx is not None and _ENGINE_CLIENT is None:
+        _ENGINE_CLIENT = _new_client()
+    _HTTP_CLIENT.set(_ENGINE_CLIENT)
+    return await scrape_many(urls, **kwargs)
+
+def scrape_urls(urls: List[str], **kwargs) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Senkron kod için: motoru paylaşılan arka plan loop'unda çalıştırır ve sonucu bekler (thread-safe).
+    Çalışan bir event loop içinden scrape_stream'i doğrudan await edin.
+    """
+    loop = _engine_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("scrape_urls motor loop'unun içinden çağrılamaz; scrape_stream kullanın")
+    return asyncio.run_coroutine_threadsafe(_scrape_many_shared(urls, **kwargs), loop).result()
+
+def shutdown_engine() -> None:
+    """Arka plan loop'unu ve paylaşılan istemciyi kapatır (süreç çıkışında otomatik)."""
+    global _ENGINE_LOOP, _ENGINE_CLIENT
+    with _ENGINE_LOCK:
+        loop, client, _ENGINE_LOOP, _ENGINE_CLIENT = _ENGINE_LOOP, _ENGINE_CLIENT, None, None
+    if loop is None or loop.is_closed():
+        return
+    if client is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"[Scraper] Async HTTP istemcisi kapatılamadı: {e}")
+    loop.call_soon_threadsafe(loop.stop)
+
+atexit.register(shutdown_engine)
@@ -0,0 +1,175 @@
+# bench_browser.py - Tarayıcı katmanı benchmark'ı: eşzamanlı sayfa başına bellek ve sayfa/dk
+"""
+Kaydedilmiş fixture sayfalarını yerel bir HTTP sunucusundan Chrome'a yükletir ve driver havuzunu
+"process" (slot başına Chrome) ile "tabs" (tek Chrome, slot başına sekme) modlarında karşılaştırır.
+Ağa çıkılmaz; ölçülen şey tarayıcı süreçlerinin bellek maliyeti ve sayfa açma hızıdır.
+
+Kullanım:
+  python bench_browser.py                         # iki mod, 4 worker
+  python bench_browser.py --mode tabs --workers 12 --repeat 5
+  python bench_browser.py --json
+
+Bellek, bu sürecin başlattığı tüm chromedriver/Chrome alt süreçlerinin toplam RSS'idir (psutil gerekir).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Dict, Any, Optional, List
+
+import scraper
+from scraper import DriverPool, _build_driver, _build_tab_driver, _BROWSER_HOST, psutil
+from bench_scraper import FIXTURES_DIR
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_fixtures(root: str = FIXTURES_DIR) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def fixture_urls(server: ThreadingHTTPServer, root: str = FIXTURES_DIR) -> List[str]:
+    port = server.server_address[1]
+    urls: List[str] = []
+    for domain in sorted(os.listdir(root)):
+        site_dir = os.path.join(root, domain)
+        if not os.path.isdir(site_dir):
+            continue
+        for fname in sorted(os.listdir(site_dir)):
+            # Liste (kategori) fixture'ları ürün sayfası değildir; bench_engine bunları başarısız sayardı
+            if fname.endswith(".html") and not fname.endswith(".listing.html"):
+                urls.append(f"http://127.0.0.1:{port}/{domain}/{fname}")
+    return urls
+
+class _RssSampler:
+    """Alt süreçlerin toplam RSS'ini arka planda örnekler."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.max_procs = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _sample(self) -> None:
+        total, procs = 0, 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+                procs += 1
+            except psutil.Error:
+                continue
+        self.samples.append(total / (1024 * 1024))
+        self.max_procs = max(self.max_procs, procs)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+def run(mode: str, urls: List[str], workers: int, repeat: int = 3) -> Dict[str, Any]:
+    factory = _build_tab_driver if mode == "tabs" else _build_driver
+    pool = DriverPool(size=workers, factory=factory, max_pages=0, max_rss_mb=0)
+    jobs = urls * max(1, repeat)
+    errors = 0
+    retired_before = _BROWSER_HOST.retired
+
+    def load(url: str) -> bool:
+        with pool.lease() as driver:
+            driver.get(url)
+            return len(driver.page_source) > 0
+
+    try:
+        with _RssSampler() as sampler:
+            # Isınma: tüm slotları aynı anda açtır (soğuk açılış süresi ayrı raporlanır)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(lambda _: load("about:blank"), range(workers)))
+            startup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                for future in [ex.submit(load, u) for u in jobs]:
+                    try:
+                        if not future.result():
+                            errors += 1
+                    except Exception as e:
+                        print(f"[Bench] Sayfa hatası: {e}", file=sys.stderr)
+                        errors += 1
+            elapsed = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+        host_restarts = _BROWSER_HOST.retired - retired_before
+        _BROWSER_HOST.shutdown()
+
+    peak = max(sampler.samples) if sampler.samples else 0.0
+    return {
+        "mode": mode,
+        "workers": workers,
+        "pages": len(jobs),
+        "errors": errors,
+        "startup_s": round(startup, 2),
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_min": round(len(jobs) / elapsed * 60, 1) if elapsed else None,
+        "peak_rss_mb": round(peak, 1),
+        "rss_per_worker_mb": round(peak / workers, 1),
+        "max_processes": sampler.max_procs,
+        # Sekme modunda paylaşılan Chrome'un sayfa/bellek eşiğiyle yenilenme sayısı
+        "host_restarts": host_restarts,
+    }
+
+def print_report(reports: List[Dict[str, Any]]) -> None:
+    print(f"{'mod':<9}{'worker':>7}{'sayfa':>7}{'hata':>6}{'açılış sn':>11}{'sayfa/dk':>10}"
+          f"{'tepe MB':>10}{'MB/worker':>11}{'süreç':>7}{'yenileme':>10}")
+    for r in reports:
+        print(f"{r['mode']:<9}{r['workers']:>7}{r['pages']:>7}{r['errors']:>6}{r['startup_s']:>11}"
+              f"{r['pages_per_min']:>10}{r['peak_rss_mb']:>10}{r['rss_per_worker_mb']:>11}{r['max_processes']:>7}{r['host_restarts']:>10}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Driver havuzu bellek/verim benchmark'ı (process vs tabs)")
+    parser.add_argument("--mode", choices=("process", "tabs", "both"), default="both")
+    parser.add_argument("--workers", type=int, default=4, help="eşzamanlı sayfa sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="her fixture kaç kez açılsın")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixture kök dizini")
+    parser.add_argument("--json", action="store_true", help="raporu JSON olarak yaz")
+    args = parser.parse_args(argv)
+
+    if psutil is None:
+        print("psutil kurulu değil; bellek ölçülemez.", file=sys.stderr)
+        return 2
+    server = serve_fixtures(args.fixtures)
+    try:
+        urls = fixture_urls(server, args.fixtures)
+        if not urls:
+            print("Fixture bulunamadı.", file=sys.stderr)
+            return 2
+        modes = ("process", "tabs") if args.mode == "both" else (args.mode,)
+        reports = [run(mode, urls, args.workers, args.repeat) for mode in modes]
+    finally:
+        server.shutdown()
+        scraper.shutdown_driver_pool()
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        print_report(reports)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# bench_engine.py - Scraping motoru benchmark'ı: ThreadPoolExecutor yolu vs asyncio motoru
+"""
+Fixture sayfalarını gecikmeli bir yerel "perakendeci" sunucusundan çeker ve iki yolu karşılaştırır:
+  threads → candidates.py'nin eski yolu: ThreadPoolExecutor + scrape_product_page + as_completed(timeout)
+  async   → async_scraper.scrape_many (görev başına süre sınırı, toplam süre dolunca iptal)
+
+Sunucu her isteğe --latency kadar gecikme ekler; her --slow-every'inci istek --slow-latency kadar bekletilir
+(geciken sayfa). Tarayıcı açılmaz: tüm siteler bu ölçüm için fetch_mode="http" ile çalışır, nezaket limitleri
+kapatılır. Ölçülen şey motorun kendi verimi ve geciken sayfalar karşısındaki davranışıdır.
+
+Kullanım:
+  python bench_engine.py
+  python bench_engine.py --workers 16 --repeat 5 --latency 0.3 --slow-every 7 --slow-latency 10
+  python bench_engine.py --json
+"""
+import io
+import sys
+import json
+import time
+import argparse
+import threading
+import functools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from http.server import ThreadingHTTPServer
+from typing import Dict, Any, Optional, List
+
+import scraper
+import async_scraper
+from bench_browser import _QuietHandler, fixture_urls
+from bench_scraper import FIXTURES_DIR
+
+class _SlowHandler(_QuietHandler):
+    latency = 0.0
+    slow_every = 0
+    slow_latency = 0.0
+    _served = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        with self._lock:
+            type(self)._served += 1
+            n = type(self)._served
+        slow = self.slow_every and n % self.slow_every == 0
+        time.sleep(self.slow_latency if slow else self.latency)
+        super().do_GET()
+
+def serve_retailer(root: str, latency: float, slow_every: int, slow_latency: float) -> ThreadingHTTPServer:
+    handler = type("_Handler", (_SlowHandler,), {
+        "latency": latency, "slow_every": slow_every, "slow_latency": slow_latency, "_served": 0,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=root))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _prepare_sites(workers: int) -> None:
+    # Sadece HTTP yolu; nezaket limitleri ve devre kesici ölçümü etkilemesin
+    for cfg in scraper.SITE_CONFIG.values():
+        cfg.update(fetch_mode="http", max_concurrency=workers, rate_per_sec=1e6, burst=workers)
+    _reset_guards()
+
+def _reset_guards() -> None:
+    scraper._SCHEDULER._sites.clear()
+    scraper._BREAKERS._sites.clear()
+
+def run_threads(urls: List[str], workers: int, total_timeout: float) -> Dict[str, Any]:
+    ok = 0
+    start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [executor.submit(scraper.scrape_product_page, u) for u in urls]
+    try:
+        for future in as_completed(futures, timeout=total_timeout):
+            if future.result():
+                ok += 1
+    except FutureTimeout:
+        pass
+    # as_completed'in döndüğü an sonuçlar kullanılabilir; arka planda kalan işler beklenmez
+    elapsed = time.perf_counter() - start
+    executor.shutdown(wait=True, cancel_futures=True)
+    return _report("threads", urls, workers, ok, elapsed)
+
+def run_async(urls: List[str], workers: int, total_timeout: float, task_timeout: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    results = async_scraper.scrape_urls(urls, task_timeout=task_timeout, total_timeout=total_timeout,
+                                        concurrency=workers)
+    elapsed = time.perf_counter() - start
+    return _report("async", urls, workers, sum(1 for _, data in results if data), elapsed)
+
+def _report(engine: str, urls: List[str], workers: int, ok: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        "engine": engine,
+        "workers": workers,
+        "pages": len(urls),
+        "ok": ok,
+        "missed": len(urls) - ok,
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_s": round(ok / elapsed, 1) if elapsed else None,
+    }
+
+def print_report(reports: List[Dict[str, Any]]) -> None:
+    print(f"{'motor':<9}{'worker':>7}{'sayfa':>7}{'başarılı':>10}{'kayıp':>7}{'süre sn':>9}{'sayfa/sn':>10}")
+    for r in reports:
+        print(f"{r['engine']:<9}{r['workers']:>7}{r['pages']:>7}{r['ok']:>10}{r['missed']:>7}"
+              f"{r['elapsed_s']:>9}{r['pages_per_s']:>10}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ThreadPoolExecutor vs asyncio scraping motoru benchmark'ı")
+    parser.add_argument("--engine", choices=("threads", "async", "both"), default="both")
+    parser.add_argument("--workers", type=int, default=8, help="eşzamanlı sayfa sayısı")
+    parser.add_argument("--repeat", type=int, default=4, help="her fixture kaç kez çekilsin")
+    parser.add_argument("--latency", type=float, default=0.2, help="istek başına sunucu gecikmesi (sn)")
+    parser.add_argument("--slow-every", type=int, default=10, help="her N. istek yavaş olsun (0: kapalı)")
+    parser.add_argument("--slow-latency", type=float, default=8.0, help="yavaş isteğin gecikmesi (sn)")
+    parser.add_argument("--task-timeout", type=float, default=3.0, help="async: sayfa başına süre sınırı (sn)")
+    parser.add_argument("--total-timeout", type=float, default=30.0, help="toplam süre sınırı (sn)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixture kök dizini")
+    parser.add_argument("--json", action="store_true", help="raporu JSON olarak yaz")
+    args = parser.parse_args(argv)
+
+    server = serve_retailer(args.fixtures, args.latency, args.slow_every, args.slow_latency)
+    try:
+        urls = fixture_urls(server, args.fixtures) * max(1, args.repeat)
+        if not urls:
+            print("Fixture bulunamadı.", file=sys.stderr)
+            return 2
+        _prepare_sites(args.workers)
+        engines = ("threads", "async") if args.engine == "both" else (args.engine,)
+        reports = []
+        for engine in engines:
+            _reset_guards()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if engine == "threads":
+                    reports.append(run_threads(urls, args.workers, args.total_timeout))
+                else:
+                    reports.append(run_async(urls, args.workers, args.total_timeout, args.task_timeout))
+    finally:
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        print_report(reports)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+# bench_scraper.py - Kaydedilmiş sayfalar üzerinde parser benchmark'ı ve regresyon kontrolü
+"""
+Ağa ve Chrome'a çıkmadan site parser'larının hızını ve doğruluğunu ölçer.
+
+Fixture düzeni:
+  fixtures/scraper/<domain>/<ad>.html                  → kaydedilmiş ürün sayfası
+  fixtures/scraper/<domain>/<ad>.golden.json           → {"url": ..., "expected": {name, price, brand, spec_count, specs}}
+  fixtures/scraper/<domain>/<ad>.listing.html          → kaydedilmiş kategori (liste) sayfası
+  fixtures/scraper/<domain>/<ad>.listing.golden.json   → {"url": ..., "expected": [{url, name, price, brand, spec_count}]}
+  fixtures/scraper/prices.golden.json                  → {"cases": [{"text": "1.250", "expected": 1250.0}]} (_parse_price)
+
+Kullanım:
+  python bench_scraper.py                      # tüm fixture'lar, rapor + doğruluk
+  python bench_scraper.py --site n11.com --repeat 50
+  python bench_scraper.py --update-golden      # mevcut parser çıktısını golden olarak yazar
+  python bench_scraper.py --from-cache         # html_cache kayıtlarını da ölçer (golden yok, sadece başarı)
+  python bench_scraper.py --json               # raporu JSON olarak basar
+  python bench_scraper.py --scope all          # kapsamlı ayrıştırmayı açarak ölçer (veya "a.com,b.com")
+
+Golden ile uyuşmayan alan (ürün, liste sayfası veya fiyat metni) varsa çıkış kodu 1'dir.
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+from typing import Dict, Any, Optional, List
+
+import html_cache
+import scraper
+from scraper import SITE_CONFIG, parse_product_html, parse_listing_html, _domain_key, _parse_price
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "scraper")
+ACCURACY_FIELDS = ("name", "price", "brand", "spec_count")
+# Ürün sayfalarında spec değerleri de karşılaştırılır (sayı tutup değerleri menüden toplayan parser'ı yakalar)
+PRODUCT_FIELDS = ACCURACY_FIELDS + ("specs",)
+LISTING_SUFFIX = ".listing"
+PRICES_GOLDEN = "prices.golden.json"
+
+def load_fixtures(root: str = FIXTURES_DIR, site: Optional[str] = None, listing: bool = False) -> List[Dict[str, Any]]:
+    """Ürün sayfası fixture'larını, listing=True ise kategori sayfası (<ad>.listing.html) fixture'larını yükler."""
+    pages: List[Dict[str, Any]] = []
+    if not os.path.isdir(root):
+        return pages
+    for domain in sorted(os.listdir(root)):
+        if domain not in SITE_CONFIG or (site and domain != site):
+            continue
+        if listing and "listing" not in SITE_CONFIG[domain]:
+            continue
+        site_dir = os.path.join(root, domain)
+        for fname in sorted(os.listdir(site_dir)):
+            if not fname.endswith(".html"):
+                continue
+            name = fname[:-len(".html")]
+            if name.endswith(LISTING_SUFFIX) != listing:
+                continue
+            golden_path = os.path.join(site_dir, f"{name}.golden.json")
+            golden: Dict[str, Any] = {}
+            if os.path.exists(golden_path):
+                with open(golden_path, "r", encoding="utf-8") as f:
+                    golden = json.load(f)
+            with open(os.path.join(site_dir, fname), "r", encoding="utf-8") as f:
+                html = f.read()
+            pages.append({
+                "domain": domain,
+                "name": name,
+                "url": golden.get("url") or f"https://www.{domain}/{name}",
+                "html": html,
+                "golden_path": golden_path,
+                "expected": golden.get("expected"),
+            })
+    return pages
+
+def load_cached_pages(site: Optional[str] = None) -> List[Dict[str, Any]]:
+    """html_cache'teki kayıtları fixture biçiminde döndürür (doğruluk kontrolü yapılmaz)."""
+    pages: List[Dict[str, Any]] = []
+    for entry in html_cache.iter_entries():
+        domain = _domain_key(entry.get("url", ""))
+        if not domain or (site and domain != site):
+            continue
+        html = html_cache.load_blob(entry.get("sha256", ""))
+        if not html:
+            continue
+        pages.append({
+            "domain": domain,
+            "name": f"cache:{entry.get('variant')}:{entry.get('canonical_url')}",
+            "url": entry["url"],
+            "html": html,
+            "golden_path": None,
+            "expected": None,
+        })
+    return pages
+
+def summarize(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not data:
+        return None
+    specs = data.get("specs") or {}
+    return {
+        "name": data.get("name"),
+        "price": data.get("price"),
+        "brand": data.get("brand"),
+        "spec_count": len(specs),
+        "specs": specs,
+    }
+
+def compare(expected: Optional[Dict[str, Any]], actual: Optional[Dict[str, Any]]) -> Dict[str, bool]:
+    if expected is None:
+        return {}
+    if actual is None:
+        return {field: False for field in PRODUCT_FIELDS}
+    return {field: expected.get(field) == actual.get(field) for field in PRODUCT_FIELDS}
+
+def _parse_quiet(page: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Parser'ların print çıktısı ölçüme dahil ama terminale basılmaz
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_product_html(page["domain"], page["html"], page["url"])
+
+def summarize_listing(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {"url": p.get("url"), "name": p.get("name"), "price": p.get("price"), "brand": p.get("brand"),
+         "spec_count": len(p.get("specs") or {})}
+        for p in products
+    ]
+
+def run_listings(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Liste ayrıştırıcılarını kategori fixture'larında çalıştırır; kart sayısı ve kart alanları golden ile karşılaştırılır."""
+    results: List[Dict[str, Any]] = []
+    for page in pages:
+        with contextlib.redirect_stdout(io.StringIO()):
+            actual = summarize_listing(parse_listing_html(page["domain"], page["html"], page["url"]))
+        expected = page["expected"]
+        mismatched: List[str] = []
+        if expected is not None:
+            if len(expected) != len(actual):
+                mismatched.append(f"kart sayısı {len(actual)} != {len(expected)}")
+            for i, (exp, act) in enumerate(zip(expected, actual)):
+                fields = [f for f in ("url",) + ACCURACY_FIELDS if exp.get(f) != act.get(f)]
+                if fields:
+                    mismatched.append(f"kart {i + 1}: {', '.join(fields)}")
+        results.append({"domain": page["domain"], "name": page["name"], "cards": len(actual),
+                        "checked": expected is not None, "mismatched": mismatched, "actual": actual, "page": page})
+    return {
+        "pages": len(pages),
+        "cards": sum(r["cards"] for r in results),
+        "failures": [{"page": f"{r['domain']}/{r['name']}", "fields": r["mismatched"]} for r in results if r["mismatched"]],
+        "empty": [f"{r['domain']}/{r['name']}" for r in results if not r["cards"]],
+        "_results": results,
+    }
+
+def run_prices(root: str = FIXTURES_DIR) -> Dict[str, Any]:
+    """Belirsiz fiyat metinlerini (binlik/ondalık nokta) _parse_price ile ayrıştırır; elle yazılmış golden'la karşılaştırır."""
+    path = os.path.join(root, PRICES_GOLDEN)
+    if not os.path.exists(path):
+        return {"cases": 0, "failures": []}
+    with open(path, "r", encoding="utf-8") as f:
+        cases = json.load(f).get("cases") or []
+    failures = []
+    for case in cases:
+        actual = _parse_price(case["text"])
+        if actual != case["expected"]:
+            failures.append({"text": case["text"], "expected": case["expected"], "actual": actual})
+    return {"cases": len(cases), "failures": failures}
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def run(pages: List[Dict[str, Any]], repeat: int = 5) -> Dict[str, Any]:
+    timings: Dict[str, List[float]] = {}
+    results: List[Dict[str, Any]] = []
+    total = 0.0
+
+    for page in pages:
+        actual = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            data = _parse_quiet(page)
+            elapsed = time.perf_counter() - start
+            total += elapsed
+            timings.setdefault(page["domain"], []).append(elapsed)
+            actual = summarize(data)
+        results.append({
+            "domain": page["domain"],
+            "name": page["name"],
+            "ok": actual is not None,
+            "fields": compare(page["expected"], actual),
+            "actual": actual,
+            "page": page,
+        })
+
+    parsers = {
+        domain: {
+            "pages": len(values) // max(1, repeat),
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+            "avg_ms": round(sum(values) / len(values) * 1000, 2),
+        }
+        for domain, values in sorted(timings.items())
+    }
+    checked = [r for r in results if r["fields"]]
+    accuracy = {
+        field: round(sum(1 for r in checked if r["fields"][field]) / len(checked), 3) if checked else None
+        for field in PRODUCT_FIELDS
+    }
+    runs = sum(len(v) for v in timings.values())
+    return {
+        "pages": len(pages),
+        "runs": runs,
+        "total_s": round(total, 3),
+        "pages_per_sec": round(runs / total, 1) if total else None,
+        "parsers": parsers,
+        "accuracy": accuracy,
+        "failures": [
+            {"page": f"{r['domain']}/{r['name']}", "fields": [f for f, ok in r["fields"].items() if not ok]}
+            for r in checked if not all(r["fields"].values())
+        ],
+        "unparsed": [f"{r['domain']}/{r['name']}" for r in results if not r["ok"]],
+        "_results": results,
+    }
+
+def update_golden(results: List[Dict[str, Any]]) -> int:
+    written = 0
+    for r in results:
+        path = r["page"]["golden_path"]
+        if not path:
+            continue
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"url": r["page"]["url"], "expected": r["actual"]}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        written += 1
+    return written
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Sayfa: {report['pages']}  Ölçüm: {report['runs']}  Toplam: {report['total_s']} sn  "
+          f"Hız: {report['pages_per_sec']} sayfa/sn")
+    print(f"{'parser':<22}{'sayfa':>6}{'p50 ms':>10}{'p95 ms':>10}{'ort ms':>10}")
+    for domain, row in report["parsers"].items():
+        print(f"{domain:<22}{row['pages']:>6}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['avg_ms']:>10}")
+    print("Doğruluk: " + ", ".join(f"{k}={v}" for k, v in report["accuracy"].items()))
+    for failure in report["failures"]:
+        print(f"  UYUŞMAZLIK {failure['page']}: {', '.join(failure['fields'])}")
+    for page in report["unparsed"]:
+        print(f"  AYRIŞTIRILAMADI {page}")
+    listing = report.get("listing")
+    if listing:
+        print(f"Liste sayfaları: {listing['pages']}  Kart: {listing['cards']}  Uyuşmazlık: {len(listing['failures'])}")
+        for failure in listing["failures"]:
+            print(f"  LİSTE UYUŞMAZLIĞI {failure['page']}: {'; '.join(failure['fields'])}")
+        for page in listing["empty"]:
+            print(f"  LİSTE BOŞ {page}")
+    prices = report.get("prices")
+    if prices:
+        print(f"Fiyat metinleri: {prices['cases']}  Uyuşmazlık: {len(prices['failures'])}")
+        for failure in prices["failures"]:
+            print(f"  FİYAT UYUŞMAZLIĞI {failure['text']!r}: {failure['actual']} != {failure['expected']}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scraper parser benchmark'ı ve regresyon kontrolü")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixture kök dizini")
+    parser.add_argument("--site", help="sadece bu SITE_CONFIG alan adı")
+    parser.add_argument("--repeat", type=int, default=5, help="sayfa başına ölçüm tekrarı")
+    parser.add_argument("--update-golden", action="store_true", help="mevcut çıktıyı golden olarak yaz")
+    parser.add_argument("--from-cache", action="store_true", help="html_cache kayıtlarını da ekle")
+    parser.add_argument("--json", action="store_true", help="raporu JSON olarak yaz")
+    parser.add_argument("--scope", help="parse_scope açılacak siteler: all veya virgüllü alan adları")
+    args = parser.parse_args(argv)
+
+    if args.scope:
+        scraper.PARSE_SCOPE_SITES = {"*"} if args.scope == "all" else {d.strip() for d in args.scope.split(",") if d.strip()}
+    pages = load_fixtures(args.fixtures, args.site)
+    if args.from_cache:
+        pages += load_cached_pages(args.site)
+    if not pages:
+        print("Ölçülecek sayfa bulunamadı.")
+        return 1
+
+    report = run(pages, repeat=args.repeat)
+    listing = run_listings(load_fixtures(args.fixtures, args.site, listing=True))
+    if args.update_golden:
+        written = update_golden(report["_results"]) + update_golden(listing["_results"])
+        print(f"{written} golden dosyası yazıldı.")
+        return 0
+
+    report.pop("_results")
+    listing.pop("_results")
+    report["listing"] = listing
+    report["prices"] = run_prices(args.fixtures)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["failures"] or listing["failures"] or listing["empty"] or report["prices"]["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
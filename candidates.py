@@ -1,4 +1,5 @@
 # candidates.py - GELİŞTİRİLMİŞ paralel scraping ve filtreleme
+import os
 import time
 import hashlib
 from typing import List, Dict, Tuple, Optional, Any
@@ -8,7 +9,13 @@ from web_search import search_products_on_web
 from normalize import normalize_web_result, parse_query
 from utils import normalize_category
 from logger import get_logger
-from scraper import scrape_product_page
+from scraper import (
+    set_driver_pool_size, interleave_by_domain, BROWSER_MODE, scrape_listing, LISTING_MAX_PAGES,
+    canonical_product_url,
+)
+import seen_pages
+import search_yield
+from async_scraper import scrape_urls
 import re
 
 logger = get_logger("candidates")
@@ -63,11 +70,16 @@ _CACHE = {}
 CACHE_TIMEOUT_SECONDS = 3600
 
 # Paralel scraping konfigürasyonu
-MAX_WORKERS = 4 
+# Sekme modunda (SCRAPER_BROWSER_MODE=tabs) worker başına Chrome açılmadığı için daha yüksek tutulabilir
+MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "12" if BROWSER_MODE == "tabs" else "4"))
 SCRAPING_TIMEOUT = 30 
+SCRAPING_TOTAL_TIMEOUT = int(os.getenv("SCRAPER_TOTAL_TIMEOUT", "45"))
 # DEĞİŞİKLİK: Daha fazla URL kazımak için limiti artırdık
 MAX_SCRAPE_ATTEMPTS = 15
 
+# Her worker için bir sıcak Chrome örneği
+set_driver_pool_size(MAX_WORKERS)
+
 def _dedupe_key(p: Dict[str, Any]) -> str:
     """Ürünleri isme ve markaya göre tekileştirmek için bir anahtar oluşturur."""
     name = (p.get("name") or "").strip().lower()
@@ -80,24 +92,6 @@ def _ensure_local_source(p: Dict[str, Any]) -> Dict[str, Any]:
     p_copy["source"] = "local_database"
     return p_copy
 
-def _clean_hepsiburada_url(url: str) -> str:
-    """
-    DÜZELTİLDİ: Daha güvenilir URL temizleme
-    """
-    if 'hepsiburada.com' not in url:
-        return url
-    
-    if 'HBC' in url:
-        if '-p-' not in url:
-            parts = url.split('-')
-            if len(parts) > 1 and (parts[-1].startswith('HBC') or 'HBCV' in parts[-1]):
-                product_id_part = parts[-1].split('?')[0] # Query parametrelerini temizle
-                clean_url = '-'.join(parts[:-1]) + f'-p-{product_id_part}'
-                logger.debug(f"HB URL temizlendi: {url} -> {clean_url}")
-                return clean_url
-    
-    return url
-
 def _log_filtering_decision(product_name: str, reason: str, passed: bool):
     """Debug için filtreleme kararlarını logla"""
     status = "✅ GEÇTİ" if passed else "❌ ELENDİ"
@@ -213,47 +207,31 @@ def _is_price_reasonable(price: Optional[int], budget: Optional[float], toleranc
     
     return is_reasonable
 
-def _scrape_single_url(url_data: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
-    """
-    Tek bir URL'yi scrape eden fonksiyon (paralel execution için)
-    """
-    url, category, query = url_data
+def _validate_scraped(cleaned_url: str, query: str, scraped_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Kazınan veriye URL/sorgu bilgisini ekler; adı veya fiyatı eksikse None döndürür."""
+    # GÜNCELLENDİ: Daha detaylı loglama
+    if not scraped_data:
+        logger.debug(f"Scraping verisi boş döndü: {cleaned_url}")
+        return None
+
+    # URL'i güncelle
+    scraped_data["url"] = cleaned_url
+    scraped_data["original_query"] = query
+
+    # Temel validasyon
+    product_name = scraped_data.get("name") or ""
+    price = scraped_data.get("price")
     
-    try:
-        # URL temizleme
-        cleaned_url = _clean_hepsiburada_url(url)
-        logger.debug(f"Scraping başlatıldı: {cleaned_url}")
-        
-        # Scraping işlemi
-        scraped_data = scrape_product_page(cleaned_url)
-        
-        # GÜNCELLENDİ: Daha detaylı loglama
-        if not scraped_data:
-            logger.debug(f"Scraping verisi boş döndü: {cleaned_url}")
-            return None
-
-        # URL'i güncelle
-        scraped_data["url"] = cleaned_url
-        scraped_data["original_query"] = query
-
-        # Temel validasyon
-        product_name = scraped_data.get("name") or ""
-        price = scraped_data.get("price")
-        
-        # GÜNCELLENDİ: Hangi verinin eksik olduğunu belirt
-        if not product_name:
-            logger.debug(f"Eksik veri: Ürün adı bulunamadı. URL: {cleaned_url}")
-            return None
-        if not price:
-            logger.debug(f"Eksik veri: Fiyat bulunamadı. URL: {cleaned_url}")
-            return None
-        
-        logger.info(f"✅ Scraping başarılı: {product_name[:50]}... - {price} TL")
-        return scraped_data
-        
-    except Exception as e:
-        logger.warning(f"Scraping hatası {url}: {str(e)}")
+    # GÜNCELLENDİ: Hangi verinin eksik olduğunu belirt
+    if not product_name:
+        logger.debug(f"Eksik veri: Ürün adı bulunamadı. URL: {cleaned_url}")
+        return None
+    if not price:
+        logger.debug(f"Eksik veri: Fiyat bulunamadı. URL: {cleaned_url}")
         return None
+    
+    logger.info(f"✅ Scraping başarılı: {product_name[:50]}... - {price} TL")
+    return scraped_data
 
 def _fetch_and_filter_web_candidates_parallel(parsed_query: Any) -> List[Dict[str, Any]]:
     """
@@ -276,13 +254,16 @@ def _fetch_and_filter_web_candidates_parallel(parsed_query: Any) -> List[Dict[st
 
         # 2. Adım: Scraping için URL listesi hazırla
         urls_to_scrape = []
+        # Kanonik URL → sonucu getiren arama hiti (kazıma sonucu search_yield'a bu hitin site/stratejisiyle yazılır)
+        hit_by_url: Dict[str, Dict[str, Any]] = {}
         for hit in search_hits:
             url = hit.get("url")
             if url and not any(b in url for b in CONTENT_BLOCKLIST):
                 urls_to_scrape.append((url, category, query))
+                hit_by_url.setdefault(canonical_product_url(url), hit)
         
-        # Maksimum scrape sayısını sınırla
-        urls_to_scrape = urls_to_scrape[:MAX_SCRAPE_ATTEMPTS]
+        # Maksimum scrape sayısını sınırla; aynı siteye art arda istek gitmemesi için domainleri sırayla karıştır
+        urls_to_scrape = interleave_by_domain(urls_to_scrape[:MAX_SCRAPE_ATTEMPTS], key=lambda u: u[0])
         
         if not urls_to_scrape:
             logger.warning("Scraping için geçerli URL bulunamadı")
@@ -290,32 +271,39 @@ def _fetch_and_filter_web_candidates_parallel(parsed_query: Any) -> List[Dict[st
         
         logger.info(f"Paralel scraping başlıyor: {len(urls_to_scrape)} URL")
         
-        # 3. Adım: Paralel scraping
+        # 3. Adım: Paralel scraping (asyncio motoru). Sayfa başına SCRAPING_TIMEOUT, toplamda
+        # SCRAPING_TOTAL_TIMEOUT; süre dolunca biten sonuçlar korunur, geciken sayfalar iptal edilir.
         scraped_products = []
-        
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # Tüm scraping görevlerini başlat
-            future_to_url = {
-                executor.submit(_scrape_single_url, url_data): url_data[0] 
-                for url_data in urls_to_scrape
-            }
-            
-            # Sonuçları topla (timeout ile)
-            completed_count = 0
-            for future in as_completed(future_to_url, timeout=SCRAPING_TIMEOUT):
-                completed_count += 1
-                url = future_to_url[future]
-                
-                try:
-                    result = future.result()
-                    if result:
-                        scraped_products.append(result)
-                        logger.info(f"✅ [{completed_count}/{len(urls_to_scrape)}] Başarılı: {url}")
-                    else:
-                        logger.debug(f"❌ [{completed_count}/{len(urls_to_scrape)}] Başarısız: {url}")
-                        
-                except Exception as e:
-                    logger.warning(f"❌ [{completed_count}/{len(urls_to_scrape)}] Hata {url}: {str(e)}")
+        # Aynı ürünün parametre varyantları tek URL'ye iner; yakın zamanda kazınanlar sayfa açılmadan gelir
+        cleaned_urls = list(dict.fromkeys(canonical_product_url(url_data[0]) for url_data in urls_to_scrape))
+        results: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        fresh_urls = []
+        for url in cleaned_urls:
+            seen = seen_pages.lookup(url)
+            if seen:
+                results.append((url, seen["result"]))
+            else:
+                fresh_urls.append(url)
+        scraped_now = set(fresh_urls)
+        if len(fresh_urls) < len(cleaned_urls):
+            logger.info(f"Yakın zamanda kazınmış {len(cleaned_urls) - len(fresh_urls)} sayfa yeniden açılmayacak")
+        for url, data in scrape_urls(fresh_urls, task_timeout=SCRAPING_TIMEOUT,
+                                     total_timeout=SCRAPING_TOTAL_TIMEOUT, concurrency=MAX_WORKERS):
+            seen_pages.remember(url, data)
+            results.append((url, data))
+        scrape_outcomes = []
+        for completed_count, (url, data) in enumerate(results, 1):
+            result = _validate_scraped(url, query, data)
+            if result:
+                scraped_products.append(result)
+                logger.info(f"✅ [{completed_count}/{len(urls_to_scrape)}] Başarılı: {url}")
+            else:
+                logger.debug(f"❌ [{completed_count}/{len(urls_to_scrape)}] Başarısız: {url}")
+            hit = hit_by_url.get(url)
+            # seen_pages'ten gelen sonuç daha önce kaydedildi; verime sadece bu aramada kazınan sayfalar yazılır
+            if hit and hit.get("search_strategy_type") and url in scraped_now:
+                scrape_outcomes.append((hit["detected_category"], hit["search_site"], hit["search_strategy_type"], bool(result)))
+        search_yield.record_scrapes(scrape_outcomes)
         
         logger.info(f"Paralel scraping tamamlandı: {len(scraped_products)} ürün bulundu")
         
@@ -355,6 +343,28 @@ def _fetch_and_filter_web_candidates_parallel(parsed_query: Any) -> List[Dict[st
         logger.error("Paralel web scraping hatası.", error=str(e), query=query)
         return []
 
+def sweep_category(category: str, max_pages: int = LISTING_MAX_PAGES) -> List[Dict[str, Any]]:
+    """
+    CATEGORY_SITES'taki kategori sayfalarından toplu ürün çeker: her sayfa yüklemesi tek ürün yerine
+    sayfadaki tüm kartları (ad, fiyat, URL, özet spec) getirir. Siteler paralel gezilir.
+    """
+    sites = CATEGORY_SITES.get(category) or []
+    if not sites:
+        logger.warning(f"Kategori için liste sayfası tanımlı değil: {category}")
+        return []
+    products: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(sites))) as executor:
+        futures = {executor.submit(scrape_listing, domain, path, max_pages): domain for domain, path in sites}
+        for future in as_completed(futures):
+            try:
+                for p in future.result():
+                    p["category"] = category
+                    products.setdefault(p["url"], p)
+            except Exception as e:
+                logger.warning(f"Liste taraması hatası {futures[future]}: {str(e)}")
+    logger.info(f"Kategori taraması tamamlandı: {category} → {len(products)} ürün")
+    return list(products.values())
+
 def calculate_product_relevance(product: Dict[str, Any], query: str) -> float:
     """
     GÜNCELLENDİ: Puanı 0-100 arasına normalize eder.
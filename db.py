@@ -140,7 +140,9 @@ def create_tables():
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     url TEXT,
-                    source VARCHAR(100)
+                    source VARCHAR(100),
+                    price_checked_at TIMESTAMP,
+                    price_attempted_at TIMESTAMP
                 );
                 """)
                 # Add new columns if they don't exist
@@ -157,6 +159,13 @@ def create_tables():
                         IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='products' AND column_name='antutu_score') THEN
                             ALTER TABLE products ADD COLUMN antutu_score INTEGER;
                         END IF;
+                        IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='products' AND column_name='price_checked_at') THEN
+                            ALTER TABLE products ADD COLUMN price_checked_at TIMESTAMP;
+                        END IF;
+                        -- Başarısız fiyat yenilemeleri de damgalanır; yoksa aynı URL'ler her partinin başına geçer
+                        IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='products' AND column_name='price_attempted_at') THEN
+                            ALTER TABLE products ADD COLUMN price_attempted_at TIMESTAMP;
+                        END IF;
                     END
                     $$;
                 """)
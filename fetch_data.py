@@ -1,3 +1,4 @@
+import os
 import requests  # type: ignore
 from bs4 import BeautifulSoup  # type: ignore
 import re
@@ -7,9 +8,9 @@ import random
 from typing import Optional, Dict, Any, List
 from urllib.parse import quote_plus
 
+import http_pool
 from logger import (  # type: ignore
     get_logger,
-    retry_on_failure,
     handle_errors,
     monitor_performance,
     BenchmarkError
@@ -17,6 +18,15 @@ from logger import (  # type: ignore
 
 logger = get_logger("fetch_data")
 
+# Benchmark siteleri için yeniden deneme sayısı ve üstel bekleme katsayısı (adapter seviyesinde)
+HTTP_RETRIES = int(os.getenv("BENCHMARK_HTTP_RETRIES", "1"))
+HTTP_RETRY_BACKOFF = float(os.getenv("BENCHMARK_HTTP_BACKOFF", "2.0"))
+HTTP_POOL_SIZE = int(os.getenv("BENCHMARK_HTTP_POOL_SIZE", "4"))
+
+def _http_session():
+    return http_pool.get_session("benchmark", pool_maxsize=HTTP_POOL_SIZE, retries=HTTP_RETRIES,
+                                 backoff=HTTP_RETRY_BACKOFF)
+
 # User agents for rotation
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -165,14 +175,13 @@ def find_fallback_score(component_name: str, component_type: str) -> Optional[in
     logger.warning(f"No fallback benchmark found for {component_type}", component=normalized_name)
     return None
 
-@retry_on_failure(max_attempts=2, delay=2.0, exceptions=(requests.RequestException, BenchmarkError))
 @handle_errors(default_return=None, reraise=False)
 def _fetch_page_content(url: str, timeout: int = 15) -> Optional[str]:
     headers = get_random_headers()
     try:
         logger.debug("Fetching page", url=url)
         time.sleep(random.uniform(1.0, 3.0))
-        resp = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        resp = _http_session().get(url, headers=headers, timeout=timeout, allow_redirects=True)
         logger.debug("Response received", url=url, status_code=resp.status_code, content_length=len(resp.text) if hasattr(resp, 'text') else 0)
         if resp.status_code == 403:
             raise BenchmarkError("Web sayfası erişimi engellendi (403 Forbidden)", context={"url": url, "status_code": 403})
@@ -379,6 +388,8 @@ def health_check() -> Dict[str, Any]:
         "fallback_gpu_count": len(FALLBACK_GPU_BENCHMARKS),
         "fallback_antutu_count": len(FALLBACK_ANTUTU_BENCHMARKS),
         "user_agents_count": len(USER_AGENTS),
+        "http_retries": HTTP_RETRIES,
+        "http_pool": http_pool.stats().get("benchmark"),
         "status": "ok"
     }
 
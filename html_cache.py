@@ -0,0 +1,172 @@
+# html_cache.py - Kazınan sayfalar için içerik adresli, sıkıştırılmış disk önbelleği
+"""
+Düzen:
+  <SCRAPER_CACHE_DIR>/blobs/ab/<sha256>.html.gz  → HTML içeriği (aynı içerik tek kez saklanır)
+  <SCRAPER_CACHE_DIR>/index/<anahtar>.json       → kanonik URL + varyant → blob eşlemesi
+
+SCRAPER_MODE:
+  live   → önbellek kullanılmaz (varsayılan)
+  cache  → TTL içindeki kayıt varsa sayfa açılmaz, yoksa çekilip kaydedilir
+  record → her sayfa canlı çekilir ve kaydedilir
+  replay → sadece önbellekten okunur (TTL yok), ağa/tarayıcıya çıkılmaz
+"""
+import os
+import json
+import gzip
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any, Iterator
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", ".scraper_cache")
+CACHE_TTL = int(os.getenv("SCRAPER_CACHE_TTL", str(6 * 3600)))
+SCRAPER_MODE = os.getenv("SCRAPER_MODE", "live").strip().lower()
+MODES = ("live", "cache", "record", "replay")
+
+if SCRAPER_MODE not in MODES:
+    print(f"[HTMLCache] Geçersiz SCRAPER_MODE '{SCRAPER_MODE}', 'live' kullanılıyor.")
+    SCRAPER_MODE = "live"
+
+# Ürün sayfasının içeriğini değiştirmeyen izleme parametreleri. Önek eşleşmesi sadece utm_ ailesi için;
+# diğerleri tam adla eşleşir ("ref" atılır, "refurbished"/"ref_id" kalır)
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = frozenset({
+    "gclid", "gclsrc", "dclid", "fbclid", "yclid", "msclkid", "_ga", "_gl", "ref", "ref_", "srsltid",
+})
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0}
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+def canonical_url(url: str) -> str:
+    """Şema/host küçük harf, fragment ve izleme parametreleri atılmış, sorgu parametreleri sıralı URL."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(k)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(sorted(query)), ""))
+
+def _index_path(url: str, variant: str) -> str:
+    key = hashlib.sha1(f"{canonical_url(url)}|{variant}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, "index", f"{key}.json")
+
+def _blob_path(sha: str) -> str:
+    return os.path.join(CACHE_DIR, "blobs", sha[:2], f"{sha}.html.gz")
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Geçici dosyaya yazıp os.replace ile taşır; okuyan taraf yarım dosya görmez."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _bump(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+def load_blob(sha: str) -> Optional[str]:
+    try:
+        with gzip.open(_blob_path(sha), "rb") as f:
+            return f.read().decode("utf-8")
+    except (OSError, EOFError):
+        return None
+
+def get(url: str, variant: str, max_age: Optional[float] = CACHE_TTL) -> Optional[str]:
+    """Kayıt varsa (ve max_age içindeyse) HTML'i döndürür; max_age=None yaşa bakmaz."""
+    try:
+        with open(_index_path(url, variant), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        _bump("misses")
+        return None
+    if max_age is not None and time.time() - entry.get("stored_at", 0) > max_age:
+        _bump("expired")
+        return None
+    html = load_blob(entry.get("sha256", ""))
+    _bump("hits" if html else "misses")
+    return html
+
+def put(url: str, variant: str, html: str) -> str:
+    data = html.encode("utf-8")
+    sha = hashlib.sha256(data).hexdigest()
+    blob = _blob_path(sha)
+    if not os.path.exists(blob):
+        atomic_write(blob, gzip.compress(data, compresslevel=6))
+    entry = {
+        "url": url,
+        "canonical_url": canonical_url(url),
+        "variant": variant,
+        "sha256": sha,
+        "size": len(data),
+        "stored_at": time.time(),
+    }
+    atomic_write(_index_path(url, variant), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+    _bump("stores")
+    return sha
+
+def stored_at(url: str, variant: str) -> Optional[float]:
+    """Kaydın yazıldığı zaman (epoch); kayıt yoksa None."""
+    try:
+        with open(_index_path(url, variant), "r", encoding="utf-8") as f:
+            return json.load(f).get("stored_at")
+    except (OSError, ValueError):
+        return None
+
+def lookup(url: str, variant: str) -> Optional[str]:
+    """Moda göre önbellekten okur: cache → TTL'li, replay → TTL'siz, live/record → hiç."""
+    if SCRAPER_MODE == "cache":
+        return get(url, variant)
+    if SCRAPER_MODE == "replay":
+        return get(url, variant, max_age=None)
+    return None
+
+def should_fetch() -> bool:
+    """replay modunda canlı sayfa açılmaz."""
+    return SCRAPER_MODE != "replay"
+
+def reads() -> bool:
+    """cache/replay modlarında sayfa önbellekten (eski bir kayıttan) gelebilir."""
+    return SCRAPER_MODE in ("cache", "replay")
+
+def records() -> bool:
+    """cache/record modlarında canlı çekilen sayfanın HTML'i önbelleğe yazılmalıdır."""
+    return SCRAPER_MODE in ("cache", "record")
+
+def store(url: str, variant: str, html: Optional[str]) -> None:
+    if not html or not records():
+        return
+    try:
+        put(url, variant, html)
+    except OSError as e:
+        print(f"[HTMLCache] Kayıt yazılamadı: {e}")
+
+def iter_entries(variant: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Önbellekteki tüm kayıtları (index meta verisi) dolaşır; parser benchmark'ı ve regresyon için."""
+    index_dir = os.path.join(CACHE_DIR, "index")
+    if not os.path.isdir(index_dir):
+        return
+    for name in sorted(os.listdir(index_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(index_dir, name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if variant is None or entry.get("variant") == variant:
+            yield entry
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_stats)
+    return {"mode": SCRAPER_MODE, "dir": CACHE_DIR, "ttl_seconds": CACHE_TTL, **counters}
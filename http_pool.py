@@ -0,0 +1,94 @@
+# http_pool.py - Paylaşılan, keep-alive'lı requests oturumları (retry/backoff adapter'ları ve bağlantı metrikleri)
+"""
+Her istemci (Brave araması, benchmark siteleri, scraper HTTP yolu) adıyla tek bir Session paylaşır; TCP + TLS
+bağlantıları thread'ler ve istekler arasında yeniden kullanılır. Session ilk get_session çağrısında kurulur.
+
+- pool_maxsize: host başına açık tutulan bağlantı sayısı; host_pools ile belirli hostlar için ayrıca ayarlanır
+- retries/backoff: bağlantı hataları ve status_forcelist yanıtları adapter içinde üstel beklemeyle yeniden
+  denenir (Retry-After başlığına uyulur); son yanıt hata koduyla çağırana döner
+- stats(): host başına istek, açılan bağlantı ve yeniden kullanım oranı (urllib3 havuz sayaçları)
+"""
+import threading
+from typing import Optional, Dict, Any, Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Session başına saklanan host havuzu sayısı; aşılırsa en eski havuz (ve sayaçları) düşer
+POOL_CONNECTIONS = 32
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_LOCK = threading.Lock()
+
+def _adapter(pool_maxsize: int, retries: int, backoff: float, status_forcelist: Iterable[int]) -> HTTPAdapter:
+    retry = Retry(
+        total=max(0, retries),
+        connect=max(0, retries),
+        read=max(0, retries),
+        status=max(0, retries),
+        backoff_factor=backoff,
+        status_forcelist=tuple(status_forcelist),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=max(1, pool_maxsize), max_retries=retry)
+
+def get_session(name: str, pool_maxsize: int = 10, retries: int = 0, backoff: float = 0.5,
+                status_forcelist: Iterable[int] = (429, 500, 502, 503, 504),
+                host_pools: Optional[Dict[str, int]] = None) -> requests.Session:
+    """
+    name için paylaşılan Session'ı döndürür (yoksa kurar). host_pools: {"https://api.example.com/": 8} gibi
+    URL öneki → o host için bağlantı havuzu boyutu. Ayarlar sadece ilk çağrıda uygulanır.
+    """
+    with _LOCK:
+        session = _SESSIONS.get(name)
+        if session is None:
+            session = requests.Session()
+            default = _adapter(pool_maxsize, retries, backoff, status_forcelist)
+            session.mount("https://", default)
+            session.mount("http://", default)
+            for prefix, size in (host_pools or {}).items():
+                session.mount(prefix, _adapter(size, retries, backoff, status_forcelist))
+            _SESSIONS[name] = session
+        return session
+
+def _pool_stats(session: requests.Session) -> Dict[str, Dict[str, Any]]:
+    hosts: Dict[str, Dict[str, Any]] = {}
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}" + (f":{pool.port}" if pool.port else "")
+            entry = hosts.setdefault(host, {"requests": 0, "connections": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+    for entry in hosts.values():
+        entry["reuse_ratio"] = round(1 - entry["connections"] / entry["requests"], 3) if entry["requests"] else None
+    return hosts
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        sessions = dict(_SESSIONS)
+    out: Dict[str, Any] = {}
+    for name, session in sessions.items():
+        hosts = _pool_stats(session)
+        requests_total = sum(h["requests"] for h in hosts.values())
+        connections_total = sum(h["connections"] for h in hosts.values())
+        out[name] = {
+            "requests": requests_total,
+            "connections": connections_total,
+            "reuse_ratio": round(1 - connections_total / requests_total, 3) if requests_total else None,
+            "hosts": hosts,
+        }
+    return out
+
+def close_all() -> None:
+    with _LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
@@ -219,6 +219,99 @@ def load_benchmarks_with_fallback() -> Dict[str, Any]:
         result["gpu"] = load_gpu_benchmarks(source="fallback")
     return result
 
+@monitor_performance
+@handle_errors(reraise=True)
+def load_listing_products(category: str, max_pages: Optional[int] = None) -> int:
+    """Kategori liste sayfalarından toplu çekilen ürünleri products tablosuna UPSERT eder."""
+    from candidates import sweep_category, LISTING_MAX_PAGES
+    swept = sweep_category(category, max_pages or LISTING_MAX_PAGES)
+    logger.info(f"{category} kategorisi için {len(swept)} ürün yükleniyor...")
+    success_count = 0
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            for p in swept:
+                if not p.get('name') or not p.get('price'):
+                    continue
+                specs = p.get('specs') or {}
+                try:
+                    # Liste kartındaki özet spec boşsa mevcut (detay sayfasından gelmiş) spec korunur
+                    cur.execute("""
+                        INSERT INTO products (category, name, brand, price, cpu_name, gpu_name, specs, url, source)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s)
+                        ON CONFLICT (name)
+                        DO UPDATE SET
+                            price = EXCLUDED.price,
+                            brand = COALESCE(products.brand, EXCLUDED.brand),
+                            cpu_name = COALESCE(products.cpu_name, EXCLUDED.cpu_name),
+                            gpu_name = COALESCE(products.gpu_name, EXCLUDED.gpu_name),
+                            specs = CASE WHEN EXCLUDED.specs = '{}'::jsonb THEN products.specs ELSE EXCLUDED.specs END,
+                            url = EXCLUDED.url,
+                            source = EXCLUDED.source,
+                            updated_at = CURRENT_TIMESTAMP;
+                    """, (
+                        category,
+                        p['name'][:255],
+                        (p.get('brand') or None) and p['brand'][:50],
+                        int(p['price']),
+                        specs.get('CPU') or specs.get('İşlemci'),
+                        specs.get('GPU') or specs.get('Ekran Kartı'),
+                        json.dumps(specs, ensure_ascii=False),
+                        p.get('url'),
+                        p.get('source'),
+                    ))
+                    success_count += 1
+                except psycopg2.Error as e:
+                    logger.error("Liste ürünü yükleme hatası", product_name=p.get('name'), error=str(e))
+                    conn.rollback()
+            conn.commit()
+
+    logger.info(f"✅ {category}: {success_count}/{len(swept)} liste ürünü yüklendi/güncellendi.")
+    return success_count
+
+@monitor_performance
+@handle_errors(reraise=True)
+def refresh_product_prices(limit: int = 500, older_than_hours: float = 20, max_workers: int = 8) -> int:
+    """
+    URL'i bilinen ürünlerin sadece fiyatını yeniler; price, price_checked_at ve price_attempted_at dışında alan
+    değişmez. Başarısız URL'ler de price_attempted_at ile damgalanır ve older_than_hours dolmadan tekrar denenmez.
+    """
+    from scraper import refresh_prices
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT id, url FROM products
+                WHERE url IS NOT NULL AND url <> ''
+                  AND COALESCE(price_attempted_at, price_checked_at, '-infinity') < NOW() - make_interval(secs => %s)
+                ORDER BY COALESCE(price_attempted_at, price_checked_at) NULLS FIRST
+                LIMIT %s;
+            """, (older_than_hours * 3600, limit))
+            rows = cur.fetchall()
+
+    ids_by_url: Dict[str, List[int]] = {}
+    for row in rows:
+        ids_by_url.setdefault(row['url'], []).append(row['id'])
+    logger.info(f"Fiyat yenileme başlıyor: {len(ids_by_url)} URL")
+    refreshed = refresh_prices(list(ids_by_url), max_workers=max_workers)
+
+    updated = 0
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            for r in refreshed:
+                cur.execute("""
+                    UPDATE products SET price = %s, price_checked_at = to_timestamp(%s), price_attempted_at = NOW()
+                    WHERE id = ANY(%s);
+                """, (int(r['price']), r['price_checked_at'], ids_by_url[r['url']]))
+                updated += cur.rowcount
+            refreshed_urls = {r['url'] for r in refreshed}
+            failed_ids = [i for url, ids in ids_by_url.items() if url not in refreshed_urls for i in ids]
+            if failed_ids:
+                cur.execute("UPDATE products SET price_attempted_at = NOW() WHERE id = ANY(%s);", (failed_ids,))
+            conn.commit()
+
+    logger.info(f"✅ Fiyat yenileme tamamlandı: {updated} ürün güncellendi, {len(ids_by_url) - len(refreshed)} URL başarısız.")
+    return updated
+
 if __name__ == "__main__":
     # 1) Veritabanı şemasını hazırla/güncelle
     create_tables()
@@ -1,11 +1,13 @@
 import os
 import re
+import json
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import math
 
 from fastapi import FastAPI  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
 from pydantic import BaseModel  # type: ignore
 from dotenv import load_dotenv  # type: ignore
 load_dotenv()
@@ -13,6 +15,12 @@ load_dotenv()
 from candidates import gather_candidates, CATEGORY_SITES
 from utils import normalize_category
 from db import get_final_score_by_name
+from scraper import shutdown_driver_pool, resolve_chromedriver, health_check as scraper_health
+from async_scraper import scrape_stream
+import seen_pages
+import search_cache
+import search_yield
+import http_pool
 
 # OpenAI opsiyonel
 try:
@@ -25,6 +33,19 @@ client = OpenAI(api_key=OPENAI_API_KEY) if (OPENAI_API_KEY and OpenAI) else None
 
 app = FastAPI(title="Tech Advisor API", version="2.6")
 
+@app.on_event("startup")
+def _warm_scraper():
+    # chromedriver yolunu ilk istekten önce bir kez çöz
+    try:
+        resolve_chromedriver()
+    except Exception as e:
+        print(f"[startup] chromedriver çözümlenemedi: {e}")
+
+@app.on_event("shutdown")
+def _shutdown_scraper():
+    # Havuzdaki Chrome örneklerini temiz kapat
+    shutdown_driver_pool()
+
 # ----------------------- Yardımcılar -----------------------
 def parse_budget_tl(text: str):  # type: (str) -> Optional[int]
     """
@@ -137,6 +158,11 @@ def health_check():
             "GOOGLE_CSE_KEY": bool(os.getenv("GOOGLE_CSE_KEY")),
             "GOOGLE_CSE_CX": bool(os.getenv("GOOGLE_CSE_CX")),
         },
+        "scraper": scraper_health(),
+        "seen_pages": seen_pages.stats(),
+        "search_cache": search_cache.stats(),
+        "search_yield": search_yield.stats(),
+        "http_pools": http_pool.stats(),
         "version": "health-2"
     }
 
@@ -189,6 +215,17 @@ def debug_candidates(q: str = "30.000 TL hafif laptop", n: int = 12, top: int =
         "candidates": top_cands,
     }
 
+@app.get("/debug/scrape")
+async def debug_scrape(urls: str, task_timeout: float = 20, total_timeout: float = 45):
+    """Virgülle ayrılmış URL'leri async motorla kazır; her sonuç bittiği anda bir NDJSON satırı olarak gönderilir."""
+    url_list = [u.strip() for u in urls.split(",") if u.strip()]
+
+    async def lines():
+        async for url, data in scrape_stream(url_list, task_timeout=task_timeout, total_timeout=total_timeout):
+            yield json.dumps({"url": url, "ok": bool(data), "data": data}, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 # --- Klasik öneri: GET /products/recommend ---
 @app.get("/products/recommend")
 def recommend_engine(query: str):
@@ -0,0 +1,37 @@
+# rate_limit.py - Thread-safe token bucket (scraper nezaket zamanlayıcısı ve Brave istek limiti ortak kullanır)
+"""
+rate: saniyede eklenen hak, capacity: birikebilecek en fazla hak (burst).
+
+  bucket = TokenBucket(rate=1.0, burst=2)
+  wait_s = bucket.try_take()   # 0 → hak alındı; >0 → bir sonraki hakka kalan süre
+  bucket.drain()               # 429 gibi bir geri çevrilme sonrası birikmiş hakları sıfırlar
+"""
+import time
+import threading
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(0.01, float(rate))
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_take(self) -> float:
+        """Token varsa düşer ve 0 döndürür; yoksa bir sonraki token'a kalan süreyi döndürür."""
+        with self._lock:
+            self._refill(time.time())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def drain(self) -> None:
+        """Birikmiş hakları sıfırlar; sonraki istekler plan hızında (1/rate aralıkla) devam eder."""
+        with self._lock:
+            self._refill(time.time())
+            self._tokens = min(self._tokens, 0.0)
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 """
 Hepsiburada, Trendyol, Vatan, İncehesap, Amazon.com.tr, MediaMarkt, N11, Itopya, Gaming.gen.tr ve Gamegaraj destekli scraper.
-- Akıllı bekleme: çoklu seçici + görünürlük
+- Tarayıcı siteleri: in-page JS extractor (page_source aktarılmaz), eksik veride parser fallback
+- Akıllı bekleme: çoklu seçici + görünürlük, DOM/ağ sessizliği; site başına toplam bekleme bütçesi
+- Kapsamlı ayrıştırma (site bazında, SCRAPER_PARSE_SCOPE): sadece ürün alt ağaçları soup'a alınır, CSS seçicileri önbellekte derlenir
 - HB: 'Tüm Özellikler' sekmesini açmayı dener; detay tablo → özet tablo fallback
 - TY: HTML attributes + JSON-LD (additionalProperty) fallback
 - Vatan: Alternatif seçiciler + JSON-LD offers.name/price fallback
@@ -15,23 +17,56 @@ Hepsiburada, Trendyol, Vatan, İncehesap, Amazon.com.tr, MediaMarkt, N11, Itopya
 """
 
 from __future__ import annotations
+import os
 import re
 import json
 import time
 import random
-from typing import Dict, Any, Optional, List
-
+import asyncio
+import atexit
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
 from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
+import soupsieve
+
+import html_cache
+import http_pool
+from rate_limit import TokenBucket
+
+# psutil requirements.txt'te; yoksa bellek tavanı kontrolü ve tarayıcı denetçisi çalışmaz (başlangıçta uyarılır)
+try:
+    import psutil  # type: ignore
+except Exception:
+    psutil = None
+
+PSUTIL_MISSING_WARNING = (
+    "psutil yüklü değil: tarayıcı denetçisi, yetim süreç temizliği ve RSS tavanları devre dışı "
+    "(pip install psutil)"
+)
 
 # --- Selenium ---
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 # =========================
 # Genel ayarlar
@@ -52,11 +87,200 @@ USER_AGENTS = [
 def _pick_ua() -> str:
     return random.choice(USER_AGENTS)
 
+# =========================
+# Zamanlama istatistikleri
+# =========================
+
+_TIMINGS: Dict[str, deque] = {}
+_COUNTERS: Dict[str, int] = {}
+_STATS_LOCK = threading.Lock()
+
+def _record_timing(key: str, seconds: float) -> None:
+    with _STATS_LOCK:
+        _TIMINGS.setdefault(key, deque(maxlen=500)).append(seconds)
+
+def _count(key: str, n: int = 1) -> None:
+    with _STATS_LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + n
+
+def timing_summary() -> Dict[str, Any]:
+    """Son ölçümlerin adet/ortalama/p50/p95 özetini döndürür (ms)."""
+    with _STATS_LOCK:
+        snapshot = {k: sorted(v) for k, v in _TIMINGS.items() if v}
+        counters = dict(_COUNTERS)
+    summary: Dict[str, Any] = {}
+    for key, values in snapshot.items():
+        n = len(values)
+        summary[key] = {
+            "count": n,
+            "avg_ms": round(sum(values) / n * 1000, 1),
+            "p50_ms": round(values[n // 2] * 1000, 1),
+            "p95_ms": round(values[min(n - 1, int(n * 0.95))] * 1000, 1),
+        }
+    transfer = {
+        key.split(":", 1)[1]: round(counters[key] / max(1, counters.get("transfer_pages:" + key.split(":", 1)[1], 0)) / 1024, 1)
+        for key in counters if key.startswith("transfer_bytes:")
+    }
+    return {"timings": summary, "counters": counters, "transfer_kb_per_page": transfer}
+
+# =========================
+# HTTP hızlı yol
+# =========================
+
+HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("SCRAPER_HTTP_POOL_SIZE", "10"))
+
+# Devre kesici sadece getirme hatalarını sayar: _run_guarded her deneme için yeni bir liste kurar, HTTP/tarayıcı
+# yolları ağ hatası, engel kodu (403/429/5xx) ve kısa/boş sayfa (bot koruması) durumunda buraya not düşer.
+# Sayfa açılıp ayrıştırıcı ürün bulamazsa (kategori/ürün dışı URL) liste boş kalır ve site hatası sayılmaz.
+_FETCH_FAILURES: ContextVar[Optional[List[str]]] = ContextVar("_FETCH_FAILURES", default=None)
+HTTP_BLOCK_STATUSES = {403, 429}
+
+def _note_fetch_failure(reason: str) -> None:
+    failures = _FETCH_FAILURES.get()
+    if failures is not None:
+        failures.append(reason)
+
+def _http_session() -> requests.Session:
+    # Yeniden deneme yok: başarısız sayfa devre kesiciye sayılır, gerekirse tarayıcı yoluna geçilir
+    return http_pool.get_session("scraper", pool_maxsize=HTTP_POOL_SIZE, retries=0)
+
+def get_page_html_with_http(url: str) -> Optional[str]:
+    """Sayfayı tarayıcısız, keep-alive'lı tek bir GET ile çeker. Sunucu tarafında render edilmiş HTML için."""
+    cached = html_cache.lookup(url, "http")
+    if cached is not None:
+        print(f"[Scraper] HTML önbellekten alındı (http): {url[:80]}")
+        return cached
+    if not html_cache.should_fetch():
+        return None
+    start = time.time()
+    try:
+        resp = _http_session().get(url, headers=_http_headers(), timeout=HTTP_TIMEOUT, allow_redirects=True)
+    except requests.RequestException as e:
+        print(f"[Scraper] HTTP hatası: {e}")
+        _note_fetch_failure("http_error")
+        return None
+    finally:
+        _record_timing("http_fetch", time.time() - start)
+    return _accept_http_html(url, resp.status_code, resp.text)
+
+def _http_headers() -> Dict[str, str]:
+    return {
+        "User-Agent": _pick_ua(),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "tr-TR,tr;q=0.9,en;q=0.5",
+    }
+
+def _accept_http_html(url: str, status_code: int, html: Optional[str]) -> Optional[str]:
+    """HTTP yanıtını (senkron veya async istemciden) doğrular ve önbelleğe yazar."""
+    if status_code != 200:
+        print(f"[Scraper] HTTP {status_code}: {url[:80]}")
+        if status_code in HTTP_BLOCK_STATUSES or status_code >= 500:
+            _note_fetch_failure(f"http_{status_code}")
+        return None
+    if not html or len(html) < 3000:
+        print("[Scraper] Uyarı: HTTP ile kısa/boş HTML alındı.")
+        _note_fetch_failure("http_short")
+        return None
+    print(f"[Scraper] HTTP başarılı: {len(html)} karakter alındı.")
+    html_cache.store(url, "http", html)
+    return html
+
 # =========================
 # Selenium yardımcıları
 # =========================
 
-def _build_driver() -> webdriver.Chrome:
+_CHROMEDRIVER_LOCK = threading.Lock()
+_CHROMEDRIVER_INFO: Dict[str, Any] = {}
+
+def resolve_chromedriver() -> str:
+    """
+    chromedriver yolunu süreç başına bir kez çözer.
+    Öncelik: CHROMEDRIVER_PATH (sabitlenmiş yol) → webdriver-manager → PATH üzerindeki chromedriver.
+    """
+    with _CHROMEDRIVER_LOCK:
+        if _CHROMEDRIVER_INFO.get("path"):
+            return _CHROMEDRIVER_INFO["path"]
+        start = time.time()
+        path, source, error = os.getenv("CHROMEDRIVER_PATH"), "env", None
+        if path and not os.path.isfile(path):
+            error, path = f"CHROMEDRIVER_PATH bulunamadı: {path}", None
+        if not path:
+            try:
+                path, source = ChromeDriverManager().install(), "webdriver_manager"
+            except Exception as e:
+                error = str(e)
+                path, source = shutil.which("chromedriver"), "path"
+        if not path:
+            _CHROMEDRIVER_INFO.update({"error": error, "resolution_ms": round((time.time() - start) * 1000, 2)})
+            raise WebDriverException(f"chromedriver çözümlenemedi: {error}")
+        _CHROMEDRIVER_INFO.update({
+            "path": path,
+            "source": source,
+            "resolution_ms": round((time.time() - start) * 1000, 2),
+            "resolved_at": time.time(),
+            "error": error,
+        })
+        print(f"[Scraper] chromedriver çözümlendi ({source}): {path}")
+        return path
+
+def _chrome_service() -> ChromeService:
+    # Service kendi chromedriver sürecini yönettiği için her driver'a yenisi verilir; pahalı olan yol çözümü önbellekte
+    return ChromeService(resolve_chromedriver())
+
+BLOCK_RESOURCES = os.getenv("SCRAPER_BLOCK_RESOURCES", "1") == "1"
+PAGE_LOAD_STRATEGY = os.getenv("SCRAPER_PAGE_LOAD_STRATEGY", "eager")
+
+# Parser'ların hiç kullanmadığı kaynaklar: görsel, font, medya ve reklam/analitik scriptleri
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*facebook.net*", "*connect.facebook.com*",
+    "*hotjar.com*", "*criteo.com*", "*criteo.net*", "*useinsider.com*", "*clarity.ms*",
+    "*tiktok.com*", "*yandex.ru*", "*segment.io*", "*newrelic.com*", "*nr-data.net*",
+]
+
+# Isıtılmış profil şablonu: onay çerezleri + HTTP disk önbelleği. Her driver şablonun geçici bir kopyasıyla açılır.
+# Şablon git dışı bir dizinde tutulur ve `python scraper.py --refresh-profile` ile oluşturulur; dizin yoksa
+# driver'lar boş profille açılır. Depodaki chrome_profile/ şablon olarak kullanılmaz ve hiç yazılmaz.
+PROFILE_TEMPLATE_DIR = os.getenv("SCRAPER_PROFILE_TEMPLATE", ".scraper_profile")
+USE_PROFILE_TEMPLATE = os.getenv("SCRAPER_USE_PROFILE", "1") == "1"
+_TRACKED_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chrome_profile")
+# Kopyalanmayan dosyalar: başka bir Chrome'un kilitleri ve makineye özgü GPU önbellekleri
+_PROFILE_IGNORE = shutil.ignore_patterns("Singleton*", "DevToolsActivePort", "Crashpad", "GrShaderCache",
+                                         "GraphiteDawnCache", "ShaderCache", "GPUCache", "DawnGraphiteCache",
+                                         "DawnWebGPUCache")
+
+def _copy_profile() -> Optional[str]:
+    """Şablon profili worker'a özel geçici bir dizine kopyalar; şablon yoksa/kopya başarısızsa None."""
+    if not USE_PROFILE_TEMPLATE or not os.path.isdir(PROFILE_TEMPLATE_DIR):
+        return None
+    dst = tempfile.mkdtemp(prefix="ta_chrome_")
+    try:
+        shutil.copytree(PROFILE_TEMPLATE_DIR, dst, ignore=_PROFILE_IGNORE, dirs_exist_ok=True)
+        return dst
+    except (OSError, shutil.Error) as e:
+        print(f"[Scraper] Profil şablonu kopyalanamadı, boş profil kullanılacak: {e}")
+        shutil.rmtree(dst, ignore_errors=True)
+        return None
+
+def _quit_driver(driver: webdriver.Chrome) -> None:
+    """driver.quit() + varsa geçici profil kopyasının silinmesi."""
+    try:
+        driver.quit()
+    finally:
+        # quit() başarısız olsa bile geride kalan chromedriver/Chrome süreçleri sonlandırılır
+        _SUPERVISOR.unregister(driver)
+        with _NETWORK_TRACKERS_LOCK:
+            _NETWORK_TRACKERS.pop(driver, None)
+        profile_dir = getattr(driver, "_profile_dir", None)
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+def _build_driver(extra_args: Optional[List[str]] = None, profile_dir: Optional[str] = None) -> webdriver.Chrome:
+    """profile_dir verilirse o dizin doğrudan kullanılır (şablon yenileme); yoksa şablonun kopyası açılır."""
     opts = Options()
     opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
@@ -67,51 +291,998 @@ def _build_driver() -> webdriver.Chrome:
     opts.add_experimental_option("useAutomationExtension", False)
     opts.add_argument(f"user-agent={_pick_ua()}")
     opts.add_argument("--lang=tr-TR,tr")
+    # Süreci başlatan Python'u işaretler; sahibi ölmüş Chrome'ları denetçi bu argümanla bulur
+    opts.add_argument(f"{OWNER_FLAG}={os.getpid()}")
+    for arg in extra_args or []:
+        opts.add_argument(arg)
+    temp_profile = None if profile_dir else _copy_profile()
+    if profile_dir or temp_profile:
+        opts.add_argument(f"--user-data-dir={profile_dir or temp_profile}")
+    if PAGE_LOAD_STRATEGY in ("normal", "eager", "none"):
+        opts.page_load_strategy = PAGE_LOAD_STRATEGY
+    if BLOCK_RESOURCES:
+        opts.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    if WAIT_NETWORK_LOG:
+        # wait_network_idle için CDP Network olayları performance log'una düşer
+        opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
 
-    driver = webdriver.Chrome(
-        service=ChromeService(ChromeDriverManager().install()),
-        options=opts,
-    )
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    driver.set_page_load_timeout(60)
+    try:
+        driver = webdriver.Chrome(
+            service=_chrome_service(),
+            options=opts,
+        )
+    except Exception:
+        if temp_profile:
+            shutil.rmtree(temp_profile, ignore_errors=True)
+        raise
+    driver._profile_dir = temp_profile
+    _SUPERVISOR.register(driver)
+    try:
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.set_page_load_timeout(60)
+        driver.set_script_timeout(30)
+    except Exception:
+        _quit_driver(driver)
+        raise
     return driver
 
-def _scroll_soft(driver: webdriver.Chrome, steps: int = 4, pause: float = 0.6):
+def _apply_resource_blocking(driver: webdriver.Chrome) -> None:
+    """CDP ile engellenecek URL desenlerini ayarlar. Görseller ayrıca Chrome tercihiyle tarayıcı genelinde kapalıdır."""
+    if not BLOCK_RESOURCES:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print(f"[Scraper] Kaynak engelleme ayarlanamadı: {e}")
+
+def _wait_page_complete(driver: webdriver.Chrome, timeout: float = 15) -> None:
+    """'eager' yükleme stratejisinde, tam yükleme gerektiren siteler için readyState=complete bekler."""
+    try:
+        WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    except TimeoutException:
+        print("[Scraper] readyState=complete için zaman aşımı, devam ediliyor...")
+
+_TRANSFER_SIZE_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+let total = nav ? (nav.transferSize || 0) : 0;
+for (const r of performance.getEntriesByType('resource')) { total += (r.transferSize || 0); }
+return total;
+"""
+
+def _page_transfer_bytes(driver: webdriver.Chrome) -> Optional[int]:
+    try:
+        return int(driver.execute_script(_TRANSFER_SIZE_JS) or 0)
+    except Exception:
+        return None
+
+# =========================
+# Bekleme araçları
+# =========================
+
+DEFAULT_WAIT_BUDGET = float(os.getenv("SCRAPER_WAIT_BUDGET", "10"))
+# Zorunlu seçiciler (wait_for_any) için taban bekleme; bütçeden bağımsızdır, site bazında 'capture_wait' ile değişir.
+# Seçici bulununca hemen dönülür, taban süre sadece yavaş/bozuk sayfada harcanır.
+DEFAULT_CAPTURE_WAIT = float(os.getenv("SCRAPER_CAPTURE_WAIT", "35"))
+
+class WaitBudget:
+    """Sayfa başına toplam bekleme bütçesi; hook'lardaki tüm beklemeler bu süreden düşer."""
+
+    def __init__(self, total: float = DEFAULT_WAIT_BUDGET):
+        self.total = float(total)
+        self.started_at = time.time()
+
+    def remaining(self) -> float:
+        return max(0.0, self.total - (time.time() - self.started_at))
+
+    def take(self, timeout: float) -> float:
+        """İstenen bekleme süresini kalan bütçeyle sınırlar."""
+        return min(float(timeout), self.remaining())
+
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0
+
+    def spent(self) -> float:
+        return time.time() - self.started_at
+
+def _wait_timeout(timeout: float, budget: Optional[WaitBudget]) -> float:
+    return budget.take(timeout) if budget else timeout
+
+# Son DOM değişikliğinden sonra quiet_ms boyunca mutasyon olmazsa true, timeout_ms dolarsa false döner
+_DOM_QUIET_JS = """
+const quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+let quietTimer = null, hardTimer = null, observer = null;
+const finish = (ok) => {
+    if (observer) observer.disconnect();
+    clearTimeout(quietTimer); clearTimeout(hardTimer);
+    done(ok);
+};
+const arm = () => { clearTimeout(quietTimer); quietTimer = setTimeout(() => finish(true), quietMs); };
+observer = new MutationObserver(arm);
+observer.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true, characterData: true});
+hardTimer = setTimeout(() => finish(false), timeoutMs);
+arm();
+"""
+
+def wait_dom_quiet(driver: webdriver.Chrome, quiet_ms: int = 300, timeout: float = 3.0,
+                   budget: Optional[WaitBudget] = None) -> bool:
+    """DOM quiet_ms boyunca değişmeyene kadar bekler (MutationObserver); sabit sleep yerine kullanılır."""
+    timeout = _wait_timeout(timeout, budget)
+    if timeout <= 0:
+        return False
+    start = time.time()
+    try:
+        return bool(driver.execute_async_script(_DOM_QUIET_JS, int(quiet_ms), int(timeout * 1000)))
+    except WebDriverException:
+        return False
+    finally:
+        _record_timing("wait_dom_quiet", time.time() - start)
+
+_ELEMENT_COUNT_JS = """
+try { return document.querySelectorAll(arguments[0]).length; } catch (e) { return -1; }
+"""
+
+def wait_element_count(driver: webdriver.Chrome, selector: str, min_count: int = 1, timeout: float = 5.0,
+                       budget: Optional[WaitBudget] = None, poll: float = 0.05, max_poll: float = 0.4) -> int:
+    """selector'a uyan eleman sayısı min_count'a ulaşana kadar bekler; son görülen sayıyı döndürür."""
+    end = time.time() + _wait_timeout(timeout, budget)
+    interval = poll
+    count = 0
+    while True:
+        try:
+            count = int(driver.execute_script(_ELEMENT_COUNT_JS, selector) or 0)
+        except WebDriverException:
+            count = 0
+        if count >= min_count:
+            return count
+        remaining = end - time.time()
+        if remaining <= 0:
+            return count
+        time.sleep(min(interval, remaining))
+        interval = min(max_poll, interval * 1.5)
+
+# CDP Network olayları 'performance' log'undan okunur (bkz. _build_driver: goog:loggingPrefs)
+WAIT_NETWORK_LOG = os.getenv("SCRAPER_WAIT_NETWORK_LOG", "1") == "1"
+
+# Sürücü → izleyici; driver nesnesine öznitelik eklemek yerine burada tutulur (driver kapanınca kayıt düşer)
+_NETWORK_TRACKERS: "weakref.WeakKeyDictionary[webdriver.Chrome, _NetworkTracker]" = weakref.WeakKeyDictionary()
+_NETWORK_TRACKERS_LOCK = threading.Lock()
+
+class _NetworkTracker:
+    """Sürücünün performance log'undaki Network olaylarından uçuştaki istekleri izler."""
+
+    def __init__(self):
+        self.inflight = set()
+        self.last_activity = time.time()
+
+    def drain(self, driver: webdriver.Chrome) -> bool:
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return False
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = msg.get("method", "")
+            request_id = (msg.get("params") or {}).get("requestId")
+            if method == "Network.requestWillBeSent":
+                self.inflight.add(request_id)
+                self.last_activity = time.time()
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                self.inflight.discard(request_id)
+                self.last_activity = time.time()
+        return True
+
+def _reset_network_tracker(driver: webdriver.Chrome) -> None:
+    """Yeni navigasyondan önce eski log kayıtlarını boşaltır ve izleyiciyi sıfırlar."""
+    if not WAIT_NETWORK_LOG:
+        return
+    tracker = _NetworkTracker()
+    tracker.drain(driver)
+    tracker.inflight.clear()
+    with _NETWORK_TRACKERS_LOCK:
+        _NETWORK_TRACKERS[driver] = tracker
+
+def wait_network_idle(driver: webdriver.Chrome, idle_ms: int = 500, timeout: float = 5.0,
+                      budget: Optional[WaitBudget] = None, max_inflight: int = 0) -> bool:
+    """Uçuştaki istek sayısı idle_ms boyunca max_inflight'ı aşmayana kadar bekler (CDP Network olayları)."""
+    with _NETWORK_TRACKERS_LOCK:
+        tracker = _NETWORK_TRACKERS.get(driver)
+    if tracker is None:
+        # performance log yoksa DOM sessizliği en yakın ölçüttür
+        return wait_dom_quiet(driver, quiet_ms=idle_ms, timeout=timeout, budget=budget)
+    start = time.time()
+    end = start + _wait_timeout(timeout, budget)
+    idle = False
+    while True:
+        if not tracker.drain(driver):
+            break
+        now = time.time()
+        if len(tracker.inflight) <= max_inflight and now - tracker.last_activity >= idle_ms / 1000.0:
+            idle = True
+            break
+        if now >= end:
+            break
+        time.sleep(min(0.1, end - now))
+    _record_timing("wait_network_idle", time.time() - start)
+    return idle
+
+def _scroll_soft(driver: webdriver.Chrome, steps: int = 4, pause: float = 0.6, budget: Optional[WaitBudget] = None):
+    """Sayfayı adım adım kaydırır; her adımda en fazla 'pause' kadar, DOM durulana dek bekler."""
     for _ in range(steps):
         driver.execute_script("window.scrollBy(0, document.body.scrollHeight/4);")
-        time.sleep(pause)
+        wait_dom_quiet(driver, quiet_ms=150, timeout=pause, budget=budget)
+
+# Tüm seçicileri tek execute_script çağrısında sırayla dener; eşleşen ilk seçicinin indeksini döndürür (-1: yok)
+_MATCH_ANY_SELECTOR_JS = """
+const selectors = arguments[0], visible = arguments[1];
+const isVisible = (el) => {
+    const style = window.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none' || parseFloat(style.opacity) === 0) return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+};
+for (let i = 0; i < selectors.length; i++) {
+    let nodes;
+    try { nodes = document.querySelectorAll(selectors[i]); } catch (e) { continue; }
+    if (!nodes.length) continue;
+    if (!visible) return i;
+    for (const el of nodes) { if (isVisible(el)) return i; }
+}
+return -1;
+"""
 
-def wait_any_selector(driver: webdriver.Chrome, selectors: List[str], timeout: int = 60, visible: bool = True) -> str:
+def wait_any_selector(driver: webdriver.Chrome, selectors: List[str], timeout: float = 60, visible: bool = True,
+                      poll: float = 0.05, max_poll: float = 0.5) -> str:
+    """
+    Seçicilerden herhangi biri (görünür) olana kadar bekler ve eşleşen seçiciyi döndürür.
+    Her yoklama tek bir WebDriver round-trip'idir; yoklama aralığı poll'dan max_poll'a kadar büyür.
+    """
     end = time.time() + timeout
+    interval = poll
     last_err = None
-    while time.time() < end:
-        for sel in selectors:
-            try:
-                if visible:
-                    WebDriverWait(driver, 2).until(EC.visibility_of_element_located((By.CSS_SELECTOR, sel)))
-                else:
-                    WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, sel)))
+    while True:
+        try:
+            idx = driver.execute_script(_MATCH_ANY_SELECTOR_JS, list(selectors), bool(visible))
+            if isinstance(idx, int) and idx >= 0:
+                sel = selectors[idx]
                 print(f"[Scraper] Seçici bulundu: {sel}")
                 return sel
-            except Exception as e:
-                last_err = e
-        time.sleep(0.5)
-    if last_err:
-        raise last_err
-    raise TimeoutException(f"Seçicilerden hiçbiri bulunamadı: {selectors}")
-
-def click_if_exists(driver: webdriver.Chrome, selectors: List[str], by: By = By.CSS_SELECTOR) -> bool:
-    for sel in selectors:
+        except WebDriverException as e:
+            # Navigasyon sırasında script hatası olabilir, bir sonraki turda tekrar denenir
+            last_err = e
+        remaining = end - time.time()
+        if remaining <= 0:
+            break
+        time.sleep(min(interval, remaining))
+        interval = min(max_poll, interval * 1.5)
+    raise TimeoutException(f"Seçicilerden hiçbiri bulunamadı: {selectors}" + (f" (son hata: {last_err})" if last_err else ""))
+
+# Seçicileri sırayla dener; görünür ve etkin ilk elemanı ortalayıp JS ile tıklar, seçici indeksini döndürür (-1: yok)
+_CLICK_FIRST_JS = """
+const selectors = arguments[0], useXpath = arguments[1];
+const isClickable = (el) => {
+    if (el.disabled) return false;
+    const style = window.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none') return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+};
+for (let i = 0; i < selectors.length; i++) {
+    let nodes = [];
+    try {
+        if (useXpath) {
+            const snap = document.evaluate(selectors[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let j = 0; j < snap.snapshotLength; j++) nodes.push(snap.snapshotItem(j));
+        } else {
+            nodes = document.querySelectorAll(selectors[i]);
+        }
+    } catch (e) { continue; }
+    for (const el of nodes) {
+        if (!isClickable(el)) continue;
+        el.scrollIntoView({block: 'center'});
+        el.click();
+        return i;
+    }
+}
+return -1;
+"""
+
+def click_if_exists(driver: webdriver.Chrome, selectors: List[str], by: By = By.CSS_SELECTOR, timeout: float = 3.0,
+                    budget: Optional[WaitBudget] = None) -> bool:
+    """
+    Seçicilerden biri tıklanabilir olana kadar (tümü için toplam 'timeout') bekler ve tıklar.
+    Tıklamadan sonra sabit bekleme yerine DOM'un durulması beklenir.
+    """
+    end = time.time() + _wait_timeout(timeout, budget)
+    use_xpath = by == By.XPATH
+    interval = 0.05
+    while True:
+        try:
+            idx = driver.execute_script(_CLICK_FIRST_JS, list(selectors), use_xpath)
+        except WebDriverException:
+            idx = -1
+        if isinstance(idx, int) and idx >= 0:
+            print(f"[Scraper] Tıklama başarılı: {selectors[idx]}")
+            wait_dom_quiet(driver, quiet_ms=200, timeout=0.8, budget=budget)
+            return True
+        remaining = end - time.time()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(0.4, interval * 1.5)
+
+# =========================
+# Çerez onayı
+# =========================
+
+# domain → (seçici tipi, onay butonu seçicileri, sitenin CMP çerezleri)
+CONSENT_BUTTONS: Dict[str, Tuple[str, List[str], List[str]]] = {
+    "mediamarkt.com.tr": (By.CSS_SELECTOR, [
+        'button#onetrust-accept-btn-handler',
+        'button[data-test="cookie-accept-all"]',
+        'button[id*="cookie"]',
+        'button[class*="cookie"]',
+    ], ["OptanonAlertBoxClosed", "OptanonConsent"]),
+    "itopya.com": (By.CSS_SELECTOR, ["#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll"], ["CookieConsent"]),
+    "incehesap.com": (By.XPATH, ["//button[.//span[contains(., 'Kabul Et')] or contains(., 'Kabul Et')]"], []),
+    "n11.com": (By.CSS_SELECTOR, ["#cookieAccept"], []),
+}
+# Onay verildiğinde sitenin kendi çerezine ek olarak yazılan işaret (CMP çerez adı bilinmeyen siteler için)
+CONSENT_MARKER_COOKIE = "ta_consent"
+_CONSENT_COOKIE_NAMES = {CONSENT_MARKER_COOKIE} | {n for _, _, names in CONSENT_BUTTONS.values() for n in names}
+
+def _has_consent(driver: webdriver.Chrome, domain_key: str) -> bool:
+    names = {CONSENT_MARKER_COOKIE, *CONSENT_BUTTONS.get(domain_key, (None, [], []))[2]}
+    try:
+        return any(c.get("name") in names for c in driver.get_cookies())
+    except WebDriverException:
+        return False
+
+def accept_consent(driver: webdriver.Chrome, domain_key: str, timeout: float = 2.0,
+                   budget: Optional[WaitBudget] = None) -> bool:
+    """
+    Çerez banner'ını kabul eder. Profilde onay çerezi zaten varsa buton hiç beklenmez.
+    Tıklama başarılıysa True döner ve işaret çerezi yazılır.
+    """
+    if domain_key not in CONSENT_BUTTONS:
+        return False
+    if _has_consent(driver, domain_key):
+        _count(f"consent_cached:{domain_key}")
+        return False
+    by, selectors, _ = CONSENT_BUTTONS[domain_key]
+    if not click_if_exists(driver, selectors, by=by, timeout=timeout, budget=budget):
+        return False
+    _count(f"consent_clicked:{domain_key}")
+    try:
+        driver.add_cookie({"name": CONSENT_MARKER_COOKIE, "value": "1", "path": "/",
+                           "expiry": int(time.time()) + 365 * 24 * 3600})
+    except WebDriverException:
+        pass
+    return True
+
+# =========================
+# Driver havuzu
+# =========================
+
+DRIVER_POOL_SIZE = int(os.getenv("SCRAPER_DRIVER_POOL_SIZE", "4"))
+DRIVER_MAX_PAGES = int(os.getenv("SCRAPER_DRIVER_MAX_PAGES", "50"))
+DRIVER_MAX_RSS_MB = int(os.getenv("SCRAPER_DRIVER_MAX_RSS_MB", "1024"))
+DRIVER_ACQUIRE_TIMEOUT = float(os.getenv("SCRAPER_DRIVER_ACQUIRE_TIMEOUT", "120"))
+# "process": her havuz slotu ayrı Chrome; "tabs": tek Chrome, her slot kendi sekmesine bağlı ayrı oturum
+BROWSER_MODE = os.getenv("SCRAPER_BROWSER_MODE", "process").strip().lower()
+if BROWSER_MODE not in ("process", "tabs"):
+    print(f"[Scraper] Geçersiz SCRAPER_BROWSER_MODE '{BROWSER_MODE}', 'process' kullanılıyor.")
+    BROWSER_MODE = "process"
+# Sekme modunda paylaşılan Chrome'un yenilenme eşikleri (toplam sayfa / Chrome ağacının RSS'i); 0 kapalı
+BROWSER_HOST_MAX_PAGES = int(os.getenv("SCRAPER_BROWSER_HOST_MAX_PAGES", "500"))
+BROWSER_HOST_MAX_RSS_MB = int(os.getenv("SCRAPER_BROWSER_HOST_MAX_RSS_MB", "3072"))
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class _BrowserHost:
+    """
+    Sekme modunda tüm oturumların bağlandığı tek Chrome süreci. Chrome, remote debugging portuyla
+    normal bir driver üzerinden açılır; havuz slotları bu porta debuggerAddress ile bağlanıp kendi
+    sekmelerini açar. Her slotun yalnızca küçük bir chromedriver süreci olur.
+
+    Chrome BROWSER_HOST_MAX_PAGES sayfadan veya BROWSER_HOST_MAX_RSS_MB bellekten sonra emekliye ayrılır
+    (retire): yeni sekmeler yeni bir Chrome'da açılır, eskisi son sekmesi de kapanınca sonlandırılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._driver: Optional[webdriver.Chrome] = None
+        self._address: Optional[str] = None
+        self.generation = 0
+        self._pages = 0
+        # nesil → açık sekme sayısı; emekli nesiller sekmeleri boşalınca kapatılır
+        self._tabs: Dict[int, int] = {}
+        self._draining: Dict[int, webdriver.Chrome] = {}
+        self.started = 0
+        self.retired = 0
+
+    def _alive(self) -> bool:
+        try:
+            return bool(self._driver and self._driver.window_handles)
+        except Exception:
+            return False
+
+    def attach(self) -> Tuple[str, int]:
+        """Yeni sekme için (adres, nesil) döndürür. Her attach'a sekme kapanınca bir detach karşılık gelir."""
+        with self._lock:
+            if self._driver is None or not self._alive():
+                self._stop()
+                port = _free_port()
+                self._driver = _build_driver([f"--remote-debugging-port={port}"])
+                self._address = f"127.0.0.1:{port}"
+                self.generation += 1
+                self._pages = 0
+                self.started += 1
+                print(f"[Scraper] Paylaşılan Chrome başlatıldı ({self._address}).")
+            self._tabs[self.generation] = self._tabs.get(self.generation, 0) + 1
+            return self._address, self.generation
+
+    def detach(self, generation: int) -> None:
+        with self._lock:
+            left = self._tabs.get(generation, 0) - 1
+            if left > 0:
+                self._tabs[generation] = left
+                return
+            self._tabs.pop(generation, None)
+            driver = self._draining.pop(generation, None)
+        if driver is not None:
+            print("[Scraper] Emekli Chrome'un sekmeleri kapandı, süreç sonlandırılıyor.")
+            self._quit(driver)
+
+    def page_done(self, generation: int) -> bool:
+        """Sekmede bir sayfa bitti. Eşik aşıldıysa Chrome emekliye ayrılır; sekme yenilenmeli mi döner."""
+        with self._lock:
+            if generation != self.generation or self._driver is None:
+                return True
+            self._pages += 1
+            over_pages = BROWSER_HOST_MAX_PAGES and self._pages >= BROWSER_HOST_MAX_PAGES
+            rss = _driver_rss_mb(self._driver) if BROWSER_HOST_MAX_RSS_MB else None
+            if not over_pages and (rss is None or rss <= BROWSER_HOST_MAX_RSS_MB):
+                return False
+        reason = f"{BROWSER_HOST_MAX_PAGES} sayfa" if over_pages else f"{rss:.0f} MB"
+        self.retire(reason)
+        return True
+
+    def retire(self, reason: str = "") -> bool:
+        """Çalışan Chrome'u emekliye ayırır; yeni sekmeler yeni Chrome'da açılır. Çalışan yoksa False."""
+        with self._lock:
+            driver, generation = self._driver, self.generation
+            if driver is None:
+                return False
+            self._driver, self._address = None, None
+            # Nesil hemen ilerler: eski sekmeler bırakıldıklarında yenilenir
+            self.generation += 1
+            self.retired += 1
+            drain = self._tabs.get(generation, 0) > 0
+            if drain:
+                self._draining[generation] = driver
+        print(f"[Scraper] Paylaşılan Chrome yenileniyor ({reason}); "
+              f"{'sekmeler kapanınca' if drain else 'hemen'} sonlandırılacak.")
+        _count("browser_host_retired")
+        if not drain:
+            self._quit(driver)
+        return True
+
+    @staticmethod
+    def _quit(driver: webdriver.Chrome) -> None:
+        try:
+            _quit_driver(driver)
+        except Exception as e:
+            print(f"[Scraper] Paylaşılan Chrome kapatılamadı: {e}")
+
+    def _stop(self) -> None:
+        driver, self._driver, self._address = self._driver, None, None
+        self._tabs.pop(self.generation, None)
+        if driver is not None:
+            self._quit(driver)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stop()
+            draining, self._draining = list(self._draining.values()), {}
+            self._tabs.clear()
+        for driver in draining:
+            self._quit(driver)
+
+    def rss_mb(self) -> Optional[float]:
+        with self._lock:
+            return _driver_rss_mb(self._driver) if self._driver else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._driver is not None,
+                "address": self._address,
+                "generation": self.generation,
+                "pages": self._pages,
+                "tabs": self._tabs.get(self.generation, 0),
+                "draining": len(self._draining),
+                "max_pages": BROWSER_HOST_MAX_PAGES,
+                "max_rss_mb": BROWSER_HOST_MAX_RSS_MB,
+                "started": self.started,
+                "retired": self.retired,
+            }
+
+_BROWSER_HOST = _BrowserHost()
+
+def _build_tab_driver() -> webdriver.Chrome:
+    """Paylaşılan Chrome'a bağlanan ve yeni bir sekmede çalışan driver oturumu."""
+    address, generation = _BROWSER_HOST.attach()
+    opts = Options()
+    opts.debugger_address = address
+    if PAGE_LOAD_STRATEGY in ("normal", "eager", "none"):
+        opts.page_load_strategy = PAGE_LOAD_STRATEGY
+    if WAIT_NETWORK_LOG:
+        opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    try:
+        driver = webdriver.Chrome(service=_chrome_service(), options=opts)
+    except Exception:
+        _BROWSER_HOST.detach(generation)
+        raise
+    _SUPERVISOR.register(driver)
+    driver._host_generation = generation
+    try:
+        driver.switch_to.new_window("tab")
+        driver._shared_tab = True
+        driver.set_page_load_timeout(60)
+        driver.set_script_timeout(30)
+    except Exception:
+        _quit_driver(driver)
+        raise
+    return driver
+
+class _PooledDriver:
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+def _driver_rss_mb(driver: webdriver.Chrome) -> Optional[float]:
+    """chromedriver + Chrome alt süreçlerinin toplam RSS değeri (psutil yoksa None)."""
+    if psutil is None:
+        return None
+    try:
+        proc = psutil.Process(driver.service.process.pid)
+        total = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+class DriverPool:
+    """
+    Sıcak Chrome örneklerini yeniden kullanan, thread-safe driver havuzu.
+    - Sayfalar arasında çerez/storage temizlenir ve about:blank'e dönülür
+    - N sayfa veya bellek tavanı aşılınca driver yenilenir
+    - Hata veren driver'lar havuza geri konmaz
+    """
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES,
+                 max_rss_mb: int = DRIVER_MAX_RSS_MB, factory=None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._factory = factory or _build_driver
+        self._idle: List[_PooledDriver] = []
+        self._leased = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "discarded": 0, "shed": 0}
+        # Bu andan önce açılmış driver'lar bırakıldıklarında yenilenir (bkz. shed)
+        self._recycle_before = 0.0
+
+    def _acquire(self, timeout: float) -> _PooledDriver:
+        end = time.time() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise WebDriverException("Driver havuzu kapatıldı")
+                if self._idle:
+                    self._leased += 1
+                    self._stats["reused"] += 1
+                    return self._idle.pop()
+                if self._leased < self.size:
+                    self._leased += 1
+                    break
+                remaining = end - time.time()
+                if remaining <= 0:
+                    raise TimeoutException(f"Boşta driver bulunamadı ({timeout:.0f}s)")
+                self._cond.wait(remaining)
+        # Yeni Chrome'u kilit dışında başlat (soğuk açılış diğer thread'leri bekletmesin)
         try:
-            wait = WebDriverWait(driver, 3)
-            element = wait.until(EC.element_to_be_clickable((by, sel)))
-            driver.execute_script("arguments[0].click();", element)
-            time.sleep(0.8)
-            print(f"[Scraper] Tıklama başarılı: {sel}")
+            slot = _PooledDriver(self._factory())
+        except Exception:
+            with self._cond:
+                self._leased -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+        return slot
+
+    def _reset(self, slot: _PooledDriver) -> bool:
+        try:
+            driver = slot.driver
+            # Sekme modunda çerez/storage tüm sekmelerle ortak; aynı sitedeki başka sekmeyi bozmamak için silinmez
+            if not getattr(driver, "_shared_tab", False):
+                consent = [c for c in driver.get_cookies() if c.get("name") in _CONSENT_COOKIE_NAMES]
+                driver.delete_all_cookies()
+                for cookie in consent:
+                    try:
+                        driver.add_cookie(cookie)
+                    except WebDriverException:
+                        pass
+                driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+            driver.get("about:blank")
             return True
+        except Exception as e:
+            print(f"[Scraper] Driver sıfırlanamadı, atılıyor: {e}")
+            return False
+
+    def _needs_recycle(self, slot: _PooledDriver) -> bool:
+        if slot.created_at < self._recycle_before:
+            return True
+        generation = getattr(slot.driver, "_host_generation", None)
+        if generation is not None:
+            if generation != _BROWSER_HOST.generation:
+                return True
+            if _BROWSER_HOST.page_done(generation):
+                # Paylaşılan Chrome emekliye ayrıldı: bu sekme kapanır, boştaki eski sekmeler de bırakılır
+                self.shed()
+                return True
+        if self.max_pages and slot.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb:
+            rss = _driver_rss_mb(slot.driver)
+            if rss is not None and rss > self.max_rss_mb:
+                print(f"[Scraper] Driver bellek tavanını aştı ({rss:.0f} MB), yenileniyor.")
+                return True
+        return False
+
+    @staticmethod
+    def _quit(slot: _PooledDriver) -> None:
+        try:
+            if getattr(slot.driver, "_shared_tab", False):
+                # Bağlı oturumun quit()'i tarayıcıyı kapatmaz; sadece kendi sekmesini kapatır
+                slot.driver.close()
+            _quit_driver(slot.driver)
+        except Exception as e:
+            print(f"[Scraper] driver.quit() hatası: {e}")
+        finally:
+            generation = getattr(slot.driver, "_host_generation", None)
+            if generation is not None:
+                _BROWSER_HOST.detach(generation)
+
+    def _release(self, slot: _PooledDriver, healthy: bool) -> None:
+        slot.pages += 1
+        recycle = healthy and not self._closed and self._needs_recycle(slot)
+        keep = healthy and not self._closed and not recycle and self._reset(slot)
+        with self._cond:
+            self._leased -= 1
+            if recycle:
+                self._stats["recycled"] += 1
+            elif not keep:
+                self._stats["discarded"] += 1
+            if keep and not self._closed:
+                self._idle.append(slot)
+                slot = None
+            self._cond.notify()
+        if slot is not None:
+            self._quit(slot)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        slot = self._acquire(DRIVER_ACQUIRE_TIMEOUT if timeout is None else timeout)
+        healthy = True
+        try:
+            yield slot.driver
+        except TimeoutException:
+            # Seçici/sayfa zaman aşımı driver'ı bozmaz
+            raise
         except Exception:
-            continue
-    return False
+            healthy = False
+            raise
+        finally:
+            self._release(slot, healthy)
+
+    def shed(self) -> int:
+        """Boştaki driver'ları kapatır, kullanımdakileri bırakıldıklarında yeniletir (toplam bellek tavanı için)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._recycle_before = time.time()
+            self._stats["shed"] += len(idle)
+            self._cond.notify_all()
+        for slot in idle:
+            self._quit(slot)
+        return len(idle)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for slot in idle:
+            self._quit(slot)
+        if idle:
+            print(f"[Scraper] Driver havuzu kapatıldı ({len(idle)} driver sonlandırıldı).")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": self._leased,
+                "max_pages": self.max_pages,
+                "max_rss_mb": self.max_rss_mb,
+                "closed": self._closed,
+                **self._stats,
+            }
+
+_DRIVER_POOL: Optional[DriverPool] = None
+_DRIVER_POOL_LOCK = threading.Lock()
+
+def set_driver_pool_size(size: int) -> None:
+    """Havuz boyutunu ayarlar (candidates.MAX_WORKERS ile eşlemek için). Havuz oluşmuşsa etkisizdir."""
+    global DRIVER_POOL_SIZE
+    if "SCRAPER_DRIVER_POOL_SIZE" not in os.environ:
+        DRIVER_POOL_SIZE = max(1, int(size))
+
+def get_driver_pool() -> DriverPool:
+    global _DRIVER_POOL
+    with _DRIVER_POOL_LOCK:
+        if _DRIVER_POOL is None or _DRIVER_POOL._closed:
+            factory = _build_tab_driver if BROWSER_MODE == "tabs" else _build_driver
+            _DRIVER_POOL = DriverPool(size=DRIVER_POOL_SIZE, factory=factory)
+            _SUPERVISOR.start()
+        return _DRIVER_POOL
+
+def shutdown_driver_pool() -> None:
+    global _DRIVER_POOL
+    with _DRIVER_POOL_LOCK:
+        pool, _DRIVER_POOL = _DRIVER_POOL, None
+    if pool is not None:
+        pool.shutdown()
+    _BROWSER_HOST.shutdown()
+    _SUPERVISOR.stop()
+
+atexit.register(shutdown_driver_pool)
+
+# =========================
+# Tarayıcı denetçisi
+# =========================
+
+SUPERVISOR_INTERVAL = float(os.getenv("SCRAPER_SUPERVISOR_INTERVAL", "30"))
+# Tüm scraper tarayıcılarının (chromedriver + Chrome ağaçları) toplam bellek tavanı; 0 kapalı
+BROWSER_MAX_TOTAL_RSS_MB = int(os.getenv("SCRAPER_BROWSER_MAX_TOTAL_RSS_MB", "4096"))
+# Henüz driver'a kaydedilmemiş (açılmakta olan) süreçlere dokunmamak için yaş alt sınırı
+SUPERVISOR_GRACE_S = float(os.getenv("SCRAPER_SUPERVISOR_GRACE", "60"))
+# Chrome'un yok saydığı işaret argümanı: --ta-scraper-owner=<Python pid>
+OWNER_FLAG = "--ta-scraper-owner"
+
+class BrowserSupervisor:
+    """
+    Scraper'ın başlattığı chromedriver/Chrome süreçlerini izler (psutil gerekir, yoksa sadece sayar):
+    - Driver başına süreç ağacı (pid + create_time) kaydedilir; quit() sonrası hayatta kalanlar öldürülür
+    - Periyodik tarama: chromedriver'ı ölmüş ağaçlar, sahibi (OWNER_FLAG) ölmüş Chrome'lar ve kayıtsız
+      chromedriver alt süreçleri sonlandırılır
+    - İzlenen süreçlerin toplam RSS'i BROWSER_MAX_TOTAL_RSS_MB'yi aşarsa havuz driver'ları yenilenir (shed);
+      sekme modunda paylaşılan Chrome da emekliye ayrılır ve sekmeleri boşalınca kapatılır
+    N sayfada bir yenileme DriverPool'un max_pages ayarıdır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id(driver) → {"pid": chromedriver pid, "procs": {pid: create_time}}
+        self._drivers: Dict[int, Dict[str, Any]] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warned = False
+        self._stats = {"registered": 0, "killed_after_quit": 0, "orphans_killed": 0, "rss_trims": 0, "sweeps": 0}
+        self.total_rss_mb: Optional[float] = None
+        self.last_sweep: Optional[float] = None
+
+    @staticmethod
+    def _tree(pid: int) -> Dict[int, float]:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return {}
+        tree: Dict[int, float] = {}
+        for proc in procs:
+            try:
+                tree[proc.pid] = proc.create_time()
+            except psutil.Error:
+                continue
+        return tree
+
+    @staticmethod
+    def _alive(procs: Dict[int, float]) -> List[Any]:
+        alive = []
+        for pid, created in procs.items():
+            try:
+                proc = psutil.Process(pid)
+                if proc.create_time() == created and proc.status() != psutil.STATUS_ZOMBIE:
+                    alive.append(proc)
+            except psutil.Error:
+                continue
+        return alive
+
+    @staticmethod
+    def _kill(procs: List[Any]) -> int:
+        for proc in procs:
+            try:
+                proc.kill()
+            except psutil.Error:
+                continue
+        psutil.wait_procs(procs, timeout=3)
+        return len(procs)
+
+    def register(self, driver: webdriver.Chrome) -> None:
+        with self._lock:
+            self._stats["registered"] += 1
+        if psutil is None:
+            return
+        try:
+            pid = driver.service.process.pid
+        except Exception:
+            return
+        with self._lock:
+            self._drivers[id(driver)] = {"pid": pid, "procs": self._tree(pid)}
+
+    def unregister(self, driver: webdriver.Chrome) -> None:
+        """quit() sonrası çağrılır; kısa bir beklemeden sonra hâlâ yaşayan süreçler öldürülür."""
+        with self._lock:
+            entry = self._drivers.pop(id(driver), None)
+        if not entry or psutil is None:
+            return
+        alive = self._alive(entry["procs"])
+        if alive:
+            _, alive = psutil.wait_procs(alive, timeout=2)
+        if alive:
+            killed = self._kill(alive)
+            print(f"[Scraper] quit() sonrası {killed} tarayıcı süreci kaldı, sonlandırıldı.")
+            with self._lock:
+                self._stats["killed_after_quit"] += killed
+            _count("browser_killed_after_quit", killed)
+
+    def _strays(self, tracked: set) -> List[Any]:
+        """Kayıtsız chromedriver alt süreçleri ve sahibi ölmüş işaretli Chrome süreçleri."""
+        me = os.getpid()
+        now = time.time()
+        strays = []
+        for proc in psutil.process_iter(["name", "cmdline", "ppid", "create_time"]):
+            info = proc.info
+            if proc.pid in tracked or now - (info["create_time"] or now) < SUPERVISOR_GRACE_S:
+                continue
+            name = (info["name"] or "").lower()
+            if name.startswith("chromedriver") and info["ppid"] == me:
+                strays.append(proc)
+                continue
+            owner = next((a.split("=", 1)[1] for a in info["cmdline"] or [] if a.startswith(OWNER_FLAG + "=")), None)
+            if owner and owner.isdigit() and int(owner) != me and not psutil.pid_exists(int(owner)):
+                strays.append(proc)
+        return strays
+
+    def sweep(self, pool: Optional["DriverPool"] = None) -> Dict[str, Any]:
+        if psutil is None:
+            return self.stats()
+        orphans: List[Any] = []
+        tracked: set = set()
+        total = 0.0
+        with self._lock:
+            entries = list(self._drivers.items())
+        for key, entry in entries:
+            if not psutil.pid_exists(entry["pid"]):
+                # chromedriver ölmüş: ağacın kalanı (Chrome + renderer'lar) yetim
+                orphans.extend(self._alive(entry["procs"]))
+                with self._lock:
+                    self._drivers.pop(key, None)
+                continue
+            entry["procs"].update(self._tree(entry["pid"]))
+            for proc in self._alive(entry["procs"]):
+                if proc.pid in tracked:
+                    continue
+                tracked.add(proc.pid)
+                try:
+                    total += proc.memory_info().rss / (1024 * 1024)
+                except psutil.Error:
+                    continue
+        try:
+            orphans.extend(self._strays(tracked))
+        except psutil.Error:
+            pass
+        if orphans:
+            killed = self._kill(orphans)
+            print(f"[Scraper] {killed} yetim tarayıcı süreci sonlandırıldı.")
+            _count("browser_orphans_killed", killed)
+        with self._lock:
+            self._stats["sweeps"] += 1
+            self._stats["orphans_killed"] += len(orphans)
+            self.total_rss_mb = round(total, 1)
+            self.last_sweep = time.time()
+        if BROWSER_MAX_TOTAL_RSS_MB and total > BROWSER_MAX_TOTAL_RSS_MB and pool is not None:
+            if BROWSER_MODE == "tabs":
+                # Belleğin çoğu paylaşılan Chrome'da: sekmeleri kapatmak onu küçültmez, Chrome yenilenir
+                _BROWSER_HOST.retire(f"toplam bellek {total:.0f} MB")
+            shed = pool.shed()
+            print(f"[Scraper] Tarayıcılar toplam bellek tavanını aştı ({total:.0f} MB), "
+                  f"{shed} boş driver kapatıldı, kullanımdakiler bırakılınca yenilenecek.")
+            with self._lock:
+                self._stats["rss_trims"] += 1
+            _count("browser_rss_trims")
+        return self.stats()
+
+    def _loop(self, stop_event: threading.Event) -> None:
+        # İlk tarama hemen: önceki (çökmüş) worker'lardan kalan tarayıcılar da toplanır
+        while True:
+            try:
+                self.sweep(_DRIVER_POOL)
+            except Exception as e:
+                print(f"[Scraper] Tarayıcı denetimi hatası: {e}")
+            if stop_event.wait(SUPERVISOR_INTERVAL):
+                return
+
+    def warn_if_disabled(self) -> None:
+        """psutil yoksa bir kez uyarır; denetçi sessizce kapanmaz."""
+        if psutil is not None:
+            return
+        with self._lock:
+            if self._warned:
+                return
+            self._warned = True
+        print(f"[Scraper] UYARI: {PSUTIL_MISSING_WARNING}")
+
+    def start(self) -> None:
+        if psutil is None:
+            self.warn_if_disabled()
+            return
+        if SUPERVISOR_INTERVAL <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._loop, args=(self._stop_event,),
+                                            name="browser-supervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": psutil is not None,
+                "warning": PSUTIL_MISSING_WARNING if psutil is None else None,
+                "tracked_drivers": len(self._drivers),
+                "total_rss_mb": self.total_rss_mb,
+                "max_total_rss_mb": BROWSER_MAX_TOTAL_RSS_MB,
+                "last_sweep_age_s": round(time.time() - self.last_sweep, 1) if self.last_sweep else None,
+                **self._stats,
+            }
+
+_SUPERVISOR = BrowserSupervisor()
+_SUPERVISOR.warn_if_disabled()
 
 # =========================
 # Ortak yardımcılar
@@ -121,6 +1292,12 @@ def _parse_price(price_text: Optional[str]) -> Optional[float]:
     """Türkçe formatlı fiyatları güvenilir şekilde ayrıştıran yenilenmiş fonksiyon."""
     if not price_text:
         return None
+    # Tek nokta + 1-2 hane ("44999.00" JSON-LD/meta, "12.50 TL") binlik ayırıcı olamaz: nokta ondalıktır.
+    # "1.250" gibi 3 haneli gruplar aşağıda binlik sayılır (bkz. fixtures/scraper/prices.golden.json)
+    m = re.fullmatch(r"(?:₺|TL)?\s*(\d+\.\d{1,2})\s*(?:TL|₺)?", str(price_text).strip())
+    if m:
+        val = float(m.group(1))
+        return val if val > 10 else None
     try:
         cleaned_text = re.sub(r"[.TL₺\s]", "", str(price_text)).strip()
         cleaned_text = cleaned_text.replace(",", ".")
@@ -140,11 +1317,16 @@ def _parse_price(price_text: Optional[str]) -> Optional[float]:
                 return None
     return None
 
+@lru_cache(maxsize=512)
+def _css(selector: str):
+    """Derlenmiş soupsieve seçicisi; parser'lar aynı seçiciyi her sayfada yeniden derlemez."""
+    return soupsieve.compile(selector)
+
 def _find_text(soup: BeautifulSoup, selectors: List[str]) -> Optional[str]:
     results = []
     for s in selectors:
         try:
-            el = soup.select_one(s)
+            el = _css(s).select_one(soup)
             if el:
                 txt = el.get_text(strip=True)
                 print(f"[Scraper] _find_text: Seçici '{s}' bulundu, metin: '{txt}'")
@@ -161,15 +1343,6 @@ def _find_text(soup: BeautifulSoup, selectors: List[str]) -> Optional[str]:
         print(f"[Scraper] _find_text: Tüm fiyat sonuçları: {results}")
     return None
 
-def _meta(soup: BeautifulSoup, sel: str, attr: str = "content") -> Optional[str]:
-    el = soup.select_one(sel)
-    if el and el.has_attr(attr):
-        val = (el.get(attr) or "").strip()
-        print(f"[Scraper] _meta: Seçici '{sel}' bulundu, {attr}: '{val}'")
-        return val or None
-    print(f"[Scraper] _meta: Seçici '{sel}' bulunamadı")
-    return None
-
 def _guess_brand(title: Optional[str], specs: Optional[Dict[str, str]] = None, url: str = "") -> Optional[str]:
     if specs and isinstance(specs, dict) and "Marka" in specs and specs["Marka"]:
         return specs["Marka"]
@@ -188,18 +1361,163 @@ def _guess_brand(title: Optional[str], specs: Optional[Dict[str, str]] = None, u
         return "ITOPYA"
     return None
 
+# =========================
+# Yapısal veri (JSON-LD / microdata / OpenGraph)
+# =========================
+
+def _is_structured_tag(tag) -> bool:
+    if tag.name == "script":
+        return tag.get("type") == "application/ld+json"
+    return tag.name == "meta" or tag.has_attr("itemprop")
+
+def _ld_types(obj: Dict[str, Any]) -> List[str]:
+    t = obj.get("@type")
+    return [str(x) for x in t] if isinstance(t, list) else [str(t)] if t else []
+
+class StructuredData:
+    """
+    Sayfadaki JSON-LD nesneleri, microdata (itemprop) ve meta property (og:*, product:*) değerleri.
+    Parser'a verilir ama soup üzerindeki tek geçiş ilk erişimde yapılır; sd'yi hiç okumayan parser bedel ödemez.
+    Parser'lar JSON-LD'yi tekrar çözmez.
+    """
+
+    def __init__(self, soup: BeautifulSoup):
+        self._soup = soup
+        self._index: Optional[Tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, str]]] = None
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> "StructuredData":
+        return cls(soup)
+
+    def _indexed(self) -> Tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, str]]:
+        if self._index is None:
+            self._index = self._build(self._soup)
+            self._soup = None
+        return self._index
+
+    @property
+    def jsonld(self) -> List[Dict[str, Any]]:
+        return self._indexed()[0]
+
+    @property
+    def itemprops(self) -> Dict[str, str]:
+        return self._indexed()[1]
+
+    @property
+    def meta_props(self) -> Dict[str, str]:
+        return self._indexed()[2]
+
+    @staticmethod
+    def _build(soup: BeautifulSoup) -> Tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, str]]:
+        jsonld: List[Dict[str, Any]] = []
+        itemprops: Dict[str, str] = {}
+        meta_props: Dict[str, str] = {}
+        for tag in soup.find_all(_is_structured_tag):
+            if tag.name == "script":
+                try:
+                    obj = json.loads(tag.string or "{}")
+                except Exception:
+                    continue
+                for o in (obj if isinstance(obj, list) else [obj]):
+                    if not isinstance(o, dict):
+                        continue
+                    jsonld.append(o)
+                    jsonld.extend(g for g in (o.get("@graph") or []) if isinstance(g, dict))
+                continue
+            if tag.name == "meta" and tag.get("property"):
+                meta_props.setdefault(tag["property"], (tag.get("content") or "").strip())
+            prop = tag.get("itemprop")
+            if prop and prop not in itemprops:
+                if tag.name == "meta":
+                    val = tag.get("content") or ""
+                elif tag.name == "link":
+                    val = tag.get("href") or ""
+                else:
+                    val = tag.get("content") or tag.get_text(strip=True)
+                if val.strip():
+                    itemprops[prop] = val.strip()
+        return jsonld, itemprops, meta_props
+
+    def products(self) -> List[Dict[str, Any]]:
+        return [o for o in self.jsonld if "Product" in _ld_types(o)]
+
+    def meta(self, prop: str) -> Optional[str]:
+        return self.meta_props.get(prop) or None
+
+    def itemprop(self, name: str) -> Optional[str]:
+        return self.itemprops.get(name)
+
+    def product_name(self) -> Optional[str]:
+        for o in self.products():
+            name = (o.get("name") or "").strip() if isinstance(o.get("name"), str) else ""
+            if name:
+                return name
+        return None
+
+    def product_brand(self) -> Optional[str]:
+        for o in self.products():
+            brand = o.get("brand")
+            if isinstance(brand, dict):
+                brand = brand.get("name")
+            if isinstance(brand, str) and brand.strip():
+                return brand.strip()
+        return None
+
+    def product_price(self) -> Optional[float]:
+        for o in self.products():
+            offers = o.get("offers")
+            if isinstance(offers, list):
+                offers = next((x for x in offers if isinstance(x, dict)), None)
+            if isinstance(offers, dict):
+                price = _parse_price(str(offers.get("price") or offers.get("lowPrice") or ""))
+                if price:
+                    return price
+        return None
+
+    def item_list(self) -> List[Dict[str, Any]]:
+        """ItemList öğeleri: [{url, name, price}] (liste sayfalarında kart bulunamazsa kullanılır)."""
+        items: List[Dict[str, Any]] = []
+        for o in self.jsonld:
+            if "ItemList" not in _ld_types(o):
+                continue
+            for el in o.get("itemListElement") or []:
+                if not isinstance(el, dict):
+                    continue
+                item = el.get("item") if isinstance(el.get("item"), dict) else el
+                offers = item.get("offers")
+                if isinstance(offers, list):
+                    offers = next((x for x in offers if isinstance(x, dict)), None)
+                price = _parse_price(str(offers.get("price") or offers.get("lowPrice") or "")) if isinstance(offers, dict) else None
+                url = item.get("url") or el.get("url")
+                if url:
+                    items.append({"url": url, "name": item.get("name"), "price": price})
+        return items
+
+    def additional_properties(self) -> Dict[str, str]:
+        specs: Dict[str, str] = {}
+        for o in self.jsonld:
+            addp = o.get("additionalProperty")
+            if not isinstance(addp, list):
+                continue
+            for ap in addp:
+                n, v = (ap or {}).get("name"), (ap or {}).get("value") or (ap or {}).get("unitText")
+                if n and v: specs[str(n).strip()] = str(v).strip()
+        return specs
+
 # =========================
 # Hepsiburada
 # =========================
 
-def hb_before_capture(driver: webdriver.Chrome):
-    _scroll_soft(driver, steps=3, pause=0.5)
-    click_if_exists(driver, [
+def hb_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
+    _scroll_soft(driver, steps=3, pause=0.5, budget=budget)
+    if click_if_exists(driver, [
         '#specifications button',
         'a[data-test-id="product-tech-specs"]',
         'a[href="#productTechSpecContainer"]',
-    ])
-    _scroll_soft(driver, steps=2, pause=0.4)
+    ], budget=budget):
+        # Özellik tablosu XHR ile doluyor
+        wait_network_idle(driver, idle_ms=400, timeout=3, budget=budget)
+    _scroll_soft(driver, steps=2, pause=0.4, budget=budget)
 
 def _hb_specs_table(soup: BeautifulSoup) -> Dict[str, str]:
     specs: Dict[str, str] = {}
@@ -231,11 +1549,11 @@ def _hb_specs_summary(soup: BeautifulSoup) -> Dict[str, str]:
                 specs[key] = val
     return specs
 
-def _scrape_hepsiburada(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_hepsiburada(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "hepsiburada", "url": url}
     data["name"] = _find_text(soup, ['h1[data-test-id="title"]', 'h1[itemprop="name"]'])
     price_text = _find_text(soup, ['span[data-test-id="price-current-price"]', '[data-test-id="price-current-price"]'])
-    data["brand"] = _guess_brand(data["name"], url=url) or _meta(soup, 'meta[itemprop="brand"]')
+    data["brand"] = _guess_brand(data["name"], url=url) or sd.itemprop("brand")
     data["price"] = _parse_price(price_text)
 
     specs = _hb_specs_table(soup)
@@ -248,6 +1566,27 @@ def _scrape_hepsiburada(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any
         return None
     return data
 
+_HB_PRODUCT_ID_RE = re.compile(r"-(HBC[0-9A-Z]+)$")
+
+def _hb_canonical_path(path: str) -> str:
+    """Arama sonuçlarındaki '...-HBCV0000XYZ' biçimini ürün sayfası yolu '...-p-HBCV0000XYZ'ye çevirir."""
+    m = _HB_PRODUCT_ID_RE.search(path.rstrip("/"))
+    if m and "-p-" not in path:
+        return path.rstrip("/")[:m.start()] + f"-p-{m.group(1)}"
+    return path
+
+_HB_IN_PAGE_JS = """
+const specs = pairs('div#specifications tr, #productTechSpecContainer tr', 'th, .spec-key', 'td, .spec-value');
+if (!Object.keys(specs).length) pairs('#techSpecs div', '.OXP5AzPvafgN_i3y6wGp', '.AxM3TmSghcDRH1F871Vh', specs);
+return {
+    source: 'hepsiburada',
+    name: txt(['h1[data-test-id="title"]', 'h1[itemprop="name"]']),
+    price: txt(['span[data-test-id="price-current-price"]', '[data-test-id="price-current-price"]']),
+    brand_hint: itemprop('brand'),
+    specs: specs,
+};
+"""
+
 # =========================
 # Trendyol
 # =========================
@@ -267,36 +1606,47 @@ def _ty_specs_html(soup: BeautifulSoup) -> Dict[str, str]:
                 specs[key] = val
     return specs
 
-def _ty_specs_jsonld(soup: BeautifulSoup) -> Dict[str, str]:
-    specs: Dict[str, str] = {}
-    for script in soup.find_all("script", type="application/ld+json"):
-        try:
-            obj = json.loads(script.string or "{}")
-        except Exception:
-            continue
-        objs = obj if isinstance(obj, list) else [obj]
-        for o in objs:
-            if not isinstance(o, dict): continue
-            addp = o.get("additionalProperty")
-            if isinstance(addp, list):
-                for ap in addp:
-                    n, v = (ap or {}).get("name"), (ap or {}).get("value") or (ap or {}).get("unitText")
-                    if n and v: specs[str(n).strip()] = str(v).strip()
-    return specs
-
-def _scrape_trendyol(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_trendyol(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "trendyol", "url": url}
     title_el = soup.select_one('h1[data-testid="product-title"], h1.pr-new-br')
-    data["name"] = (title_el.get_text(strip=True) if title_el else None) or _meta(soup, 'meta[property="og:title"]')
+    data["name"] = (title_el.get_text(strip=True) if title_el else None) or sd.meta("og:title")
     brand_el = soup.select_one('h1[data-testid="product-title"] a, h1.pr-new-br a, h1.pr-new-br strong')
-    data["brand"] = (brand_el.get_text(strip=True) if brand_el else _guess_brand(data["name"], url=url)) or _meta(soup, 'meta[itemprop="brand"]')
+    data["brand"] = (brand_el.get_text(strip=True) if brand_el else _guess_brand(data["name"], url=url)) or sd.itemprop("brand")
     price_text = _find_text(soup, ['.price-container .discounted', 'span.prc-dsc', 'span.price__current', 'span.pr-bx-w']) or \
-                 _meta(soup, 'meta[itemprop="price"]') or _meta(soup, 'meta[property="product:price:amount"]')
+                 sd.itemprop("price") or sd.meta("product:price:amount")
     data["price"] = _parse_price(price_text)
-    data["specs"] = _ty_specs_html(soup) or _ty_specs_jsonld(soup)
+    data["specs"] = _ty_specs_html(soup) or sd.additional_properties()
     if not data.get("name") or not data.get("price"): return None
     return data
 
+_TY_IN_PAGE_JS = """
+const specs = {};
+for (const it of document.querySelectorAll('div.attributes .attribute-item, ul.detail-attr-container li.detail-attr-item')) {
+    const spans = it.querySelectorAll('span');
+    if (spans.length >= 2) { const k = clean(spans[0]), v = clean(spans[1]); if (k && v) specs[k] = v; }
+}
+const brandEl = document.querySelector('h1[data-testid="product-title"] a, h1.pr-new-br a, h1.pr-new-br strong');
+if (!Object.keys(specs).length) {
+    for (const o of jsonld()) {
+        for (const ap of (Array.isArray(o.additionalProperty) ? o.additionalProperty : [])) {
+            const n = ap && ap.name, v = ap && (ap.value || ap.unitText);
+            if (n && v) specs[String(n).trim()] = String(v).trim();
+        }
+    }
+}
+return {
+    source: 'trendyol',
+    name: txt(['h1[data-testid="product-title"]', 'h1.pr-new-br']) || attr('meta[property="og:title"]', 'content'),
+    brand: clean(brandEl) || null,
+    // _scrape_trendyol: marka elemanı varsa (boş olsa bile) başlıktan tahmin yapılmaz
+    skip_guess: !!brandEl,
+    brand_hint: itemprop('brand'),
+    price: txt(['.price-container .discounted', 'span.prc-dsc', 'span.price__current', 'span.pr-bx-w'])
+        || itemprop('price') || attr('meta[property="product:price:amount"]', 'content'),
+    specs: specs,
+};
+"""
+
 # =========================
 # Vatan Bilgisayar
 # =========================
@@ -315,43 +1665,18 @@ def _vatan_specs(soup: BeautifulSoup) -> Dict[str, str]:
             if key and val: specs[key] = val
     return specs
 
-def _vatan_from_jsonld(soup: BeautifulSoup) -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
-    for script in soup.find_all("script", type="application/ld+json"):
-        try:
-            obj = json.loads(script.string or "{}")
-        except Exception:
-            continue
-        for o in (obj if isinstance(obj, list) else [obj]):
-            if not isinstance(o, dict) or o.get("@type") != "Product": continue
-            if not out.get("name"): out["name"] = (o.get("name") or "").strip() or None
-            brand = o.get("brand")
-            if isinstance(brand, dict) and brand.get("name") and not out.get("brand"):
-                out["brand"] = (brand.get("name") or "").strip()
-            elif isinstance(brand, str) and not out.get("brand"):
-                out["brand"] = brand.strip()
-            offers = o.get("offers")
-            price_val = None
-            if isinstance(offers, dict):
-                price_val = offers.get("price") or offers.get("lowPrice")
-            elif isinstance(offers, list) and offers and isinstance(offers[0], dict):
-                price_val = offers[0].get("price") or offers[0].get("lowPrice")
-            if price_val and not out.get("price"): out["price"] = _parse_price(str(price_val))
-    return out
-
-def _scrape_vatan(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_vatan(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "vatan", "url": url}
     title = _find_text(soup, ['h1.product-detail__title', 'h1.product-list__product-name', 'h1#product-name']) \
-            or _meta(soup, 'meta[property="og:title"]')
+            or sd.meta("og:title")
     if title:
         title = title.split('fiyatı')[0].split(' özellikleri')[0].strip()
     price_text = _find_text(soup, ['span.product-list__price', '.product-detail__price', 'span#offering-price']) \
-                 or _meta(soup, 'meta[itemprop="price"]') or _meta(soup, 'meta[property="product:price:amount"]')
+                 or sd.itemprop("price") or sd.meta("product:price:amount")
 
-    j_data = _vatan_from_jsonld(soup)
-    data["name"] = title or j_data.get("name")
-    data["price"] = _parse_price(price_text) or j_data.get("price")
-    data["brand"] = _guess_brand(data["name"], url=url) or j_data.get("brand")
+    data["name"] = title or sd.product_name()
+    data["price"] = _parse_price(price_text) or sd.product_price()
+    data["brand"] = _guess_brand(data["name"], url=url) or sd.product_brand()
     data["specs"] = _vatan_specs(soup)
 
     if not data.get("name") or not data.get("price") or data.get("name") == "Ürün Yorumları": return None
@@ -361,30 +1686,23 @@ def _scrape_vatan(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
 # İncehesap
 # =========================
 
-def _incehesap_wait_specs_loaded(wait: WebDriverWait) -> None:
-    wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "div.prose.prose-neutral table")))
-    wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "div.prose.prose-neutral table tbody tr")) >= 3)
+def _incehesap_wait_specs_loaded(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None) -> bool:
+    return wait_element_count(driver, "div.prose.prose-neutral table tbody tr", min_count=3, timeout=10, budget=budget) >= 3
 
-def incehesap_before_capture(driver: webdriver.Chrome):
-    wait = WebDriverWait(driver, 10)
+def incehesap_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
     print("[Scraper] İncehesap: Pop-up'lar yönetiliyor...")
-    click_if_exists(driver, ["//button[.//span[contains(., 'Kabul Et')] or contains(., 'Kabul Et')]"]), ("by=By.XPATH")
+    accept_consent(driver, "incehesap.com", timeout=2, budget=budget)
     
-    try:
-        all_specs_btn = wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[.//span[contains(., 'Tüm Özellikler')] or contains(., 'Tüm Özellikler')]"))
-        )
-        driver.execute_script("arguments[0].click();", all_specs_btn)
-        time.sleep(0.3)
-        _incehesap_wait_specs_loaded(wait)
+    if click_if_exists(driver, ["//button[.//span[contains(., 'Tüm Özellikler')] or contains(., 'Tüm Özellikler')]"],
+                       by=By.XPATH, timeout=5, budget=budget) and _incehesap_wait_specs_loaded(driver, budget):
         print("[Scraper] İncehesap: 'Tüm Özellikler' tablosu başarıyla açıldı.")
-    except Exception:
+    else:
         print("[Scraper] İncehesap: 'Tüm Özellikler' butonu bulunamadı veya tıklanamadı (sorun olmayabilir).")
     
     print("[Scraper] İncehesap: İsim ve fiyat elementleri için bekleniyor...")
     name_price_selectors = ["h1", ".product-name", ".newPrice > ins", ".price", ".price-new", ".newPrice", "span[itemprop='price']"]
     try:
-        wait_any_selector(driver, name_price_selectors, timeout=20, visible=True)
+        wait_any_selector(driver, name_price_selectors, timeout=_wait_timeout(20, budget), visible=True)
     except TimeoutException:
         print("[Scraper] İncehesap: İsim veya fiyat elementi için zaman aşımı, devam ediliyor...")
     
@@ -398,7 +1716,7 @@ def incehesap_before_capture(driver: webdriver.Chrome):
     except Exception:
         print("[Scraper] İncehesap: JS fiyat kontrolü başarısız.")
     
-    _scroll_soft(driver, steps=2, pause=0.3)
+    _scroll_soft(driver, steps=2, pause=0.3, budget=budget)
 
 def _incehesap_collect_specs(soup: BeautifulSoup) -> Dict[str, str]:
     specs: Dict[str, str] = {}
@@ -420,7 +1738,7 @@ def _incehesap_collect_specs(soup: BeautifulSoup) -> Dict[str, str]:
             if k and v: specs[k] = v
     return specs
 
-def _scrape_incehesap(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_incehesap(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "incehesap", "url": url}
     name_selectors = ["h1", ".product-name", "h1.text-2xl", "h1.font-bold"]
     price_selectors = [".newPrice > ins", ".newPrice", ".price-new", ".price", "span[itemprop='price']", "ins"]
@@ -433,20 +1751,12 @@ def _scrape_incehesap(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]
     
     # JSON-LD Fallback for price
     if not data["price"]:
-        for script in soup.find_all("script", type="application/ld+json"):
-            try:
-                obj = json.loads(script.string or "{}")
-                if isinstance(obj, dict) and obj.get("@type") == "Product":
-                    offers = obj.get("offers")
-                    if offers and isinstance(offers, dict):
-                        price_text = offers.get("price")
-                        data["price"] = _parse_price(price_text)
-                        print(f"[Scraper] İncehesap: JSON-LD ile fiyat alındı: {price_text}")
-            except Exception:
-                print("[Scraper] İncehesap: JSON-LD ayrıştırmada hata")
+        data["price"] = sd.product_price()
+        if data["price"]:
+            print(f"[Scraper] İncehesap: JSON-LD ile fiyat alındı: {data['price']}")
     
     print(f"[Scraper] İncehesap: Ayrıştırılmış fiyat: {data['price']}")
-    data["brand"] = _guess_brand(data["name"], url=url) or _meta(soup, 'meta[itemprop="brand"]')
+    data["brand"] = _guess_brand(data["name"], url=url) or sd.itemprop("brand")
     data["specs"] = _incehesap_collect_specs(soup)
 
     if not data.get("name") or not data.get("price"):
@@ -458,7 +1768,7 @@ def _scrape_incehesap(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]
 # Amazon.com.tr
 # =========================
 
-def _scrape_amazon(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_amazon(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "amazon.com.tr", "url": url}
     data["name"] = _find_text(soup, ["#productTitle"])
     price_text = _find_text(soup, ["#corePrice_feature_div .a-price-whole", ".a-price .a-offscreen"])
@@ -477,87 +1787,60 @@ def _scrape_amazon(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
         return None
     return data
 
+_AMAZON_ASIN_RE = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})(?:[/?]|$)")
+
+def _amazon_canonical_path(path: str) -> str:
+    """'/Urun-Adi/dp/B0XXXXXXXX/ref=sr_1_3' gibi varyantları '/dp/B0XXXXXXXX'e indirger."""
+    m = _AMAZON_ASIN_RE.search(path)
+    return f"/dp/{m.group(1)}" if m else path
+
+_AMAZON_IN_PAGE_JS = """
+return {
+    source: 'amazon.com.tr',
+    name: txt(['#productTitle']),
+    price: txt(['#corePrice_feature_div .a-price-whole', '.a-price .a-offscreen']),
+    brand_hint: txt(['#bylineInfo']),
+    specs: pairs('#productDetails_techSpec_section_1 tr, #technicalSpecifications_section tr', 'th', 'td'),
+};
+"""
+
 # =========================
 # MediaMarkt
 # =========================
 
-def mediamarkt_handle_popups(driver: webdriver.Chrome) -> bool:
-    popup_selectors = [
-        'button#onetrust-accept-btn-handler',
-        'button[data-test="cookie-accept-all"]',
-        'button[id*="cookie"]',
-        'button[class*="cookie"]',
-    ]
+def mediamarkt_handle_popups(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None) -> bool:
     try:
-        accept_button = None
-        for selector in popup_selectors:
-            try:
-                accept_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                )
-                break
-            except TimeoutException:
-                continue
-
-        if accept_button:
-            print("[Scraper] MediaMarkt: Çerez kabul butonu bulundu, tıklanıyor...")
-            banner_element = None
-            for banner_selector in popup_selectors:
-                try:
-                    banner_element = driver.find_element(By.CSS_SELECTOR, banner_selector)
-                    if banner_element:
-                        break
-                except NoSuchElementException:
-                    continue
-            
-            driver.execute_script("arguments[0].click();", accept_button)
+        if accept_consent(driver, "mediamarkt.com.tr", timeout=5, budget=budget):
             print("✅ [Scraper] MediaMarkt: Çerez kabul butonu tıklandı")
-
-            if banner_element:
-                print("[Scraper] MediaMarkt: Pop-up'ın kaybolması bekleniyor...")
-                WebDriverWait(driver, 5).until(EC.invisibility_of_element(banner_element))
-                print("✅ [Scraper] MediaMarkt: Pop-up kayboldu.")
-            else:
-                time.sleep(1)
+            wait_dom_quiet(driver, quiet_ms=250, timeout=2, budget=budget)
             return True
-        else:
-            print("[Scraper] MediaMarkt: Çerez pop-up'ı bulunamadı veya zaten kabul edilmiş.")
-            return False
+        print("[Scraper] MediaMarkt: Çerez pop-up'ı bulunamadı veya zaten kabul edilmiş.")
+        return False
     except Exception as e:
         print(f"[Scraper] MediaMarkt: Pop-up kapatılırken genel bir hata oluştu: {e}")
         return False
 
-def mediamarkt_expand_specs(driver: webdriver.Chrome):
-    wait = WebDriverWait(driver, 10)
-    spec_button_selectors = [
+def mediamarkt_expand_specs(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
+    css_selectors = [
         'button[aria-controls*="features"]',
         'button#features',
-        '//button[contains(text(), "Teknik özellikler")]',
         'button[data-test="show-all-product-features"]',
     ]
-    
-    for selector in spec_button_selectors:
-        try:
-            if selector.startswith('//'):
-                element = wait.until(EC.element_to_be_clickable((By.XPATH, selector)))
-            else:
-                element = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", element)
-            time.sleep(1)
-            driver.execute_script("arguments[0].click();", element)
-            print(f"✅ [Scraper] MediaMarkt: Teknik özellikler butonu tıklandı.")
-            time.sleep(2)
-            return True
-        except TimeoutException:
-            continue
+    xpath_selectors = ['//button[contains(text(), "Teknik özellikler")]']
+
+    if click_if_exists(driver, css_selectors, timeout=10, budget=budget) or \
+            click_if_exists(driver, xpath_selectors, by=By.XPATH, timeout=1, budget=budget):
+        print(f"✅ [Scraper] MediaMarkt: Teknik özellikler butonu tıklandı.")
+        wait_network_idle(driver, idle_ms=400, timeout=3, budget=budget)
+        return True
     print("❌ [Scraper] MediaMarkt: Teknik özellikler butonu bulunamadı.")
     return False
 
-def mediamarkt_before_capture(driver: webdriver.Chrome):
-    mediamarkt_handle_popups(driver)
-    _scroll_soft(driver, steps=2, pause=0.4)
-    mediamarkt_expand_specs(driver)
-    _scroll_soft(driver, steps=2, pause=0.4)
+def mediamarkt_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
+    mediamarkt_handle_popups(driver, budget)
+    _scroll_soft(driver, steps=2, pause=0.4, budget=budget)
+    mediamarkt_expand_specs(driver, budget)
+    _scroll_soft(driver, steps=2, pause=0.4, budget=budget)
 
 def mediamarkt_extract_specs(soup: BeautifulSoup) -> Dict[str, str]:
     specs: Dict[str, str] = {}
@@ -581,7 +1864,7 @@ def mediamarkt_extract_specs(soup: BeautifulSoup) -> Dict[str, str]:
                         specs[key] = val
     return specs
 
-def _scrape_mediamarkt(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_mediamarkt(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "mediamarkt", "url": url}
     
     data["name"] = _find_text(soup, ['h1[data-test="product-title"]', 'h1'])
@@ -606,28 +1889,43 @@ def _scrape_mediamarkt(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]
         
     return data
 
+_MEDIAMARKT_IN_PAGE_JS = """
+const specs = {};
+for (const btn of document.querySelectorAll("div[data-test='mms-pdp-details-mainfeatures'] button")) {
+    const spans = btn.querySelectorAll('span');
+    if (spans.length >= 2) { const k = clean(spans[0]), v = clean(spans[1]); if (k && v) specs[k] = v; }
+}
+for (const row of document.querySelectorAll("div[id='features-content'] table tr")) {
+    const cells = row.querySelectorAll('td, th');
+    if (cells.length >= 2) { const k = clean(cells[0]), v = clean(cells[1]); if (k && v && !(k in specs)) specs[k] = v; }
+}
+return {
+    source: 'mediamarkt',
+    name: txt(['h1[data-test="product-title"]', 'h1']),
+    price: txt(['span[data-test="branded-price-whole-value"]']),
+    brand: txt(['a[data-test="manufacturer-link"]'])
+        || attr('a[data-test="manufacturer-link"] img, img.manufacturer-logo', 'alt'),
+    specs: specs,
+};
+"""
+
 # =========================
 # N11
 # =========================
 
-def n11_before_capture(driver: webdriver.Chrome):
+def n11_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
     print("[Scraper] N11: Pop-up'lar ve banner'lar yönetiliyor...")
-    click_if_exists(driver, ["#cookieAccept"], by=By.CSS_SELECTOR)
+    accept_consent(driver, "n11.com", timeout=2, budget=budget)
     
-    _scroll_soft(driver, steps=2, pause=0.5)
+    _scroll_soft(driver, steps=2, pause=0.5, budget=budget)
     
     more_specs_selector = 'p.unf-prop-more'
-    try:
-        element = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.CSS_SELECTOR, more_specs_selector)))
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        time.sleep(0.5)
-        element.click()
+    if click_if_exists(driver, [more_specs_selector], timeout=5, budget=budget):
         print("[Scraper] N11: 'Daha Fazla Ürün Özelliği' butonu tıklandı.")
-        time.sleep(1)
-    except TimeoutException:
+    else:
         print("[Scraper] N11: 'Daha Fazla Ürün Özelliği' butonu bulunamadı veya zaten açık.")
     
-    _scroll_soft(driver, steps=2, pause=0.4)
+    _scroll_soft(driver, steps=2, pause=0.4, budget=budget)
 
 def _n11_extract_specs(soup: BeautifulSoup) -> Dict[str, str]:
     specs: Dict[str, str] = {}
@@ -661,7 +1959,7 @@ def _n11_extract_specs(soup: BeautifulSoup) -> Dict[str, str]:
 
     return specs
 
-def _scrape_n11(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_n11(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "n11", "url": url}
     
     data["name"] = _find_text(soup, ['h1.proName'])
@@ -680,21 +1978,45 @@ def _scrape_n11(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
         
     return data
 
+# _n11_extract_specs ile aynı kurallar: iki parçalı satırlar, tek hücreli satırlar için regex, sonra tablo
+_N11_IN_PAGE_JS = """
+const specs = {};
+const container = document.querySelector('div.unf-prop-context ul.unf-prop-list');
+for (const item of (container ? container.querySelectorAll('li.unf-prop-list-item') : [])) {
+    const texts = Array.from(item.querySelectorAll('p, strong, span')).map(clean).filter(Boolean);
+    if (texts.length >= 2) { specs[texts[0]] = texts[1]; continue; }
+    const m = clean(item).match(/^([a-zA-ZğüşıöçĞÜŞİÖÇ\\s()\\/]+)(.+)/);
+    if (m) { const k = m[1].trim(), v = m[2].trim(); if (k && v) specs[k] = v; }
+}
+if (!Object.keys(specs).length) {
+    for (const row of document.querySelectorAll('div#unf-prop table tr, div.product-properties table tr')) {
+        const cells = row.querySelectorAll('td');
+        if (cells.length === 2) { const k = clean(cells[0]), v = clean(cells[1]); if (k && v) specs[k] = v; }
+    }
+}
+return {
+    source: 'n11',
+    name: txt(['h1.proName']),
+    price: txt(['div.newPrice ins', 'div.priceContainer ins', 'div.priceDetail ins']),
+    specs: specs,
+};
+"""
+
 # =========================
 # Itopya
 # =========================
 
-def itopya_before_capture(driver: webdriver.Chrome):
+def itopya_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
     print("[Scraper] Itopya: Pop-up'lar yönetiliyor...")
-    click_if_exists(driver, ["#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll"], by=By.CSS_SELECTOR)
+    accept_consent(driver, "itopya.com", timeout=2, budget=budget)
     try:
-        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, ".price, .newPrice > ins")))
+        wait_any_selector(driver, [".price", ".newPrice > ins"], timeout=_wait_timeout(10, budget), visible=True)
         print("[Scraper] Itopya: Fiyat elementi bulundu.")
     except TimeoutException:
         print("[Scraper] Itopya: Fiyat elementi için zaman aşımı.")
-    _scroll_soft(driver, steps=2, pause=0.5)
+    _scroll_soft(driver, steps=2, pause=0.5, budget=budget)
 
-def _scrape_itopya(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_itopya(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "itopya", "url": url}
     
     full_name = _find_text(soup, [".product-name-title", "h1"])
@@ -722,21 +2044,9 @@ def _scrape_itopya(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
     data["price"] = _parse_price(price_text)
     data["brand"] = _guess_brand(data["name"], url=url)
     
-    for script in soup.find_all("script", type="application/ld+json"):
-        try:
-            obj = json.loads(script.string or "{}")
-        except Exception:
-            continue
-        if isinstance(obj, dict) and obj.get("@type") == "Product":
-            if not data.get("name"):
-                data["name"] = obj.get("name")
-            if not data.get("price") and obj.get("offers"):
-                data["price"] = _parse_price(obj["offers"].get("price"))
-            if not data.get("brand") and obj.get("brand"):
-                if isinstance(obj["brand"], dict):
-                    data["brand"] = obj["brand"].get("name")
-                else:
-                    data["brand"] = obj["brand"]
+    data["name"] = data.get("name") or sd.product_name()
+    data["price"] = data.get("price") or sd.product_price()
+    data["brand"] = data.get("brand") or sd.product_brand()
 
     if not data.get("name") or not data.get("price"):
         return None
@@ -768,25 +2078,25 @@ def extract_gaming_gen_specs(soup: BeautifulSoup) -> Dict[str, str]:
         print("[Scraper] UYARI: Hiçbir spec bilgisi alınamadı.")
     return specs
 
-def _gaming_gen_before_capture(driver: webdriver.Chrome):
+def _gaming_gen_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
     print("[Scraper] Gaming.gen.tr: Pop-up'lar ve özellikler butonu yönetiliyor...")
-    click_if_exists(driver, ["button[id*='cookie']", ".cookie-accept"])
-    _scroll_soft(driver, steps=4, pause=0.7)
+    click_if_exists(driver, ["button[id*='cookie']", ".cookie-accept"], timeout=2, budget=budget)
+    _scroll_soft(driver, steps=4, pause=0.7, budget=budget)
     
     specs_button_selectors = [
         "a[href*='#tab-additional_information']", 
         "li.additional_information_tab a"
     ]
     print("[Scraper] Gaming.gen.tr: Teknik özellikler butonu aranıyor...")
-    if click_if_exists(driver, specs_button_selectors):
+    if click_if_exists(driver, specs_button_selectors, budget=budget):
         print("[Scraper] Teknik özellikler butonu tıklandı.")
     else:
         print("[Scraper] Uyarı: Teknik özellikler butonu bulunamadı, muhtemelen zaten açık.")
     
-    time.sleep(2)
-    _scroll_soft(driver, steps=2, pause=0.5)
+    wait_element_count(driver, "table.shop_attributes tr", min_count=1, timeout=2, budget=budget)
+    _scroll_soft(driver, steps=2, pause=0.5, budget=budget)
 
-def _scrape_gaming_gen(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_gaming_gen(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "gaming.gen.tr", "url": url}
     name_selectors = ["h1.product_title.entry-title", ".product_title", "h1"]
     data["name"] = _find_text(soup, name_selectors)
@@ -818,6 +2128,13 @@ def _scrape_gaming_gen(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]
 # Gamegaraj
 # =========================
 
+def _is_content_list(ul) -> bool:
+    """nav/header/footer içinde olmayan ve maddeleri link olmayan liste (menü değil, içerik)."""
+    if ul.find_parent(["nav", "header", "footer"]):
+        return False
+    items = ul.find_all("li", recursive=False)
+    return bool(items) and not all(li.find("a") for li in items)
+
 def extract_gamegaraj_specs(soup: BeautifulSoup) -> Dict[str, str]:
     specs: Dict[str, str] = {}
     specs_list_selectors = [
@@ -829,7 +2146,9 @@ def extract_gamegaraj_specs(soup: BeautifulSoup) -> Dict[str, str]:
     ]
     
     for selector in specs_list_selectors:
-        ul_element = soup.select_one(selector)
+        # Çıplak 'ul' yedeği site menüsüne/altbilgiye düşmesin: navigasyon dışındaki ilk link listesi olmayan liste
+        ul_element = soup.select_one(selector) if selector != "ul" else \
+            next((ul for ul in soup.select("ul") if _is_content_list(ul)), None)
         if ul_element:
             print(f"[Scraper] Specs listesi bulundu: {selector}")
             li_elements = ul_element.select("li")
@@ -863,7 +2182,11 @@ def extract_gamegaraj_specs(soup: BeautifulSoup) -> Dict[str, str]:
     
     if not specs:
         print("[Scraper] Hiçbir yapıda spec bulunamadı, genel arama yapılıyor...")
-        page_text = soup.get_text()
+        # Menü/altbilgi metni aranmaz: 'Işlemci Kurumsal' gibi kategori linkleri değer sanılmasın
+        page_text = "".join(
+            text for text in soup.find_all(string=True)
+            if not text.find_parent(["nav", "header", "footer", "script", "style", "template"])
+        )
         patterns = [
             r'İşlemci[:\s]+([^\n]+)',
             r'Ekran Kartı[:\s]+([^\n]+)', 
@@ -880,7 +2203,7 @@ def extract_gamegaraj_specs(soup: BeautifulSoup) -> Dict[str, str]:
     print(f"[Scraper] Gamegaraj: {len(specs)} spec bulundu.")
     return specs
 
-def _gamegaraj_before_capture(driver: webdriver.Chrome):
+def _gamegaraj_before_capture(driver: webdriver.Chrome, budget: Optional[WaitBudget] = None):
     print("[Scraper] GameGaraj: Pop-up'lar ve çerezler yönetiliyor...")
     cookie_selectors = [
         "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",
@@ -889,22 +2212,17 @@ def _gamegaraj_before_capture(driver: webdriver.Chrome):
         "button[data-test='accept-cookies']",
         ".cookie-accept",
         ".accept-all",
-        "//button[contains(text(), 'Kabul') or contains(text(), 'Accept')]"
     ]
+    cookie_xpath = "//button[contains(text(), 'Kabul') or contains(text(), 'Accept')]"
     
-    for sel in cookie_selectors:
-        if sel.startswith("//"):
-            if click_if_exists(driver, [sel], by=By.XPATH):
-                print("[Scraper] Çerez butonu tıklandı (XPath)")
-                break
-        else:
-            if click_if_exists(driver, [sel]):
-                print("[Scraper] Çerez butonu tıklandı (CSS)")
-                break
+    if click_if_exists(driver, cookie_selectors, timeout=3, budget=budget):
+        print("[Scraper] Çerez butonu tıklandı (CSS)")
+    elif click_if_exists(driver, [cookie_xpath], by=By.XPATH, timeout=0, budget=budget):
+        print("[Scraper] Çerez butonu tıklandı (XPath)")
     
-    _scroll_soft(driver, steps=3, pause=0.5)
+    _scroll_soft(driver, steps=3, pause=0.5, budget=budget)
 
-def _scrape_gamegaraj(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
+def _scrape_gamegaraj(soup: BeautifulSoup, url: str, sd: StructuredData) -> Optional[Dict[str, Any]]:
     data: Dict[str, Any] = {"source": "gamegaraj", "url": url}
     name_selectors = [
         "h2.mt-1.text-2xl.font-semibold.text-gray-900",
@@ -944,60 +2262,288 @@ def _scrape_gamegaraj(soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]
         
     return data
 
+# =========================
+# Liste (kategori) sayfaları
+# =========================
+
+def _split_name_specs(full_name: str) -> Tuple[str, Dict[str, str]]:
+    """'Ad / İşlemci: X / RAM: Y' biçimli kart başlıklarını ad + özet spec'e ayırır (itopya ile aynı kural)."""
+    parts = [p.strip() for p in full_name.split(" / ")]
+    specs: Dict[str, str] = {}
+    for item in parts[1:]:
+        key, sep, value = item.partition(":")
+        if sep and key.strip() and value.strip():
+            specs[key.strip()] = value.strip()
+        elif item:
+            specs[f"Özellik {len(specs) + 1}"] = item
+    return parts[0], specs
+
+def _listing_tiles(soup: BeautifulSoup, url: str, source: str, tile: str, name: str, price: str,
+                   brand: Optional[str] = None, link: str = "a[href]", specs: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Kategori sayfasındaki her ürün kartından {source, url, name, price, brand, specs} çıkarır.
+    specs seçicisi verilirse kart içindeki 'Anahtar: Değer' satırları özet spec olarak alınır.
+    """
+    products: List[Dict[str, Any]] = []
+    for card in _css(tile).select(soup):
+        # Görsel linki gibi boş eşleşmeler atlanır (ör. itopya'da a.title'dan önce gelen a.image)
+        name_el = next((el for el in _css(name).select(card) if el.get_text(strip=True)), None)
+        price_el = _css(price).select_one(card)
+        link_el = card if card.name == "a" and card.has_attr("href") else _css(link).select_one(card)
+        if not name_el or not link_el:
+            continue
+        full_name = name_el.get_text(" ", strip=True)
+        product_name, card_specs = _split_name_specs(full_name)
+        for row in (_css(specs).select(card) if specs else []):
+            key, sep, value = row.get_text(" ", strip=True).partition(":")
+            if sep and key.strip() and value.strip():
+                card_specs[key.strip()] = value.strip()
+        brand_el = _css(brand).select_one(card) if brand else None
+        products.append({
+            "source": source,
+            "url": urljoin(url, link_el["href"]),
+            "name": product_name,
+            "price": _parse_price(price_el.get_text(strip=True)) if price_el else None,
+            "brand": (brand_el.get_text(strip=True) if brand_el else None) or _guess_brand(product_name, url=url),
+            "specs": card_specs,
+        })
+    return products
+
+def _listing_from_item_list(sd: StructuredData, url: str, source: str) -> List[Dict[str, Any]]:
+    return [
+        {"source": source, "url": urljoin(url, it["url"]), "name": it.get("name"), "price": it.get("price"),
+         "brand": _guess_brand(it.get("name"), url=url), "specs": {}}
+        for it in sd.item_list() if it.get("name")
+    ]
+
+def _list_trendyol(soup: BeautifulSoup, url: str, sd: StructuredData) -> List[Dict[str, Any]]:
+    return _listing_tiles(soup, url, "trendyol", tile="div.p-card-wrppr",
+                          name="span.prdct-desc-cntnr-name, h3.prdct-desc-cntnr-ttl-w",
+                          price="div.prc-box-dscntd, div.price-item, div.prc-box-sllng",
+                          brand="span.prdct-desc-cntnr-ttl") or _listing_from_item_list(sd, url, "trendyol")
+
+def _list_hepsiburada(soup: BeautifulSoup, url: str, sd: StructuredData) -> List[Dict[str, Any]]:
+    return _listing_tiles(soup, url, "hepsiburada", tile='li[class*="productListContent"]',
+                          name='[data-test-id="product-card-name"], h3',
+                          price='[data-test-id="price-current-price"], [data-test-id="final-price"]') \
+        or _listing_from_item_list(sd, url, "hepsiburada")
+
+def _list_itopya(soup: BeautifulSoup, url: str, sd: StructuredData) -> List[Dict[str, Any]]:
+    return _listing_tiles(soup, url, "itopya", tile="div.product",
+                          name="a.title, .product-name, .product-header a",
+                          price=".product-price strong, .price, .newPrice",
+                          link="a.title, a[href]") or _listing_from_item_list(sd, url, "itopya")
+
+def _list_incehesap(soup: BeautifulSoup, url: str, sd: StructuredData) -> List[Dict[str, Any]]:
+    return _listing_tiles(soup, url, "incehesap", tile="a.product, div.product-list-item, [itemtype*='Product']",
+                          name="[itemprop='name'], .product-name, h2, h3",
+                          price="[itemprop='price'], .newPrice, .price-new, .price",
+                          specs="ul li") or _listing_from_item_list(sd, url, "incehesap")
+
 # =========================
 # Site konfigürasyonları
 # =========================
 
+# parser: (soup, url, sd) → ürün sözlüğü veya None; sd sayfa başına bir kez kurulan StructuredData
+# fetch_mode:
+#   "http"              → sadece düz HTTP GET + parser
+#   "browser"           → sadece Selenium
+#   "http_then_browser" → önce HTTP, parser None dönerse Selenium'a yükselt
+# page_load: "complete" → 'eager' stratejide bile readyState=complete beklenir (JS'i geç bağlanan sayfalar)
+# max_concurrency / rate_per_sec / burst: site başına eşzamanlı sayfa sınırı ve token bucket
+#   (varsayılan DEFAULT_MAX_CONCURRENCY, DEFAULT_RATE_PER_SEC; bkz. PolitenessScheduler)
+# wait_budget: before_capture + kaydırma beklemeleri için sayfa başına toplam süre (sn, varsayılan DEFAULT_WAIT_BUDGET)
+# capture_wait: wait_for_any seçicileri için taban bekleme (sn, varsayılan DEFAULT_CAPTURE_WAIT)
+# parse_scope: parser'ın okuduğu alt ağaçların (basit) CSS seçicileri; sadece bunlar + meta/JSON-LD soup'a alınır
+#   (site bazında SCRAPER_PARSE_SCOPE ile açılır, varsayılan kapalı; SCRAPER_PARSER_BACKEND backend'i seçer)
+# canonical_path: ürün sayfası yolunu kanonik biçime çeviren fonksiyon (bkz. canonical_product_url)
+# tracking_params: canonical_product_url'de genel izleme parametrelerine ek olarak atılan, ürünü/satıcıyı
+#   değiştirmeyen site parametreleri
+# listing: kategori sayfası ayrıştırıcısı {parser, page_param, fetch_mode, wait_for_any}; bkz. scrape_listing
+# in_page_extractor: canlı DOM'dan {source, name, price, brand, brand_hint, specs} döndüren JS gövdesi
+#   (_IN_PAGE_PRELUDE_JS yardımcılarıyla); sonuç eksikse page_source + parser fallback'i çalışır
+FETCH_MODES = ("http", "browser", "http_then_browser")
+
 SITE_CONFIG = {
     "hepsiburada.com": {
+        "fetch_mode": "browser",
+        "max_concurrency": 1,
+        "rate_per_sec": 0.5,
         "parser": _scrape_hepsiburada,
+        "tracking_params": ("wt_int", "wt_af"),
+        "canonical_path": _hb_canonical_path,
+        "listing": {"parser": _list_hepsiburada, "page_param": "sayfa", "fetch_mode": "browser", "wait_for_any": ['li[class*="productListContent"]']},
+        "parse_scope": [
+            'h1[data-test-id="title"]',
+            'h1[itemprop="name"]',
+            '[data-test-id="price-current-price"]',
+            "div#specifications",
+            "#productTechSpecContainer",
+            "#techSpecs",
+        ],
+        "in_page_extractor": _HB_IN_PAGE_JS,
         "wait_for_any": ['h1[data-test-id="title"]', 'h1[itemprop="name"]', '[data-test-id="price-current-price"]'],
         "before_capture": hb_before_capture,
+        "wait_budget": 12,
     },
     "trendyol.com": {
+        "fetch_mode": "http_then_browser",
+        "max_concurrency": 2,
+        "rate_per_sec": 0.5,
         "parser": _scrape_trendyol,
+        "tracking_params": ("boutiqueId",),
+        "listing": {"parser": _list_trendyol, "page_param": "pi", "fetch_mode": "http_then_browser", "wait_for_any": ['div.p-card-wrppr']},
+        "parse_scope": [
+            'h1[data-testid="product-title"]',
+            "h1.pr-new-br",
+            ".price-container",
+            "span.prc-dsc",
+            "span.price__current",
+            "span.pr-bx-w",
+            "div.attributes",
+            "ul.detail-attr-container",
+        ],
+        "in_page_extractor": _TY_IN_PAGE_JS,
         "wait_for_any": ['h1[data-testid="product-title"]', 'h1.pr-new-br', '.price-container .discounted'],
         "before_capture": None,
     },
     "vatanbilgisayar.com": {
+        "fetch_mode": "http_then_browser",
         "parser": _scrape_vatan,
+        "parse_scope": [
+            "h1.product-detail__title",
+            "h1.product-list__product-name",
+            "h1#product-name",
+            "span.product-list__price",
+            ".product-detail__price",
+            "span#offering-price",
+            "div.row.highlights",
+            "div.product-feature",
+        ],
         "wait_for_any": ['h1.product-detail__title', 'h1.product-list__product-name', '.product-list__price'],
         "before_capture": None,
     },
     "incehesap.com": {
+        "fetch_mode": "http_then_browser",
         "parser": _scrape_incehesap,
+        "listing": {"parser": _list_incehesap, "page_param": "page", "fetch_mode": "http_then_browser", "wait_for_any": ['a.product', 'div.product-list-item']},
+        "parse_scope": [
+            "h1",
+            ".product-name",
+            ".newPrice",
+            ".price-new",
+            ".price",
+            "span[itemprop='price']",
+            "div.prose.prose-neutral",
+        ],
         "wait_for_any": ["h1", ".product-name", ".newPrice > ins", ".price", ".price-new", ".newPrice", "span[itemprop='price']"],
         "before_capture": incehesap_before_capture,
+        "wait_budget": 15,
     },
     "amazon.com.tr": {
+        "fetch_mode": "browser",
+        "max_concurrency": 1,
+        "rate_per_sec": 0.5,
         "parser": _scrape_amazon,
+        # Arama/öneri izleri; satıcı (smid) ve varyant (th, psc) parametreleri korunur
+        "tracking_params": ("qid", "sr", "keywords", "crid", "sprefix", "dib", "dib_tag", "pd_rd_w", "pd_rd_wg",
+                            "pd_rd_r", "pd_rd_i", "pf_rd_p", "pf_rd_r"),
+        "canonical_path": _amazon_canonical_path,
+        "parse_scope": [
+            "#productTitle",
+            "#corePrice_feature_div",
+            ".a-price",
+            "#bylineInfo",
+            "#productDetails_techSpec_section_1",
+            "#technicalSpecifications_section",
+        ],
+        "in_page_extractor": _AMAZON_IN_PAGE_JS,
         "wait_for_any": ["#productTitle", "#centerCol", "div#corePrice_feature_div"],
         "before_capture": None,
     },
     "mediamarkt.com.tr": {
+        "fetch_mode": "browser",
+        "max_concurrency": 1,
+        "rate_per_sec": 0.5,
         "parser": _scrape_mediamarkt,
+        "parse_scope": [
+            "h1",
+            'span[data-test="branded-price-whole-value"]',
+            'a[data-test="manufacturer-link"]',
+            "img.manufacturer-logo",
+            "div[data-test='mms-pdp-details-mainfeatures']",
+            "div#features-content",
+        ],
+        "in_page_extractor": _MEDIAMARKT_IN_PAGE_JS,
         "wait_for_any": ['h1[data-test="product-title"]', 'span[data-test="branded-price-whole-value"]'],
         "before_capture": mediamarkt_before_capture,
+        "wait_budget": 15,
+        "page_load": "complete",
     },
     "n11.com": {
+        "fetch_mode": "browser",
+        "max_concurrency": 1,
+        "rate_per_sec": 0.5,
         "parser": _scrape_n11,
+        "parse_scope": [
+            "h1.proName",
+            "div.newPrice",
+            "div.priceContainer",
+            "div.priceDetail",
+            "div.unf-prop-context",
+            "div#unf-prop",
+            "div.product-properties",
+        ],
+        "in_page_extractor": _N11_IN_PAGE_JS,
         "wait_for_any": ['h1.proName', 'div.newPrice ins'],
         "before_capture": n11_before_capture,
+        "wait_budget": 10,
+        "page_load": "complete",
     },
     "itopya.com": {
+        "fetch_mode": "http_then_browser",
         "parser": _scrape_itopya,
+        "listing": {"parser": _list_itopya, "page_param": "pg", "fetch_mode": "http_then_browser", "wait_for_any": ['div.product']},
+        "parse_scope": [
+            ".product-name-title",
+            "h1",
+            ".price",
+            ".newPrice",
+            ".product-new-price",
+            "span.fyatsyt",
+        ],
         "wait_for_any": ['.product-name-title', '.price', ".newPrice > ins", "h1"],
         "before_capture": itopya_before_capture,
+        "wait_budget": 8,
     },
     "gaming.gen.tr": {
+        "fetch_mode": "http_then_browser",
         "parser": _scrape_gaming_gen,
+        "parse_scope": [
+            "h1",
+            ".product_title",
+            "p.price",
+            "table.shop_attributes",
+        ],
         "wait_for_any": ["h1.product_title.entry-title", ".price", "body"],
         "before_capture": _gaming_gen_before_capture,
+        "wait_budget": 8,
     },
     "gamegaraj.com": {
+        "fetch_mode": "browser",
         "parser": _scrape_gamegaraj,
+        "parse_scope": [
+            "h1",
+            "h2",
+            "p[class*='text-3xl']",
+            "p[id='openInstallment']",
+            "ul.my-4",
+            ".space-y-1",
+            "div.prose",
+        ],
         "wait_for_any": ["h1", "body", ".price", ".product-title", ".container", "main", "#app"],
         "before_capture": _gamegaraj_before_capture,
+        "wait_budget": 8,
     },
 }
 
@@ -1005,66 +2551,831 @@ SITE_CONFIG = {
 # Ana akış
 # =========================
 
-def get_page_html_with_selenium(url: str, wait_for_any: Optional[List[str]] = None, before_capture=None) -> Optional[str]:
-    driver = None
+def _domain_key(url: str) -> Optional[str]:
+    for d in SITE_CONFIG.keys():
+        if d in url:
+            return d
+    return None
+
+def canonical_product_url(url: str) -> str:
+    """
+    Aynı ürün sayfasının izleme varyantlarını tek URL'ye indirger: sadece bilinen izleme parametreleri
+    (html_cache.is_tracking_param: utm_*, gclid, ref...) ve sitenin SITE_CONFIG tracking_params'ı atılır.
+    Varyant/satıcı seçen parametreler (Amazon th/psc, Trendyol merchantId, Hepsiburada magaza) korunur;
+    kalanlar sıralanır. Site yolu için SITE_CONFIG canonical_path kullanılır. Desteklenmeyen sitelerde URL
+    olduğu gibi döner.
+    """
+    domain_key = _domain_key(url)
+    if not domain_key:
+        return url
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    cfg = SITE_CONFIG[domain_key]
+    canonical_path = cfg.get("canonical_path")
+    if canonical_path:
+        path = canonical_path(path)
+    site_tracking = cfg.get("tracking_params", ())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not html_cache.is_tracking_param(k) and k not in site_tracking
+    )
+    return urlunsplit((parts.scheme.lower() or "https", parts.netloc.lower(), path, urlencode(query), ""))
+
+# =========================
+# Kapsamlı ayrıştırma
+# =========================
+
+PARSER_BACKEND = os.getenv("SCRAPER_PARSER_BACKEND", "lxml")
+# Kapsamlı ayrıştırma site bazında açılır; seçiciler gerçek sayfalarda doğrulanana kadar varsayılan kapalı.
+#   SCRAPER_PARSE_SCOPE= (boş) / 0 → kapalı, 1 / all → parse_scope tanımlı tüm siteler, "a.com,b.com" → sadece bunlar
+_PARSE_SCOPE_ENV = os.getenv("SCRAPER_PARSE_SCOPE", "").strip().lower()
+PARSE_SCOPE_SITES = (
+    set() if _PARSE_SCOPE_ENV in ("", "0") else
+    {"*"} if _PARSE_SCOPE_ENV in ("1", "all") else
+    {d.strip() for d in _PARSE_SCOPE_ENV.split(",") if d.strip()}
+)
+
+def _scope_enabled(domain_key: str) -> bool:
+    return "*" in PARSE_SCOPE_SITES or domain_key in PARSE_SCOPE_SITES
+
+_SCOPE_TOKEN_RE = re.compile(r"""#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[*^$]?=)\s*(?P<val>"[^"]*"|'[^']*'|[^\]\s]+))?\s*\]""")
+
+def _compile_scope_selector(selector: str):
+    """
+    Basit CSS seçicisini (etiket, #id, .sınıf, [attr], [attr=..], [attr*=..], [attr^=..], [attr$=..])
+    etiket adı + öznitelikler üzerinde çalışan bir fonksiyona çevirir. Alt seçicilerde sadece ilk parça
+    kullanılır (kapsam genişler, daralmaz).
+    """
+    first = selector.strip().split()[0]
+    m = re.match(r"[a-zA-Z][\w-]*|\*", first)
+    tag = m.group(0).lower() if m and m.group(0) != "*" else None
+    rest = first[m.end():] if m else first
+    conds = []
+    for tok in _SCOPE_TOKEN_RE.finditer(rest):
+        if tok.group("id"):
+            conds.append(("id", "=", tok.group("id")))
+        elif tok.group("cls"):
+            conds.append(("class", "~=", tok.group("cls")))
+        else:
+            val = tok.group("val")
+            if val and val[0] in "\"'":
+                val = val[1:-1]
+            conds.append((tok.group("attr"), tok.group("op"), val))
+
+    def matches(name: str, attrs: Dict[str, Any]) -> bool:
+        if tag and name != tag:
+            return False
+        for attr, op, val in conds:
+            raw = attrs.get(attr)
+            if raw is None:
+                return False
+            if isinstance(raw, (list, tuple)):
+                raw = " ".join(raw)
+            if op is None:
+                continue
+            if op == "~=" and val not in raw.split():
+                return False
+            if op == "=" and raw != val:
+                return False
+            if op == "*=" and val not in raw:
+                return False
+            if op == "^=" and not raw.startswith(val):
+                return False
+            if op == "$=" and not raw.endswith(val):
+                return False
+        return True
+    return matches
+
+def _scope_keep(el, matchers) -> bool:
+    name = el.tag.lower() if isinstance(el.tag, str) else ""
+    if name == "meta":
+        return True
+    if name == "script":
+        return el.get("type") == "application/ld+json"
+    return any(m(name, el.attrib) for m in matchers)
+
+@lru_cache(maxsize=None)
+def _scope_matchers(domain_key: str) -> Tuple:
+    scope = (SITE_CONFIG.get(domain_key) or {}).get("parse_scope") or []
+    return tuple(_compile_scope_selector(s) for s in scope)
+
+def _scoped_markup(html: str, matchers: Tuple) -> Optional[str]:
+    """
+    Belgeyi doğrudan lxml ile (C tarafında) ayrıştırır ve sadece kapsam seçicilerine uyan alt ağaçları
+    + meta/JSON-LD etiketlerini küçük bir HTML'e serileştirir. BeautifulSoup ağacı bu parça üzerinden kurulur.
+    Eşleşen düğümün altına inilmez (alt ağaç zaten bütün olarak alınır).
+    """
     try:
-        driver = _build_driver()
-        print(f"[Scraper] Selenium ile sayfa açılıyor: {url[:80]}...")
-        driver.get(url)
+        root = lxml.html.document_fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return None
+    head, body = [], []
+    stack = [root]
+    while stack:
+        el = stack.pop()
+        for child in reversed(el):
+            if not isinstance(child.tag, str):
+                continue
+            if _scope_keep(child, matchers):
+                part = lxml.html.tostring(child, encoding="unicode", with_tail=False)
+                (head if child.tag in ("meta", "script") else body).append(part)
+            else:
+                stack.append(child)
+    if not body:
+        return None
+    # Alt ağaçlar satır sonuyla ayrılır: metin aramaları bir parçadan ötekine taşmasın (orijinalde bitişik değiller)
+    return "<html><head>" + "".join(head) + "</head><body>" + "\n".join(body) + "</body></html>"
+
+def parse_product_html(domain_key: str, html: str, url: str) -> Optional[Dict[str, Any]]:
+    """
+    Kaydedilmiş/çekilmiş HTML'i sitenin parser'ıyla ayrıştırır (ağ ve tarayıcı gerektirmez).
+    Site için kapsam açıksa (PARSE_SCOPE_SITES) önce sadece ürün alt ağaçları ayrıştırılır; sonuç fiyat ve
+    özellikleriyle tam değilse kapsam dışında kalan veri kaybolmasın diye tam belgeye dönülür.
+    """
+    parser = SITE_CONFIG[domain_key]["parser"]
+    matchers = _scope_matchers(domain_key) if _scope_enabled(domain_key) else ()
+    scoped = _scoped_markup(html, matchers) if matchers else None
+    if scoped is not None:
+        soup = BeautifulSoup(scoped, PARSER_BACKEND)
+        data = parser(soup, url, StructuredData.from_soup(soup))
+        if data and data.get("price") and data.get("specs"):
+            return data
+        _count(f"parse_scope_fallback:{domain_key}")
+    soup = BeautifulSoup(html, PARSER_BACKEND)
+    return parser(soup, url, StructuredData.from_soup(soup))
+
+IN_PAGE_EXTRACT = os.getenv("SCRAPER_IN_PAGE_EXTRACT", "1") == "1"
+
+# Site extractor'larının ortak yardımcıları; clean() BeautifulSoup get_text(strip=True) ile aynı metni üretir
+_IN_PAGE_PRELUDE_JS = """
+const clean = (el) => {
+    if (!el) return '';
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let out = '', node;
+    while ((node = walker.nextNode())) {
+        const tag = node.parentNode && node.parentNode.nodeName;
+        if (tag === 'SCRIPT' || tag === 'STYLE') continue;
+        out += node.nodeValue.trim();
+    }
+    return out;
+};
+const txt = (sels) => {
+    for (const s of sels) {
+        let el = null;
+        try { el = document.querySelector(s); } catch (e) { continue; }
+        const t = clean(el);
+        if (t) return t;
+    }
+    return null;
+};
+const attr = (sel, name) => {
+    const el = document.querySelector(sel);
+    const v = el ? (el.getAttribute(name) || '').trim() : '';
+    return v || null;
+};
+const pairs = (rowSel, keySel, valSel, specs) => {
+    specs = specs || {};
+    for (const row of document.querySelectorAll(rowSel)) {
+        const k = clean(row.querySelector(keySel)), v = clean(row.querySelector(valSel));
+        if (k && v && !(k in specs)) specs[k] = v;
+    }
+    return specs;
+};
+// StructuredData.itemprop ile aynı: ilk dolu [itemprop] (meta → content, link → href, diğerleri content/metin)
+const itemprop = (name) => {
+    for (const el of document.querySelectorAll('[itemprop="' + name + '"]')) {
+        const tag = el.nodeName;
+        const v = (tag === 'META' ? el.getAttribute('content')
+                 : tag === 'LINK' ? el.getAttribute('href')
+                 : (el.getAttribute('content') || clean(el))) || '';
+        if (v.trim()) return v.trim();
+    }
+    return null;
+};
+const jsonld = () => {
+    const out = [];
+    for (const s of document.querySelectorAll('script[type="application/ld+json"]')) {
+        try {
+            const obj = JSON.parse(s.textContent || '{}');
+            for (const o of (Array.isArray(obj) ? obj : [obj])) if (o && typeof o === 'object') out.push(o);
+        } catch (e) {}
+    }
+    return out;
+};
+"""
 
-        if before_capture:
-            try:
-                before_capture(driver)
-            except Exception as e:
-                print(f"[Scraper] 'before_capture' adımında hata: {e}")
-                pass
+def _extract_in_page(driver: webdriver.Chrome, domain_key: Optional[str], url: str, script: str) -> Optional[Dict[str, Any]]:
+    """
+    Site extractor JS'ini canlı DOM'da çalıştırır; parser'larla aynı sözlüğü, ad/fiyat eksikse None döndürür.
+    Marka önceliği: brand → _guess_brand(ad) (skip_guess yoksa) → brand_hint; parser'lardaki sırayla aynıdır.
+    """
+    start = time.time()
+    try:
+        raw = driver.execute_script(_IN_PAGE_PRELUDE_JS + script)
+    except WebDriverException as e:
+        print(f"[Scraper] In-page extractor hatası ({domain_key}): {e}")
+        raw = None
+    finally:
+        _record_timing(f"extract_js:{domain_key}", time.time() - start)
+    if not isinstance(raw, dict):
+        return None
 
-        _scroll_soft(driver, steps=2, pause=0.5)
+    data: Dict[str, Any] = {"source": raw.get("source") or domain_key, "url": url}
+    data["name"] = (raw.get("name") or "").strip() or None
+    data["price"] = _parse_price(raw.get("price"))
+    specs = raw.get("specs") if isinstance(raw.get("specs"), dict) else {}
+    data["specs"] = {str(k): str(v) for k, v in specs.items() if k and v}
+    guess = None if raw.get("skip_guess") else _guess_brand(data["name"], url=url)
+    data["brand"] = raw.get("brand") or guess or raw.get("brand_hint")
+    if not data["name"] or not data["price"]:
+        return None
+    return data
 
-        if wait_for_any:
-            print("[Scraper] bir veya daha fazla seçici bekleniyor...")
-            wait_any_selector(driver, wait_for_any, timeout=35, visible=True)
+def _prefer_complete(in_page: Optional[Dict[str, Any]], parsed: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """In-page sonucu eksikse (özellik yok) page_source parser'ının sonucu tercih edilir; ikisi de yoksa None."""
+    if parsed and (parsed.get("specs") or not in_page or not in_page.get("specs")):
+        return parsed
+    return in_page or parsed
+
+def _capture_with_selenium(url: str, wait_for_any: Optional[List[str]] = None, before_capture=None,
+                           in_page_extractor: Optional[str] = None, wait_budget: Optional[float] = None,
+                           capture_wait: Optional[float] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Sayfayı havuzdaki bir driver'la açar; (in-page veri, html) döndürür.
+    capture_wait verilirse wait_for_any taban beklemesi site ayarı yerine bu olur (fiyat yenileme gibi kısa işler).
+    Extractor ad, fiyat ve özellikleri birlikte bulduysa page_source hiç alınmaz (önbellek kaydı gereken modlar
+    hariç); eksik sonuçta html de döner ve çağıran _prefer_complete ile parser sonucunu tercih eder.
+    """
+    cached = html_cache.lookup(url, "browser")
+    if cached is not None:
+        print(f"[Scraper] HTML önbellekten alındı (browser): {url[:80]}")
+        return None, cached
+    if not html_cache.should_fetch():
+        print(f"[Scraper] Replay modunda önbellek kaydı yok: {url[:80]}")
+        return None, None
 
-        html = driver.page_source
-        if not html or len(html) < 3000:
-            print("[Scraper] Uyarı: Kısa/boş HTML (bot koruması olabilir).")
-            return None
-        print(f"[Scraper] Başarılı: {len(html)} karakter alındı.")
-        return html
+    try:
+        domain_key = _domain_key(url)
+        cfg = SITE_CONFIG.get(domain_key) or {}
+        with get_driver_pool().lease() as driver:
+            _apply_resource_blocking(driver)
+            print(f"[Scraper] Selenium ile sayfa açılıyor: {url[:80]}...")
+            load_start = time.time()
+            _reset_network_tracker(driver)
+            driver.get(url)
+            if cfg.get("page_load") == "complete" and PAGE_LOAD_STRATEGY != "normal":
+                _wait_page_complete(driver)
+            _record_timing(f"page_load:{domain_key}", time.time() - load_start)
+
+            budget = WaitBudget(wait_budget if wait_budget is not None else cfg.get("wait_budget", DEFAULT_WAIT_BUDGET))
+            if before_capture:
+                try:
+                    before_capture(driver, budget)
+                except Exception as e:
+                    print(f"[Scraper] 'before_capture' adımında hata: {e}")
+                    pass
+
+            _scroll_soft(driver, steps=2, pause=0.5, budget=budget)
+            _record_timing(f"wait_budget:{domain_key}", budget.spent())
+
+            if wait_for_any:
+                print("[Scraper] bir veya daha fazla seçici bekleniyor...")
+                # Bütçe bitmiş olsa da zorunlu seçiciler için site bazında taban süre tanınır
+                floor = capture_wait if capture_wait is not None else cfg.get("capture_wait", DEFAULT_CAPTURE_WAIT)
+                try:
+                    wait_any_selector(driver, wait_for_any, timeout=max(budget.remaining(), floor), visible=True)
+                except TimeoutException:
+                    # Sayfa yüklendi ama ürün seçicisi yok (ürün dışı URL): site hatası sayılmaz
+                    print(f"[Scraper] Ürün seçicileri bulunamadı: {url[:80]}")
+                    return None, None
+
+            transferred = _page_transfer_bytes(driver)
+            if transferred is not None:
+                _count(f"transfer_bytes:{domain_key}", transferred)
+                _count(f"transfer_pages:{domain_key}")
+
+            data = None
+            if in_page_extractor and IN_PAGE_EXTRACT:
+                data = _extract_in_page(driver, domain_key, url, in_page_extractor)
+                _count(f"extract_js_{'hit' if data else 'miss'}:{domain_key}")
+                # Sadece tam sonuçta erken dönülür; eksik özellikte parser'ın yedek yolları page_source üzerinde denenir
+                if data and data["specs"] and not html_cache.records():
+                    print(f"[Scraper] Başarılı: veri sayfa içinde çıkarıldı ({len(data['specs'])} özellik).")
+                    return data, None
+
+            html = driver.page_source
+            if not html or len(html) < 3000:
+                print("[Scraper] Uyarı: Kısa/boş HTML (bot koruması olabilir).")
+                _note_fetch_failure("browser_short")
+                return data, None
+            print(f"[Scraper] Başarılı: {len(html)} karakter alındı.")
+            html_cache.store(url, "browser", html)
+            return data, html
 
     except TimeoutException:
         print(f"[Scraper] Zaman aşımı: {url}")
-        return None
+        _note_fetch_failure("browser_timeout")
+        return None, None
     except Exception as e:
         print(f"[Scraper] Selenium hatası: {e}")
-        return None
-    finally:
-        if driver:
-            driver.quit()
+        _note_fetch_failure("browser_error")
+        return None, None
+
+def get_page_html_with_selenium(url: str, wait_for_any: Optional[List[str]] = None, before_capture=None) -> Optional[str]:
+    return _capture_with_selenium(url, wait_for_any=wait_for_any, before_capture=before_capture)[1]
+
+# =========================
+# Site bazlı nezaket zamanlayıcısı
+# =========================
+
+# max_concurrency: aynı anda açık sayfa sayısı; rate_per_sec/burst: sayfa açılışları için token bucket
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SCRAPER_SITE_CONCURRENCY", "2"))
+DEFAULT_RATE_PER_SEC = float(os.getenv("SCRAPER_SITE_RATE", "1.0"))
+POLITE_MAX_WAIT = float(os.getenv("SCRAPER_POLITE_MAX_WAIT", "20"))
+
+class PolitenessScheduler:
+    """
+    SITE_CONFIG domain'i başına eşzamanlılık sınırı + token bucket. scrape_product_page her sayfayı
+    slot() içinde çeker; bekleme POLITE_MAX_WAIT'i aşarsa sayfa atlanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, Any]] = {}
+
+    def _site(self, domain_key: str) -> Dict[str, Any]:
+        with self._lock:
+            site = self._sites.get(domain_key)
+            if site is None:
+                cfg = SITE_CONFIG.get(domain_key) or {}
+                limit = int(cfg.get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+                rate = float(cfg.get("rate_per_sec", DEFAULT_RATE_PER_SEC))
+                site = {
+                    "limit": limit,
+                    "slots": threading.BoundedSemaphore(limit),
+                    "bucket": TokenBucket(rate, cfg.get("burst", limit)),
+                    "active": 0,
+                    "waited_s": 0.0,
+                    "skipped": 0,
+                }
+                self._sites[domain_key] = site
+            return site
+
+    def acquire(self, domain_key: str, max_wait: float = POLITE_MAX_WAIT) -> bool:
+        site = self._site(domain_key)
+        start = time.time()
+        deadline = start + max_wait
+        if not site["slots"].acquire(timeout=max(0.0, max_wait)):
+            self._skip(site)
+            return False
+        while True:
+            wait = site["bucket"].try_take()
+            if wait <= 0:
+                break
+            if time.time() + wait > deadline:
+                site["slots"].release()
+                self._skip(site)
+                return False
+            time.sleep(wait)
+        self._granted(domain_key, site, start)
+        return True
+
+    async def acquire_async(self, domain_key: str, max_wait: float = POLITE_MAX_WAIT) -> bool:
+        """acquire()'ın event loop'u bloklamayan karşılığı; slot ve token beklemeleri asyncio.sleep ile yapılır."""
+        site = self._site(domain_key)
+        start = time.time()
+        deadline = start + max_wait
+        while not site["slots"].acquire(blocking=False):
+            if time.time() >= deadline:
+                self._skip(site)
+                return False
+            await asyncio.sleep(0.05)
+        try:
+            while True:
+                wait = site["bucket"].try_take()
+                if wait <= 0:
+                    break
+                if time.time() + wait > deadline:
+                    site["slots"].release()
+                    self._skip(site)
+                    return False
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            site["slots"].release()
+            raise
+        self._granted(domain_key, site, start)
+        return True
+
+    def _granted(self, domain_key: str, site: Dict[str, Any], start: float) -> None:
+        with self._lock:
+            site["active"] += 1
+            site["waited_s"] += time.time() - start
+        _record_timing(f"polite_wait:{domain_key}", time.time() - start)
+
+    def _skip(self, site: Dict[str, Any]) -> None:
+        with self._lock:
+            site["skipped"] += 1
+
+    def release(self, domain_key: str) -> None:
+        site = self._site(domain_key)
+        with self._lock:
+            site["active"] -= 1
+        site["slots"].release()
+
+    @contextmanager
+    def slot(self, domain_key: str, max_wait: float = POLITE_MAX_WAIT):
+        """Slot alınabildiyse True, bekleme süresi aşıldıysa False verir."""
+        ok = self.acquire(domain_key, max_wait)
+        try:
+            yield ok
+        finally:
+            if ok:
+                self.release(domain_key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                d: {"limit": s["limit"], "rate_per_sec": s["bucket"].rate, "active": s["active"],
+                    "waited_s": round(s["waited_s"], 2), "skipped": s["skipped"]}
+                for d, s in self._sites.items()
+            }
+
+_SCHEDULER = PolitenessScheduler()
+
+def get_scheduler() -> PolitenessScheduler:
+    return _SCHEDULER
+
+# =========================
+# Site bazlı devre kesici
+# =========================
+
+BREAKER_WINDOW = int(os.getenv("SCRAPER_BREAKER_WINDOW", "10"))
+BREAKER_MIN_CALLS = int(os.getenv("SCRAPER_BREAKER_MIN_CALLS", "4"))
+BREAKER_FAILURE_RATE = float(os.getenv("SCRAPER_BREAKER_FAILURE_RATE", "0.6"))
+BREAKER_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", "120"))
+
+class CircuitBreakers:
+    """
+    SITE_CONFIG domain'i başına devre kesici. Son BREAKER_WINDOW denemede hata oranı eşiği aşınca devre
+    açılır ve domain BREAKER_COOLDOWN boyunca atlanır; süre dolunca tek bir deneme (half_open) geçer,
+    başarılıysa devre kapanır, değilse yeniden açılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, Any]] = {}
+
+    def _site(self, domain_key: str) -> Dict[str, Any]:
+        site = self._sites.get(domain_key)
+        if site is None:
+            site = {"state": "closed", "outcomes": deque(maxlen=BREAKER_WINDOW), "opened_at": None,
+                    "probing": False, "opens": 0, "rejected": 0}
+            self._sites[domain_key] = site
+        return site
+
+    def allow(self, domain_key: str) -> bool:
+        with self._lock:
+            site = self._site(domain_key)
+            if site["state"] == "open" and time.time() - site["opened_at"] >= BREAKER_COOLDOWN:
+                site["state"] = "half_open"
+            if site["state"] == "closed":
+                return True
+            if site["state"] == "half_open" and not site["probing"]:
+                site["probing"] = True
+                return True
+            site["rejected"] += 1
+            return False
+
+    def record(self, domain_key: str, ok: Optional[bool]) -> None:
+        """ok=None: deneme yapılmadı (ör. nezaket limiti); half_open deneme hakkı geri verilir."""
+        with self._lock:
+            site = self._site(domain_key)
+            if site["state"] == "half_open":
+                site["probing"] = False
+                if ok is None:
+                    return
+                if ok:
+                    site["state"] = "closed"
+                    site["outcomes"].clear()
+                    print(f"[Scraper] Devre kapandı: {domain_key}")
+                else:
+                    self._open(domain_key, site)
+                return
+            if ok is None or site["state"] != "closed":
+                return
+            site["outcomes"].append(ok)
+            outcomes = site["outcomes"]
+            failures = outcomes.count(False)
+            if len(outcomes) >= BREAKER_MIN_CALLS and failures / len(outcomes) >= BREAKER_FAILURE_RATE:
+                self._open(domain_key, site)
+
+    def _open(self, domain_key: str, site: Dict[str, Any]) -> None:
+        site["state"] = "open"
+        site["opened_at"] = time.time()
+        site["opens"] += 1
+        site["outcomes"].clear()
+        _count(f"breaker_open:{domain_key}")
+        print(f"[Scraper] Devre açıldı: {domain_key} ({BREAKER_COOLDOWN:.0f} sn atlanacak)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for d, s in self._sites.items():
+                outcomes = list(s["outcomes"])
+                retry_in = None
+                if s["state"] == "open":
+                    retry_in = round(max(0.0, BREAKER_COOLDOWN - (time.time() - s["opened_at"])), 1)
+                out[d] = {
+                    "state": s["state"],
+                    "failure_rate": round(outcomes.count(False) / len(outcomes), 2) if outcomes else 0.0,
+                    "window": len(outcomes),
+                    "opens": s["opens"],
+                    "rejected": s["rejected"],
+                    "retry_in_s": retry_in,
+                }
+            return out
+
+_BREAKERS = CircuitBreakers()
+
+def interleave_by_domain(items: List[Any], key=lambda x: x) -> List[Any]:
+    """
+    Öğeleri domain'e göre round-robin sıralar (hb, ty, hb, ty, ...); sıra domain içinde korunur.
+    Thread havuzuna bu sırayla verilen işler aynı siteye yığılmaz.
+    """
+    buckets: Dict[str, List[Any]] = {}
+    for item in items:
+        buckets.setdefault(_domain_key(key(item)) or "", []).append(item)
+    out: List[Any] = []
+    queues = list(buckets.values())
+    while queues:
+        for q in queues:
+            out.append(q.pop(0))
+        queues = [q for q in queues if q]
+    return out
 
 def scrape_product_page(url: str) -> Optional[Dict[str, Any]]:
-    domain_key = None
-    for d in SITE_CONFIG.keys():
-        if d in url:
-            domain_key = d
-            break
+    domain_key = _domain_key(url)
     if not domain_key:
         print(f"[Scraper] Desteklenmeyen site: {url}")
         return None
 
     cfg = SITE_CONFIG[domain_key]
-    html = get_page_html_with_selenium(
+    fetch_mode = _resolve_fetch_mode(cfg)
+    if not html_cache.should_fetch():
+        return _scrape_with_mode(url, domain_key, cfg, fetch_mode)
+    return _run_guarded(domain_key, url, lambda: _scrape_with_mode(url, domain_key, cfg, fetch_mode))
+
+def _resolve_fetch_mode(cfg: Dict[str, Any]) -> str:
+    fetch_mode = cfg.get("fetch_mode", "browser")
+    if fetch_mode not in FETCH_MODES:
+        print(f"[Scraper] Geçersiz fetch_mode '{fetch_mode}', 'browser' kullanılıyor.")
+        fetch_mode = "browser"
+    return fetch_mode
+
+def _fetch_outcome(data: Any, failures: List[str]) -> Optional[bool]:
+    """Sonuç varsa başarı; yoksa sadece getirme hatası/engel notu düşülmüşse hata, aksi halde sayılmaz (None)."""
+    if data:
+        return True
+    return False if failures else None
+
+def _run_guarded(domain_key: str, url: str, fetch):
+    """
+    fetch()'i devre kesici + nezaket slotu içinde çalıştırır. Devre kesiciye sadece getirme hataları ve
+    engeller hata olarak yazılır; sayfa açılıp ayrıştırıcı sonuç vermezse deneme sayılmaz.
+    """
+    if not _BREAKERS.allow(domain_key):
+        print(f"[Scraper] {domain_key} için devre açık, sayfa atlandı: {url[:80]}")
+        _count(f"breaker_skipped:{domain_key}")
+        return None
+    outcome: Optional[bool] = None
+    try:
+        with _SCHEDULER.slot(domain_key) as ok:
+            if not ok:
+                print(f"[Scraper] {domain_key} için nezaket limiti doldu, sayfa atlandı: {url[:80]}")
+                _count(f"polite_skipped:{domain_key}")
+                return None
+            failures: List[str] = []
+            token = _FETCH_FAILURES.set(failures)
+            outcome = False
+            try:
+                data = fetch()
+            finally:
+                _FETCH_FAILURES.reset(token)
+            outcome = _fetch_outcome(data, failures)
+            return data
+    finally:
+        _BREAKERS.record(domain_key, outcome)
+
+def _scrape_with_mode(url: str, domain_key: str, cfg: Dict[str, Any], fetch_mode: str) -> Optional[Dict[str, Any]]:
+    start = time.time()
+    if fetch_mode in ("http", "http_then_browser"):
+        html = get_page_html_with_http(url)
+        data = parse_product_html(domain_key, html, url) if html else None
+        if data:
+            _count("http_success")
+            _record_timing("scrape_http", time.time() - start)
+            return data
+        if fetch_mode == "http":
+            _count("http_miss")
+            return None
+        print(f"[Scraper] HTTP yolu sonuç vermedi, Selenium'a geçiliyor: {url[:80]}")
+        _count("http_escalated")
+
+    data, html = _capture_with_selenium(
         url,
         wait_for_any=cfg.get("wait_for_any"),
         before_capture=cfg.get("before_capture"),
+        in_page_extractor=cfg.get("in_page_extractor"),
     )
-    if not html:
-        return None
+    if html:
+        data = _prefer_complete(data, parse_product_html(domain_key, html, url))
+    _count("browser_success" if data else "browser_miss")
+    _record_timing("scrape_browser", time.time() - start)
+    return data
 
-    soup = BeautifulSoup(html, "lxml")
-    return cfg["parser"](soup, url)
+# =========================
+# Sadece fiyat yenileme
+# =========================
+
+PRICE_REFRESH_WAIT_BUDGET = float(os.getenv("SCRAPER_PRICE_REFRESH_WAIT_BUDGET", "3"))
+# Fiyat seçicisi için taban bekleme; DEFAULT_CAPTURE_WAIT (35 sn) yerine, seçici gelmeyen sayfa kısa sürede bırakılır
+PRICE_REFRESH_CAPTURE_WAIT = float(os.getenv("SCRAPER_PRICE_REFRESH_CAPTURE_WAIT", "5"))
+
+def _refresh_price_with_mode(url: str, domain_key: str, cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Sonuçta '_variant' sayfanın hangi yoldan (html_cache varyantı) geldiğini söyler."""
+    fetch_mode = _resolve_fetch_mode(cfg)
+    if fetch_mode in ("http", "http_then_browser"):
+        html = get_page_html_with_http(url)
+        data = parse_product_html(domain_key, html, url) if html else None
+        if data or fetch_mode == "http":
+            return data and {**data, "_variant": "http"}
+    # Spec sekmesi/kaydırma hook'ları atlanır; fiyat seçicisi görünür olunca in-page extractor yeterli
+    data, html = _capture_with_selenium(
+        url,
+        wait_for_any=cfg.get("wait_for_any"),
+        in_page_extractor=cfg.get("in_page_extractor"),
+        wait_budget=PRICE_REFRESH_WAIT_BUDGET,
+        capture_wait=PRICE_REFRESH_CAPTURE_WAIT,
+    )
+    data = data or (parse_product_html(domain_key, html, url) if html else None)
+    return data and {**data, "_variant": "browser"}
+
+def refresh_price(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Bilinen bir ürün sayfasının sadece fiyatını yeniler: {url, price, price_checked_at}.
+    Spec genişletme adımları çalışmaz; tarayıcı gereken sitelerde bekleme bütçesi PRICE_REFRESH_WAIT_BUDGET,
+    fiyat seçicisi için taban bekleme PRICE_REFRESH_CAPTURE_WAIT'tir.
+    Sayfa html_cache'ten geldiyse price_checked_at kaydın yazıldığı zamandır (fiyat o anki fiyattır).
+    """
+    domain_key = _domain_key(url)
+    if not domain_key:
+        return None
+    cfg = SITE_CONFIG[domain_key]
+    start = time.time()
+    if html_cache.should_fetch():
+        data = _run_guarded(domain_key, url, lambda: _refresh_price_with_mode(url, domain_key, cfg))
+    else:
+        data = _refresh_price_with_mode(url, domain_key, cfg)
+    _record_timing(f"price_refresh:{domain_key}", time.time() - start)
+    _count(f"price_refresh_{'hit' if data else 'miss'}:{domain_key}")
+    if not data or not data.get("price"):
+        return None
+    checked_at = time.time()
+    if html_cache.reads():
+        # cache modunda canlı çekilen sayfa da kaydedilir; o zaman stored_at zaten şimdiki zamandır
+        checked_at = min(checked_at, html_cache.stored_at(url, data["_variant"]) or checked_at)
+    return {"url": url, "price": data["price"], "price_checked_at": checked_at}
+
+def refresh_prices(urls: List[str], max_workers: int = 4) -> List[Dict[str, Any]]:
+    """URL listesinin fiyatlarını paralel yeniler; domainler sırayla karıştırılır. Başarısızlar listede yer almaz."""
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(refresh_price, interleave_by_domain(list(urls))))
+    return [r for r in results if r]
+
+LISTING_MAX_PAGES = int(os.getenv("SCRAPER_LISTING_MAX_PAGES", "3"))
+
+def listing_page_url(domain_key: str, path: str, page: int = 1) -> str:
+    """CATEGORY_SITES yolundan (ör. 'hazir-sistem') sayfa numaralı kategori URL'i üretir."""
+    base = path if path.startswith("http") else f"https://www.{domain_key}/{path.lstrip('/')}"
+    if page <= 1:
+        return base
+    parts = urlsplit(base)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != SITE_CONFIG[domain_key]["listing"]["page_param"]]
+    query.append((SITE_CONFIG[domain_key]["listing"]["page_param"], str(page)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+def parse_listing_html(domain_key: str, html: str, url: str) -> List[Dict[str, Any]]:
+    """Kategori sayfası HTML'ini sitenin liste ayrıştırıcısıyla ürün kartlarına çevirir."""
+    soup = BeautifulSoup(html, PARSER_BACKEND)
+    return SITE_CONFIG[domain_key]["listing"]["parser"](soup, url, StructuredData.from_soup(soup))
+
+def _fetch_listing_page(domain_key: str, url: str) -> List[Dict[str, Any]]:
+    listing = SITE_CONFIG[domain_key]["listing"]
+    if listing.get("fetch_mode", "browser") in ("http", "http_then_browser"):
+        html = get_page_html_with_http(url)
+        products = parse_listing_html(domain_key, html, url) if html else []
+        if products or listing["fetch_mode"] == "http":
+            return products
+    _, html = _capture_with_selenium(url, wait_for_any=listing.get("wait_for_any"))
+    return parse_listing_html(domain_key, html, url) if html else []
+
+def scrape_listing(domain_key: str, path: str, max_pages: int = LISTING_MAX_PAGES) -> List[Dict[str, Any]]:
+    """
+    Kategori sayfasını sayfa sayfa gezer; her sayfa yüklemesinden tüm ürün kartlarını döndürür.
+    Yeni ürün çıkmayan ilk sayfada durur. Sayfalar da devre kesici ve nezaket zamanlayıcısından geçer.
+    """
+    if "listing" not in (SITE_CONFIG.get(domain_key) or {}):
+        print(f"[Scraper] {domain_key} için liste ayrıştırıcısı yok.")
+        return []
+    seen: Dict[str, Dict[str, Any]] = {}
+    for page in range(1, max(1, max_pages) + 1):
+        url = listing_page_url(domain_key, path, page)
+        start = time.time()
+        if html_cache.should_fetch():
+            products = _run_guarded(domain_key, url, lambda: _fetch_listing_page(domain_key, url)) or []
+        else:
+            products = _fetch_listing_page(domain_key, url)
+        _record_timing(f"listing:{domain_key}", time.time() - start)
+        new = [p for p in products if p["url"] not in seen]
+        print(f"[Scraper] Liste {domain_key} s.{page}: {len(products)} kart, {len(new)} yeni")
+        if not new:
+            break
+        for p in new:
+            seen[p["url"]] = p
+        _count(f"listing_products:{domain_key}", len(new))
+    return list(seen.values())
+
+def refresh_profile_template(domains: Optional[List[str]] = None, template_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Profil şablonunu sıfırdan ısıtır: her sitenin ana sayfası açılır, çerez banner'ı kabul edilir ve statik
+    dosyalar HTTP disk önbelleğine alınır. Yeni profil hazır olunca eski şablonun yerine geçer.
+    Kullanım: python scraper.py --refresh-profile
+    """
+    target = template_dir or PROFILE_TEMPLATE_DIR
+    if os.path.realpath(target) == os.path.realpath(_TRACKED_PROFILE_DIR):
+        raise ValueError(f"Depodaki profil dizini şablon olarak yazılamaz: {target}")
+    work = target.rstrip(os.sep) + ".new"
+    shutil.rmtree(work, ignore_errors=True)
+    os.makedirs(work)
+    results: Dict[str, str] = {}
+    driver = _build_driver(profile_dir=work)
+    try:
+        for domain_key in domains or list(SITE_CONFIG):
+            try:
+                _apply_resource_blocking(driver)
+                _reset_network_tracker(driver)
+                driver.get(f"https://www.{domain_key}/")
+                wait_network_idle(driver, idle_ms=500, timeout=8)
+                if accept_consent(driver, domain_key, timeout=5):
+                    results[domain_key] = "consent_accepted"
+                    wait_network_idle(driver, idle_ms=500, timeout=5)
+                else:
+                    results[domain_key] = "consent_present" if _has_consent(driver, domain_key) else "visited"
+            except Exception as e:
+                results[domain_key] = f"error: {e}"
+            print(f"[Scraper] Profil ısıtma: {domain_key} → {results[domain_key]}")
+    finally:
+        # quit() çerezleri ve önbelleği diske yazar
+        driver.quit()
+    old = target.rstrip(os.sep) + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.isdir(target):
+        os.replace(target, old)
+    os.replace(work, target)
+    shutil.rmtree(old, ignore_errors=True)
+    print(f"[Scraper] Profil şablonu yenilendi: {target}")
+    return results
+
+def health_check() -> Dict[str, Any]:
+    """Scraper altyapısının durumunu döndürür (driver çözümü ve havuz)."""
+    driver_info = dict(_CHROMEDRIVER_INFO)
+    pool = _DRIVER_POOL
+    return {
+        "chromedriver": {
+            "resolved": bool(driver_info.get("path")),
+            "path": driver_info.get("path"),
+            "source": driver_info.get("source"),
+            "resolution_ms": driver_info.get("resolution_ms"),
+            "error": driver_info.get("error"),
+        },
+        "driver_pool": pool.stats() if pool else {"size": DRIVER_POOL_SIZE, "initialized": False},
+        "browser_mode": BROWSER_MODE,
+        "profile_template": PROFILE_TEMPLATE_DIR if USE_PROFILE_TEMPLATE and os.path.isdir(PROFILE_TEMPLATE_DIR) else None,
+        "browser_host": _BROWSER_HOST.stats() if BROWSER_MODE == "tabs" else None,
+        "browser_supervisor": _SUPERVISOR.stats(),
+        "fetch_modes": {d: c.get("fetch_mode", "browser") for d, c in SITE_CONFIG.items()},
+        "politeness": _SCHEDULER.stats(),
+        "circuit_breakers": _BREAKERS.stats(),
+        "stats": timing_summary(),
+        "html_cache": html_cache.stats(),
+        "supported_sites": list(SITE_CONFIG.keys()),
+        "status": "ok" if driver_info.get("path") else "chromedriver_not_resolved",
+    }
 
 if __name__ == "__main__":
+    if "--refresh-profile" in sys.argv:
+        print(json.dumps(refresh_profile_template(), ensure_ascii=False, indent=2))
+        sys.exit(0)
     tests = [
         "https://www.hepsiburada.com/msi-cyborg-15-a13vf-892xtr-intel-core-i7-13620h-16gb-512gb-ssd-rtx4060-freedos-15-6-fhd-144hz-tasinabilir-bilgisayar-p-HBCV00005T87HT",
         "https://www.trendyol.com/apple/iphone-air-256gb-uzay-siyahi-p-985256818",
@@ -0,0 +1,137 @@
+# search_cache.py - Brave arama sonuçları için kalıcı önbellek (yerel SQLite)
+"""
+web_search._do_brave_request'in önünde durur; aynı (sorgu, site(ler), count) için TTL içinde API'ye gidilmez.
+Kayıtlar tek bir SQLite dosyasında tutulur, yeniden başlatma/deploy sonrası da geçerlidir.
+
+Anahtar normalize edilir: küçük harf, noktalama atılır, kelimeler tekilleştirilip sıralanır
+("RTX 4060 Laptop" ile "laptop rtx-4060" aynı kayda düşer); site listesi sıralanır.
+
+WEB_SEARCH_CACHE:
+  on      → okunur ve yazılır (varsayılan)
+  refresh → okunmaz, yeni sonuçlar yazılır (bypass)
+  off     → hiç kullanılmaz
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Optional, Dict, Any, List, Iterable
+
+CACHE_PATH = os.getenv("WEB_SEARCH_CACHE_PATH", ".search_cache.sqlite3")
+CACHE_TTL = int(os.getenv("WEB_SEARCH_CACHE_TTL", str(24 * 3600)))
+CACHE_MODE = os.getenv("WEB_SEARCH_CACHE", "on").strip().lower()
+MODES = ("on", "refresh", "off")
+
+if CACHE_MODE not in MODES:
+    print(f"[SearchCache] Geçersiz WEB_SEARCH_CACHE '{CACHE_MODE}', 'on' kullanılıyor.")
+    CACHE_MODE = "on"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_results (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    sites TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+# Thread başına bir bağlantı (sqlite3 bağlantıları thread'ler arası paylaşılmaz); şema/WAL ayarı süreçte bir kez yapılır
+_local = threading.local()
+_lock = threading.Lock()
+_schema_lock = threading.Lock()
+_schema_ready = False
+_stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "bypassed": 0, "errors": 0}
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        # WAL dosyaya kalıcı yazılır; sonraki bağlantılar ayrıca ayarlamaz
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        _schema_ready = True
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        directory = os.path.dirname(CACHE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=5)
+        _ensure_schema(conn)
+        _local.conn = conn
+    return conn
+
+def _bump(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+def normalize_query(q: str) -> str:
+    tokens = re.sub(r"[^\w]+", " ", (q or "").casefold()).split()
+    return " ".join(sorted(set(tokens)))
+
+def cache_key(q: str, sites: Iterable[str], count: int) -> str:
+    return f"{normalize_query(q)}|{','.join(sorted(s.lower() for s in sites))}|{int(count)}"
+
+def reads(bypass: bool = False) -> bool:
+    return CACHE_MODE == "on" and not bypass
+
+def get(q: str, sites: Iterable[str], count: int, bypass: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """TTL içinde kayıt varsa sonuç listesini (boş liste de geçerli bir cevaptır) döndürür."""
+    if not reads(bypass):
+        if CACHE_MODE != "off":
+            _bump("bypassed")
+        return None
+    try:
+        row = _conn().execute(
+            "SELECT results, stored_at FROM search_results WHERE key = ?", (cache_key(q, sites, count),)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[SearchCache] Okunamadı: {e}")
+        _bump("errors")
+        return None
+    if row is None:
+        _bump("misses")
+        return None
+    if time.time() - row[1] > CACHE_TTL:
+        _bump("expired")
+        return None
+    _bump("hits")
+    return json.loads(row[0])
+
+def put(q: str, sites: Iterable[str], count: int, results: List[Dict[str, Any]]) -> None:
+    if CACHE_MODE == "off":
+        return
+    sites = list(sites)
+    try:
+        conn = _conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO search_results (key, query, sites, count, results, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key(q, sites, count), q, ",".join(sites), int(count), json.dumps(results, ensure_ascii=False), time.time()),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"[SearchCache] Yazılamadı: {e}")
+        _bump("errors")
+        return
+    _bump("stores")
+
+def purge_expired() -> int:
+    try:
+        conn = _conn()
+        cur = conn.execute("DELETE FROM search_results WHERE stored_at < ?", (time.time() - CACHE_TTL,))
+        conn.commit()
+        return cur.rowcount
+    except sqlite3.Error as e:
+        print(f"[SearchCache] Temizlenemedi: {e}")
+        return 0
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_stats)
+    return {"mode": CACHE_MODE, "path": CACHE_PATH, "ttl_seconds": CACHE_TTL, **counters}
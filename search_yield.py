@@ -0,0 +1,197 @@
+# search_yield.py - (kategori, site, strateji tipi) başına öğrenilen arama verimi (yerel SQLite)
+"""
+web_search.search_products_on_web her sorgudan sonra kombinasyon başına kaç geçerli sonuç
+(_validate_result_relevance'tan geçen) döndüğünü, candidates.py de bu sonuçlardan kaçının kazınabildiğini yazar.
+Sonraki aramalarda siteler ve stratejiler beklenen verime göre sıralanır, verimsiz kombinasyonlar budanır.
+
+Beklenen verim = sorgu başına geçerli sonuç × kazıma başarı oranı (ikisi de önsel ile yumuşatılır).
+Sayaçlar her güncellemede YIELD_DECAY ile sönümlenir; eski davranış zamanla etkisini yitirir.
+Kanıt YIELD_MIN_SAMPLES sorgunun altındaysa önsel kullanılır: veri yokken sıra değişmez.
+Budanan kombinasyonlar YIELD_EXPLORE olasılıkla yine denenir (yeniden keşif).
+
+WEB_SEARCH_ADAPTIVE=0 sıralamayı ve kaydı kapatır.
+"""
+import os
+import time
+import random
+import sqlite3
+import threading
+from typing import Dict, Any, List, Tuple, Iterable, Set
+
+YIELD_PATH = os.getenv("WEB_SEARCH_YIELD_PATH", ".search_yield.sqlite3")
+ENABLED = os.getenv("WEB_SEARCH_ADAPTIVE", "1") == "1"
+YIELD_MIN_SAMPLES = float(os.getenv("WEB_SEARCH_YIELD_MIN_SAMPLES", "5"))
+YIELD_PRUNE_BELOW = float(os.getenv("WEB_SEARCH_YIELD_PRUNE_BELOW", "0.05"))
+YIELD_EXPLORE = float(os.getenv("WEB_SEARCH_YIELD_EXPLORE", "0.1"))
+YIELD_DECAY = float(os.getenv("WEB_SEARCH_YIELD_DECAY", "0.98"))
+
+# Önsel: 2 sorguda 1 geçerli sonuç, 2 kazımada 1 başarı → veri yokken beklenen verim 0.25
+PRIOR_QUERIES, PRIOR_VALID = 2.0, 1.0
+PRIOR_SCRAPED, PRIOR_SCRAPE_OK = 2.0, 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_yield (
+    category TEXT NOT NULL,
+    site TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    queries REAL NOT NULL DEFAULT 0,
+    valid REAL NOT NULL DEFAULT 0,
+    scraped REAL NOT NULL DEFAULT 0,
+    scrape_ok REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (category, site, strategy)
+)
+"""
+
+_UPSERT = f"""
+INSERT INTO search_yield (category, site, strategy, queries, valid, scraped, scrape_ok, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (category, site, strategy) DO UPDATE SET
+    queries = queries * {YIELD_DECAY!r} + excluded.queries,
+    valid = valid * {YIELD_DECAY!r} + excluded.valid,
+    scraped = scraped * {YIELD_DECAY!r} + excluded.scraped,
+    scrape_ok = scrape_ok * {YIELD_DECAY!r} + excluded.scrape_ok,
+    updated_at = excluded.updated_at
+"""
+
+# Thread başına bir bağlantı (sqlite3 bağlantıları thread'ler arası paylaşılmaz); şema/WAL ayarı süreçte bir kez yapılır
+_local = threading.local()
+_lock = threading.Lock()
+_schema_lock = threading.Lock()
+_schema_ready = False
+_stats = {"searches_recorded": 0, "scrapes_recorded": 0, "reordered": 0, "pruned": 0, "explored": 0, "errors": 0}
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        # WAL dosyaya kalıcı yazılır; sonraki bağlantılar ayrıca ayarlamaz
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        _schema_ready = True
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        directory = os.path.dirname(YIELD_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(YIELD_PATH, timeout=5)
+        _ensure_schema(conn)
+        _local.conn = conn
+    return conn
+
+def _bump(key: str, n: int = 1) -> None:
+    with _lock:
+        _stats[key] += n
+
+def _upsert(rows: List[Tuple[str, str, str, float, float, float, float]]) -> None:
+    """rows: (kategori, site, strateji, +sorgu, +geçerli, +kazıma, +başarılı kazıma); eski sayaçlar sönümlenir."""
+    now = time.time()
+    conn = _conn()
+    conn.executemany(_UPSERT, [(*row, now) for row in rows])
+    conn.commit()
+
+def record_searches(category: str, observed: Iterable[Tuple[str, str, int]]) -> None:
+    """observed: (site, strateji tipi, geçerli sonuç sayısı); her öğe bir sorgu yanıtıdır."""
+    if not ENABLED:
+        return
+    rows = [(category, site, strategy, 1.0, float(valid), 0.0, 0.0) for site, strategy, valid in observed]
+    if not rows:
+        return
+    try:
+        _upsert(rows)
+    except sqlite3.Error as e:
+        print(f"[SearchYield] Yazılamadı: {e}")
+        _bump("errors")
+        return
+    _bump("searches_recorded", len(rows))
+
+def record_scrapes(outcomes: Iterable[Tuple[str, str, str, bool]]) -> None:
+    """outcomes: (kategori, site, strateji tipi, kazıma başarılı mı)."""
+    if not ENABLED:
+        return
+    rows = [(category, site, strategy, 0.0, 0.0, 1.0, 1.0 if ok else 0.0) for category, site, strategy, ok in outcomes]
+    if not rows:
+        return
+    try:
+        _upsert(rows)
+    except sqlite3.Error as e:
+        print(f"[SearchYield] Yazılamadı: {e}")
+        _bump("errors")
+        return
+    _bump("scrapes_recorded", len(rows))
+
+def _load(category: str) -> Dict[Tuple[str, str], Tuple[float, float, float, float]]:
+    rows = _conn().execute(
+        "SELECT site, strategy, queries, valid, scraped, scrape_ok FROM search_yield WHERE category = ?", (category,)
+    ).fetchall()
+    return {(site, strategy): (q, v, s, ok) for site, strategy, q, v, s, ok in rows}
+
+def _expected(queries: float, valid: float, scraped: float, scrape_ok: float) -> float:
+    if queries < YIELD_MIN_SAMPLES:
+        queries, valid = 0.0, 0.0
+        if scraped < YIELD_MIN_SAMPLES:
+            scraped, scrape_ok = 0.0, 0.0
+    valid_rate = (valid + PRIOR_VALID) / (queries + PRIOR_QUERIES)
+    scrape_rate = (scrape_ok + PRIOR_SCRAPE_OK) / (scraped + PRIOR_SCRAPED)
+    return valid_rate * scrape_rate
+
+def _summed(rows: Iterable[Tuple[float, float, float, float]]) -> Tuple[float, float, float, float]:
+    rows = list(rows)
+    return tuple(sum(r[i] for r in rows) for i in range(4)) if rows else (0.0, 0.0, 0.0, 0.0)
+
+def plan(category: str, sites: List[str], strategy_types: List[str]) -> Tuple[List[str], List[int], Set[Tuple[int, str]]]:
+    """
+    Site sırası, strateji indekslerinin sırası ve denenecek (strateji indeksi, site) kombinasyonlarını döndürür.
+    Eşit verimde orijinal sıra korunur; budama her şeyi elerse hiçbir kombinasyon budanmaz.
+    """
+    all_pairs = {(idx, site) for idx in range(len(strategy_types)) for site in sites}
+    if not ENABLED:
+        return list(sites), list(range(len(strategy_types))), all_pairs
+    try:
+        stats = _load(category)
+    except sqlite3.Error as e:
+        print(f"[SearchYield] Okunamadı: {e}")
+        _bump("errors")
+        return list(sites), list(range(len(strategy_types))), all_pairs
+
+    site_score = {site: _expected(*_summed(v for (s, _), v in stats.items() if s == site)) for site in sites}
+    strategy_score = [_expected(*_summed(v for (_, t), v in stats.items() if t == st)) for st in strategy_types]
+    site_order = sorted(sites, key=lambda s: (-site_score[s], sites.index(s)))
+    strategy_order = sorted(range(len(strategy_types)), key=lambda i: (-strategy_score[i], i))
+    if site_order != list(sites) or strategy_order != list(range(len(strategy_types))):
+        _bump("reordered")
+
+    keep: Set[Tuple[int, str]] = set()
+    pruned = explored = 0
+    for idx, site in all_pairs:
+        row = stats.get((site, strategy_types[idx]))
+        if row is not None and row[0] >= YIELD_MIN_SAMPLES:
+            low = _expected(*row) < YIELD_PRUNE_BELOW
+        else:
+            # Kombinasyon için kanıt yoksa sitenin genel verimine bakılır
+            low = site_score[site] < YIELD_PRUNE_BELOW
+        if low and random.random() >= YIELD_EXPLORE:
+            pruned += 1
+            continue
+        explored += int(low)
+        keep.add((idx, site))
+    if not keep:
+        return site_order, strategy_order, all_pairs
+    _bump("pruned", pruned)
+    _bump("explored", explored)
+    return site_order, strategy_order, keep
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_stats)
+    return {
+        "enabled": ENABLED,
+        "path": YIELD_PATH,
+        "min_samples": YIELD_MIN_SAMPLES,
+        "prune_below": YIELD_PRUNE_BELOW,
+        "explore": YIELD_EXPLORE,
+        **counters,
+    }
@@ -0,0 +1,66 @@
+# seen_pages.py - Yakın zamanda kazınan ürün sayfaları: kanonik URL → ayrıştırılmış sonuç + zaman damgası
+"""
+Aynı ürün farklı sorgulardan (farklı butik/satıcı/izleme parametreleriyle) tekrar geldiğinde sayfa yeniden
+açılmaz; candidates.py kazımaya başlamadan önce buraya bakar. Anahtar scraper.canonical_product_url'dir.
+
+Düzen:
+  <SCRAPER_SEEN_DIR>/ab/<sha1(kanonik url)>.json → {"url", "result", "scraped_at"}
+
+Sadece başarılı sonuçlar saklanır (zaman aşımı/nezaket atlaması kalıcı bir hata değildir).
+SCRAPER_SEEN_TTL saniyeden eski kayıtlar yok sayılır; SCRAPER_SEEN_STORE=0 depoyu kapatır.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+from html_cache import atomic_write
+
+SEEN_DIR = os.getenv("SCRAPER_SEEN_DIR", ".scraper_seen")
+SEEN_TTL = int(os.getenv("SCRAPER_SEEN_TTL", str(6 * 3600)))
+ENABLED = os.getenv("SCRAPER_SEEN_STORE", "1") == "1"
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0}
+
+def _path(canonical_url: str) -> str:
+    key = hashlib.sha1(canonical_url.encode("utf-8")).hexdigest()
+    return os.path.join(SEEN_DIR, key[:2], f"{key}.json")
+
+def _bump(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+def lookup(canonical_url: str, max_age: float = SEEN_TTL) -> Optional[Dict[str, Any]]:
+    """max_age içinde kazınmışsa kaydı ({url, result, scraped_at}) döndürür."""
+    if not ENABLED:
+        return None
+    try:
+        with open(_path(canonical_url), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        _bump("misses")
+        return None
+    if time.time() - entry.get("scraped_at", 0) > max_age or not entry.get("result"):
+        _bump("expired")
+        return None
+    _bump("hits")
+    return entry
+
+def remember(canonical_url: str, result: Optional[Dict[str, Any]]) -> None:
+    if not ENABLED or not result:
+        return
+    entry = {"url": canonical_url, "result": result, "scraped_at": time.time()}
+    try:
+        atomic_write(_path(canonical_url), json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8"))
+    except (OSError, TypeError, ValueError) as e:
+        print(f"[SeenPages] Kayıt yazılamadı: {e}")
+        return
+    _bump("stores")
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_stats)
+    return {"enabled": ENABLED, "dir": SEEN_DIR, "ttl_seconds": SEEN_TTL, **counters}
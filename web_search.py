@@ -7,14 +7,21 @@ from typing import List, Dict, Any, Optional
 import math
 from typing import Iterable, Tuple
 import time
+import threading
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from normalize import parse_query
+import search_cache
+import search_yield
+import http_pool
 from scraper import SITE_CONFIG, scrape_product_page
+from rate_limit import TokenBucket
 
 # Import our logging system
 from logger import (
     get_logger,
-    retry_on_failure,
     handle_errors,
     monitor_performance,
     WebSearchError,
@@ -32,8 +39,96 @@ logger = get_logger("web_search")
 
 BRAVE_API_URL = "https://api.search.brave.com/res/v1/web/search"
 REQUEST_TIMEOUT = int(os.getenv("WEB_SEARCH_TIMEOUT", "8"))
+# Toplam deneme sayısı (ilk istek dahil). Bağlantı hataları oturumun adapter'ında, 429/5xx yanıtları
+# _brave_get içinde yeniden denenir; her deneme _BRAVE_LIMITER'dan ayrı hak alır
 MAX_RETRIES = int(os.getenv("WEB_SEARCH_MAX_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("WEB_SEARCH_RETRY_BACKOFF", "1.0"))
+BRAVE_RETRY_STATUSES = (429, 500, 502, 503, 504)
+BRAVE_RETRY_AFTER_MAX = 30.0
 RATE_LIMIT_DELAY = float(os.getenv("WEB_SEARCH_RATE_LIMIT", "1.1"))
+# Brave planının saniyelik istek hakkı (varsayılan: eski RATE_LIMIT_DELAY aralığına denk) ve eşzamanlı istek sayısı
+BRAVE_RATE_PER_SEC = float(os.getenv("BRAVE_RATE_PER_SEC", str(round(1 / max(RATE_LIMIT_DELAY, 0.01), 3))))
+BRAVE_BURST = int(os.getenv("BRAVE_BURST", "1"))
+BRAVE_MAX_CONCURRENCY = int(os.getenv("BRAVE_MAX_CONCURRENCY", "4"))
+# Toplu mod: tek sorguda en fazla BRAVE_BATCH_SITES site (1 → kapalı, her site ayrı sorgu)
+BRAVE_BATCH_SITES = int(os.getenv("BRAVE_BATCH_SITES", "10"))
+BRAVE_BATCH_COUNT = int(os.getenv("BRAVE_BATCH_COUNT", "20"))
+BRAVE_PER_SITE_RESULTS = 4
+# Brave'in sorgu sınırları; site:/OR eki dahil son sorguya uygulanır, aşan toplu sorgular daha az siteye bölünür
+BRAVE_MAX_QUERY_CHARS = 400
+BRAVE_MAX_QUERY_WORDS = 50
+
+# Tüm thread'lerin paylaştığı Brave istek limiti
+_BRAVE_LIMITER = TokenBucket(BRAVE_RATE_PER_SEC, BRAVE_BURST)
+
+# Tüm aramaların paylaştığı Brave işçileri (arama başına havuz kurulmaz; thread'ler ve SQLite bağlantıları yaşar)
+_BRAVE_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, BRAVE_MAX_CONCURRENCY), thread_name_prefix="brave")
+
+# _fan_out işi boyunca set edilir; _do_brave_request API'den yanıt aldığında (önbellek/iptal/hata değil) işaretler
+_LIVE_RESPONSE: ContextVar[Optional[List[bool]]] = ContextVar("brave_live_response", default=None)
+
+def _note_live_response() -> None:
+    box = _LIVE_RESPONSE.get()
+    if box is not None:
+        box.append(True)
+
+def _brave_session() -> requests.Session:
+    """Brave API için paylaşılan keep-alive oturumu; API hostunun havuzu eşzamanlı istek sayısı kadar."""
+    return http_pool.get_session(
+        "brave",
+        retries=max(0, MAX_RETRIES - 1),
+        backoff=RETRY_BACKOFF,
+        # Durum kodu tekrarları adapter'da değil _brave_get'te: limiter'ı atlamasınlar
+        status_forcelist=(),
+        host_pools={"https://api.search.brave.com/": BRAVE_MAX_CONCURRENCY},
+    )
+
+def _brave_throttle(cancel: Optional[threading.Event] = None) -> bool:
+    """Limiterdan istek hakkı bekler; cancel beklerken set edilirse False döner (istek atılmaz)."""
+    while True:
+        wait_s = _BRAVE_LIMITER.try_take()
+        if wait_s <= 0:
+            return True
+        if cancel is not None:
+            if cancel.wait(wait_s):
+                return False
+        else:
+            time.sleep(wait_s)
+
+def _brave_backoff() -> None:
+    """429 sonrası: biriken hakları sıfırla ki sonraki istekler plan hızına geri otursun."""
+    _BRAVE_LIMITER.drain()
+
+def _retry_delay(response: requests.Response, attempt: int) -> float:
+    """Retry-After (saniye) varsa ona uyulur (BRAVE_RETRY_AFTER_MAX ile sınırlı), yoksa üstel bekleme."""
+    try:
+        return min(BRAVE_RETRY_AFTER_MAX, max(0.0, float(response.headers.get("Retry-After", ""))))
+    except ValueError:
+        return RETRY_BACKOFF * (2 ** attempt)
+
+def _brave_get(params: Dict[str, Any], headers: Dict[str, str],
+               cancel: Optional[threading.Event] = None) -> Optional[requests.Response]:
+    """
+    Brave isteğini atar; 429/5xx yanıtları MAX_RETRIES denemeye kadar tekrarlanır ve her deneme limiter'dan
+    hak bekler. cancel beklerken set edilirse None döner; son yanıt (hatalı olsa da) çağırana döner.
+    """
+    attempts = max(1, MAX_RETRIES)
+    for attempt in range(attempts):
+        if not _brave_throttle(cancel):
+            return None
+        response = _brave_session().get(BRAVE_API_URL, params=params, timeout=REQUEST_TIMEOUT, headers=headers)
+        if response.status_code not in BRAVE_RETRY_STATUSES or attempt == attempts - 1:
+            return response
+        if response.status_code == 429:
+            _brave_backoff()
+        delay = _retry_delay(response, attempt)
+        logger.warning("Brave isteği yeniden denenecek", status=response.status_code, attempt=attempt + 1, delay_s=delay)
+        response.close()
+        if cancel is not None:
+            if cancel.wait(delay):
+                return None
+        else:
+            time.sleep(delay)
 
 # Ana 3 kategori için arama stratejileri
 CATEGORY_KEYWORDS = {
@@ -166,6 +261,13 @@ def _build_universal_search_strategies(query: str) -> List[str]:
     """
     İYİLEŞTİRİLMİŞ: Daha iyi sıralama ve desktop için tam sistem odaklı stratejiler
     """
+    return [strategy for _, strategy in _build_typed_search_strategies(query)]
+
+def _build_typed_search_strategies(query: str) -> List[Tuple[str, str]]:
+    """
+    (strateji tipi, sorgu) çiftleri. Tip, verim kaydının (search_yield) anahtarıdır: sorgu metni her aramada
+    değişir, tipi ("brand_category_component", "clean_query", ...) değişmez.
+    """
     category = _detect_product_category(query)
     strategies = []
 
@@ -184,47 +286,47 @@ def _build_universal_search_strategies(query: str) -> List[str]:
     if brand_match and (gpu_match or cpu_match) and category in CATEGORY_KEYWORDS:
         component = gpu_match.group(0) if gpu_match else cpu_match.group(0)
         if category == 'desktop':
-            strategies.append(f"{brand_match.group(0)} gaming pc {component}")
-            strategies.append(f"{brand_match.group(0)} hazır sistem {component}")
+            strategies.append(("brand_gaming_pc", f"{brand_match.group(0)} gaming pc {component}"))
+            strategies.append(("brand_system", f"{brand_match.group(0)} hazır sistem {component}"))
         else:
-            strategies.append(f"{brand_match.group(0)} {CATEGORY_KEYWORDS[category][0]} {component}")
+            strategies.append(("brand_category_component", f"{brand_match.group(0)} {CATEGORY_KEYWORDS[category][0]} {component}"))
 
     # 2. Orjinal temizlenmiş sorgu
     if len(clean_query) > 5:
-        strategies.append(clean_query)
+        strategies.append(("clean_query", clean_query))
 
     # 3. Desktop için özel tam sistem stratejileri
     if category == 'desktop':
         if gpu_match and cpu_match:
-            strategies.append(f"gaming pc {cpu_match.group(0)} {gpu_match.group(0)}")
-            strategies.append(f"hazır sistem {cpu_match.group(0)} {gpu_match.group(0)}")
+            strategies.append(("gaming_pc_cpu_gpu", f"gaming pc {cpu_match.group(0)} {gpu_match.group(0)}"))
+            strategies.append(("system_cpu_gpu", f"hazır sistem {cpu_match.group(0)} {gpu_match.group(0)}"))
         
         if cpu_match and not any(kw in query.lower() for kw in ["hazır sistem", "gaming pc"]):
-            strategies.append(f"hazır sistem {cpu_match.group(0)}")
-            strategies.append(f"gaming pc {cpu_match.group(0)}")
+            strategies.append(("system_cpu", f"hazır sistem {cpu_match.group(0)}"))
+            strategies.append(("gaming_pc_cpu", f"gaming pc {cpu_match.group(0)}"))
         
         if gpu_match:
-            strategies.append(f"gaming pc {gpu_match.group(0)}")
+            strategies.append(("gaming_pc_gpu", f"gaming pc {gpu_match.group(0)}"))
 
     # 4. Genel bileşen kombinasyonları (desktop olmayan kategoriler için)
     elif category in CATEGORY_KEYWORDS:
         if gpu_match:
-            strategies.append(f"{CATEGORY_KEYWORDS[category][0]} {gpu_match.group(0)}")
+            strategies.append(("category_gpu", f"{CATEGORY_KEYWORDS[category][0]} {gpu_match.group(0)}"))
         if cpu_match:
-            strategies.append(f"{CATEGORY_KEYWORDS[category][0]} {cpu_match.group(0)}")
+            strategies.append(("category_cpu", f"{CATEGORY_KEYWORDS[category][0]} {cpu_match.group(0)}"))
         if brand_match:
-            strategies.append(f"{brand_match.group(0)} {CATEGORY_KEYWORDS[category][0]}")
+            strategies.append(("brand_category", f"{brand_match.group(0)} {CATEGORY_KEYWORDS[category][0]}"))
 
     # 5. Fallback: Orijinal sorgu
     if not strategies or len(strategies) == 0:
-        strategies.append(query)
+        strategies.append(("raw_query", query))
 
     # Benzersiz stratejileri koruyarak sınırla
     unique_strategies = []
     seen = set()
-    for strategy in strategies:
+    for strategy_type, strategy in strategies:
         if strategy not in seen and len(strategy.strip()) > 3:
-            unique_strategies.append(strategy)
+            unique_strategies.append((strategy_type, strategy))
             seen.add(strategy)
     
     final_strategies = unique_strategies[:8]
@@ -232,7 +334,7 @@ def _build_universal_search_strategies(query: str) -> List[str]:
         "Generated improved search strategies",
         original_query=query[:50],
         detected_category=category,
-        strategies=[s[:60] for s in final_strategies]
+        strategies=[s[:60] for _, s in final_strategies]
     )
     return final_strategies
 
@@ -349,19 +451,56 @@ def _validate_search_params(q: str, num: int) -> None:
         raise ValidationError("Arama sorgusu boş olamaz")
     if num < 1 or num > 20:
         raise ValidationError(f"Sonuç sayısı 1-20 arasında olmalı, gelen: {num}")
-    if len(q) > 500:
-        raise ValidationError(f"Sorgu çok uzun: {len(q)} karakter")
 
-@retry_on_failure(
-    max_attempts=MAX_RETRIES,
-    delay=RATE_LIMIT_DELAY,
-    exceptions=(requests.RequestException, WebSearchError)
-)
+def _brave_query(q: str, site: Optional[str] = None, sites: Optional[List[str]] = None) -> str:
+    """API'ye gidecek son sorgu: tek site için 'q site:x', toplu modda 'q (site:a OR site:b ...)'."""
+    q = q.strip()
+    if site:
+        return f"{q} site:{site}"
+    if sites:
+        return f"{q} ({' OR '.join(f'site:{s}' for s in sites)})"
+    return q
+
+def _query_fits(q: str) -> bool:
+    return len(q) <= BRAVE_MAX_QUERY_CHARS and len(q.split()) <= BRAVE_MAX_QUERY_WORDS
+
+def _validate_final_query(q: str) -> None:
+    if not _query_fits(q):
+        raise ValidationError(
+            f"Sorgu çok uzun: {len(q)} karakter, {len(q.split())} kelime "
+            f"(sınır {BRAVE_MAX_QUERY_CHARS} karakter / {BRAVE_MAX_QUERY_WORDS} kelime)"
+        )
+
+def _site_batches(q: str, sites: List[str]) -> List[List[str]]:
+    """
+    sites'ı sırası korunarak en fazla BRAVE_BATCH_SITES'lık gruplara böler; son sorgusu Brave sınırını aşacak
+    grup kapatılıp yenisine geçilir. Tek başına sığmayan site yine tek kalır (isteği doğrulama reddeder).
+    """
+    batches: List[List[str]] = []
+    for site in sites:
+        if batches and len(batches[-1]) < BRAVE_BATCH_SITES and _query_fits(_brave_query(q, sites=batches[-1] + [site])):
+            batches[-1].append(site)
+        else:
+            batches.append([site])
+    return batches
+
 @monitor_performance
 @handle_errors(default_return=[], reraise=False)
-def _do_brave_request(q: str, num: int = 5, site: Optional[str] = None) -> List[Dict]:
-    """Brave Search API'sine isteği gerçekleştirir."""
+def _do_brave_request(q: str, num: int = 5, site: Optional[str] = None,
+                      cancel: Optional[threading.Event] = None, sites: Optional[List[str]] = None,
+                      bypass_cache: bool = False) -> List[Dict]:
+    """
+    Brave Search API'sine isteği gerçekleştirir. sites verilirse tek sorguda (site:a OR site:b ...) aranır.
+    Önce search_cache'e bakılır (bypass_cache=True okumayı atlar); cancel set edilmişse istek atılmadan [] döner.
+    """
     _validate_search_params(q, num)
+    _validate_final_query(_brave_query(q, site=site, sites=sites))
+
+    cache_sites = [site] if site else list(sites or [])
+    cached = search_cache.get(q, cache_sites, num, bypass=bypass_cache)
+    if cached is not None:
+        logger.debug("Brave sonucu önbellekten alındı", query=q[:100], sites=cache_sites)
+        return cached
 
     brave_key = _get_brave_key()
     if not brave_key:
@@ -376,8 +515,11 @@ def _do_brave_request(q: str, num: int = 5, site: Optional[str] = None) -> List[
     }
 
     if site:
-        params["q"] = f"{params['q']} site:{site}"
+        params["q"] = _brave_query(q, site=site)
         logger.debug(f"Site-kısıtlı arama", site=site, query=params['q'])
+    elif sites:
+        params["q"] = _brave_query(q, sites=sites)
+        logger.debug(f"Çok siteli toplu arama", sites=sites, query=params['q'])
 
     headers = {
         "Accept": "application/json",
@@ -388,16 +530,13 @@ def _do_brave_request(q: str, num: int = 5, site: Optional[str] = None) -> List[
     try:
         logger.info("Brave Search API isteği yapılıyor", query=params['q'][:100], num=num, site=site)
 
-        time.sleep(RATE_LIMIT_DELAY)
-
-        response = requests.get(
-            BRAVE_API_URL,
-            params=params,
-            timeout=REQUEST_TIMEOUT,
-            headers=headers
-        )
+        response = _brave_get(params, headers, cancel)
+        if response is None:
+            logger.debug("Brave isteği iptal edildi (yeterli sonuç toplandı)", query=params['q'][:100])
+            return []
 
         if response.status_code == 429:
+            _brave_backoff()
             raise WebSearchError("Brave API rate limit aşıldı", status_code=429)
         elif response.status_code in [401, 403, 422]:
             logger.error("Brave API anahtarı geçersiz veya kota aşıldı", details=response.text)
@@ -406,12 +545,15 @@ def _do_brave_request(q: str, num: int = 5, site: Optional[str] = None) -> List[
         response.raise_for_status()
         data = response.json()
         items = data.get("web", {}).get("results", [])
+        _note_live_response()
 
         if not items:
             logger.info("Arama sonucu bulunamadı", query=q, site=site)
+            search_cache.put(q, cache_sites, num, [])
             return []
 
         results = [{"title": i.get("title","").strip(),"url": i.get("url",""),"snippet": i.get("description","").strip()} for i in items if i.get("title") and i.get("url")]
+        search_cache.put(q, cache_sites, num, results)
 
         logger.info("Brave API isteği tamamlandı", query=q[:50], requested=num, returned=len(results), site=site)
         return results
@@ -421,15 +563,69 @@ def _do_brave_request(q: str, num: int = 5, site: Optional[str] = None) -> List[
     except requests.exceptions.RequestException as e:
         raise WebSearchError(f"HTTP isteği başarısız: {e}", error=str(e))
 
+def _site_of(url: str, sites: Iterable[str]) -> Optional[str]:
+    host = urlsplit(url or "").netloc.lower()
+    return next((s for s in sites if host == s or host.endswith("." + s)), None)
+
+def _brave_job(q: str, num: int, sites: List[str], cancel: threading.Event,
+               bypass_cache: bool) -> Tuple[List[Dict], bool]:
+    """_do_brave_request'i çalıştırır; (hits, canlı mı) döndürür. Önbellekten, iptalden ya da hatadan gelen [] canlı değildir."""
+    box: List[bool] = []
+    token = _LIVE_RESPONSE.set(box)
+    try:
+        hits = _do_brave_request(q, num, sites[0] if len(sites) == 1 else None, cancel,
+                                 sites if len(sites) > 1 else None, bypass_cache) or []
+    finally:
+        _LIVE_RESPONSE.reset(token)
+    return hits, bool(box)
+
+def _fan_out(jobs: List[Tuple[str, int, List[str]]], on_result, bypass_cache: bool = False) -> set:
+    """
+    (sorgu, num, siteler) işlerini öncelik sırasıyla eşzamanlı çalıştırır; hız sınırını _BRAVE_LIMITER uygular.
+    Her sonuç on_result(iş indeksi, hits, canlı mı) ile işlenir; True dönerse bekleyen istekler iptal edilir.
+    Sonucu işlenen işlerin indekslerini döndürür.
+    """
+    completed = set()
+    cancel = threading.Event()
+    futures = {}
+    try:
+        futures = {
+            _BRAVE_EXECUTOR.submit(_brave_job, q, num, sites, cancel, bypass_cache): job_idx
+            for job_idx, (q, num, sites) in enumerate(jobs)
+        }
+        pending = set(futures)
+        enough = False
+        while pending and not enough:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job_idx = futures[future]
+                try:
+                    hits, live = future.result()
+                except Exception as e:
+                    logger.warning(f"Brave isteği başarısız: {jobs[job_idx][0][:60]} {jobs[job_idx][2]}: {e}")
+                    continue
+                completed.add(job_idx)
+                enough = on_result(job_idx, hits, live) or enough
+        if pending:
+            logger.info(f"Yeterli sonuç toplandı, {len(pending)} Brave isteği iptal edildi")
+    finally:
+        # Sıradaki işler hiç başlamaz; çalışanlar cancel'ı limiter beklemesinde görüp [] döner
+        cancel.set()
+        for future in futures:
+            future.cancel()
+    return completed
+
 @monitor_performance
 @handle_errors(default_return=[], reraise=False)
 def search_products_on_web(
     query: str,
     count: int = 8,
-    restrict_sites: Optional[Iterable[Tuple[str, str]]] = None
+    restrict_sites: Optional[Iterable[Tuple[str, str]]] = None,
+    bypass_cache: bool = False
 ) -> List[Dict]:
     """
     İYİLEŞTİRİLMİŞ: Evrensel ürün arama - daha iyi strateji sıralaması ve desktop optimizasyonu
+    bypass_cache=True: kalıcı arama önbelleği okunmaz (sonuçlar yine yazılır)
     """
     if not query or not query.strip():
         raise ValidationError("Search query cannot be empty")
@@ -437,7 +633,9 @@ def search_products_on_web(
     query = query.strip()
     wanted = max(1, min(30, count))
     detected_category = _detect_product_category(query)
-    search_strategies = _build_universal_search_strategies(query)
+    typed_strategies = _build_typed_search_strategies(query)
+    strategy_types = [strategy_type for strategy_type, _ in typed_strategies]
+    search_strategies = [strategy for _, strategy in typed_strategies]
 
     logger.info(
         "Starting improved universal product search with Brave API",
@@ -457,36 +655,102 @@ def search_products_on_web(
         else:
             priority_sites = list(SITE_CONFIG.keys())
 
-        for strategy_idx, strategy in enumerate(search_strategies):
-            if len(all_results) >= wanted: 
-                break
-            logger.info(f"Trying improved strategy {strategy_idx + 1}/{len(search_strategies)}: {strategy[:80]}...")
-
-            for site in priority_sites:
-                if len(all_results) >= wanted: 
-                    break
-                try:
-                    hits = _do_brave_request(strategy, num=4, site=site)
-                    valid_hits_for_site = []
-                    for hit in hits:
-                        url = hit.get('url', '').lower()
-                        if url and url not in seen_urls and _validate_result_relevance(hit, detected_category):
-                            hit.update({
-                                'search_strategy': strategy_idx + 1,
-                                'search_site': site,
-                                'detected_category': detected_category,
-                                'search_query': strategy
-                            })
-                            valid_hits_for_site.append(hit)
-                            seen_urls.add(url)
-                    
-                    if valid_hits_for_site:
-                        all_results.extend(valid_hits_for_site)
-                        logger.info(f"Improved strategy {strategy_idx + 1} found {len(valid_hits_for_site)} valid results from {site}")
-
-                except Exception as e:
-                    logger.warning(f"Improved strategy {strategy_idx + 1} failed for {site}: {e}")
-        
+        # Öğrenilen verime göre sıralama ve budama (veri yokken yukarıdaki sıra aynen kalır)
+        priority_sites, strategy_order, planned = search_yield.plan(detected_category, priority_sites, strategy_types)
+        if len(planned) < len(priority_sites) * len(search_strategies):
+            logger.info(f"Düşük verimli {len(priority_sites) * len(search_strategies) - len(planned)} strateji/site kombinasyonu atlandı")
+
+        site_rank = {site: idx for idx, site in enumerate(priority_sites)}
+        strategy_rank = {strategy_idx: pos for pos, strategy_idx in enumerate(strategy_order)}
+        # (strateji önceliği, site önceliği) → geçerli sonuçlar; birleştirme bu sırayla yapılır
+        accepted: Dict[Tuple[int, int], List[Dict]] = {}
+        # API'den canlı yanıt alınan her (strateji, site) sorgusu için geçerli sonuç sayısı → search_yield
+        # (önbellekten gelen sonuçlar yeni gözlem değildir, tekrar sayılmaz)
+        observed: List[Tuple[str, str, int]] = []
+
+        def accept(strategy_idx: int, site: str, hits: List[Dict], live: bool) -> bool:
+            strategy = search_strategies[strategy_idx]
+            valid_hits_for_site = []
+            for hit in hits:
+                url = hit.get('url', '').lower()
+                if url and _validate_result_relevance(hit, detected_category):
+                    hit.update({
+                        'search_strategy': strategy_idx + 1,
+                        'search_strategy_type': strategy_types[strategy_idx],
+                        'search_site': site,
+                        'detected_category': detected_category,
+                        'search_query': strategy
+                    })
+                    valid_hits_for_site.append(hit)
+                    seen_urls.add(url)
+            if live:
+                observed.append((site, strategy_types[strategy_idx], len(valid_hits_for_site)))
+            if valid_hits_for_site:
+                accepted.setdefault((strategy_rank[strategy_idx], site_rank[site]), []).extend(valid_hits_for_site)
+                logger.info(f"Improved strategy {strategy_idx + 1} found {len(valid_hits_for_site)} valid results from {site}")
+            return len(seen_urls) >= wanted
+
+        # 1) Toplu mod: strateji başına (site:a OR site:b ...) sorguları, sonuçlar domain'e göre ayrılır
+        fallback_jobs: List[Tuple[int, str]] = [
+            (strategy_idx, site) for strategy_idx in strategy_order for site in priority_sites
+            if (strategy_idx, site) in planned
+        ]
+        if BRAVE_BATCH_SITES > 1 and len(priority_sites) > 1:
+            batch_jobs = []
+            for strategy_idx in strategy_order:
+                kept = [site for site in priority_sites if (strategy_idx, site) in planned]
+                batch_jobs.extend(
+                    (strategy_idx, batch) for batch in _site_batches(search_strategies[strategy_idx], kept)
+                )
+            answered = set()
+
+            def on_batch(job_idx: int, hits: List[Dict], live: bool) -> bool:
+                strategy_idx, batch = batch_jobs[job_idx]
+                per_site: Dict[str, List[Dict]] = {}
+                for hit in hits:
+                    site = _site_of(hit.get('url', ''), batch)
+                    if site:
+                        per_site.setdefault(site, []).append(hit)
+                enough = False
+                # Toplu sorguda boş dönen site kaydedilmez: site bazlı sorguya düşer, verimi o sorgu belirler
+                for site in batch:
+                    if per_site.get(site):
+                        answered.add((strategy_idx, site))
+                        # Brave sıralaması domain içinde korunur; site başına tekil sorgudaki kadar sonuç alınır
+                        enough = accept(strategy_idx, site, per_site[site][:BRAVE_PER_SITE_RESULTS], live) or enough
+                return enough
+
+            completed = _fan_out(
+                [(search_strategies[strategy_idx], BRAVE_BATCH_COUNT, batch) for strategy_idx, batch in batch_jobs],
+                on_batch,
+                bypass_cache,
+            )
+            # Toplu sorguda boş dönen domainler için site bazlı sorguya düş
+            fallback_jobs = [
+                (strategy_idx, site)
+                for job_idx in sorted(completed)
+                for strategy_idx, batch in [batch_jobs[job_idx]]
+                for site in batch if (strategy_idx, site) not in answered
+            ]
+
+        # 2) Site bazlı sorgular (toplu mod kapalıysa tümü, açıksa sadece boş dönen domainler)
+        if fallback_jobs and len(seen_urls) < wanted:
+            _fan_out(
+                [(search_strategies[strategy_idx], BRAVE_PER_SITE_RESULTS, [site]) for strategy_idx, site in fallback_jobs],
+                lambda job_idx, hits, live: accept(fallback_jobs[job_idx][0], fallback_jobs[job_idx][1], hits, live),
+                bypass_cache,
+            )
+
+        # Öncelik sırasıyla birleştir (aynı URL'nin ilk geçtiği strateji/site kazanır)
+        merged_urls = set()
+        for key in sorted(accepted):
+            for hit in accepted[key]:
+                url = hit['url'].lower()
+                if url not in merged_urls:
+                    merged_urls.add(url)
+                    all_results.append(hit)
+
+        search_yield.record_searches(detected_category, observed)
         final_results = all_results[:wanted]
 
         logger.info(
@@ -517,7 +781,14 @@ def health_check() -> Dict[str, Any]:
         "api_provider": "Brave Search API",
         "timeout": REQUEST_TIMEOUT,
         "max_retries": MAX_RETRIES,
+        "retry_backoff": RETRY_BACKOFF,
         "rate_limit_delay": RATE_LIMIT_DELAY,
+        "rate_per_sec": BRAVE_RATE_PER_SEC,
+        "max_concurrency": BRAVE_MAX_CONCURRENCY,
+        "batch_sites": BRAVE_BATCH_SITES,
+        "cache": search_cache.stats(),
+        "yield": search_yield.stats(),
+        "http_pool": http_pool.stats().get("brave"),
         "supported_categories": list(CATEGORY_KEYWORDS.keys()),
         "improvements": [
             "Better strategy prioritization",